@@ -0,0 +1,134 @@
+# ~/marketnews-app/backend/app/aho_corasick.py
+"""
+Aho–Corasick multi-pattern matching, and the filename -> company matcher built on it.
+
+The list-enriched fallback used to try every (symbol, company) pair with a
+substring test per file, which is O(files x symbols). CompanyMatcher compiles
+every symbol and company name into one automaton per symbol map, so each
+filename is matched in a single pass over its characters.
+"""
+import re
+from collections import deque
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+_NON_ALNUM_RUN_RE = re.compile(r"[^A-Z0-9]+")
+
+
+class AhoCorasick:
+    """Automaton over a fixed set of patterns; iter_matches yields (start, end, pattern_id)."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pid)
+
+        # breadth-first fail links; outputs are merged along them so a state
+        # reports every pattern that ends there
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                yield (i + 1 - len(patterns[pid]), i + 1, pid)
+
+
+def normalize_name(s: str) -> str:
+    """Uppercase, with every run of non-alphanumerics collapsed to one space."""
+    return _NON_ALNUM_RUN_RE.sub(" ", s.upper()).strip()
+
+
+class CompanyMatcher:
+    """
+    Finds the symbol whose ticker or company name best matches a filename.
+
+    Both filenames and patterns are normalized with normalize_name, so
+    "LARSEN_&_TOUBRO_Q2.pdf" can match "Larsen & Toubro". When several
+    patterns match, the most specific one wins:
+
+      1) matches that start and end on word boundaries beat embedded ones
+         (embedded matches must be at least MIN_EMBEDDED_LEN characters);
+      2) then the longest match;
+      3) then the earliest in the filename;
+      4) then a ticker over a company name, then the lower symbol (stable).
+    """
+
+    MIN_EMBEDDED_LEN = 3
+
+    def __init__(self, mapping: Mapping[str, Optional[str]]):
+        patterns: List[str] = []
+        self._payload: List[Tuple[str, int]] = []  # (symbol, 0 = ticker / 1 = company name)
+        seen: Dict[str, int] = {}
+        for sym, comp in mapping.items():
+            for kind, text in ((0, sym), (1, comp)):
+                if not text:
+                    continue
+                norm = normalize_name(text)
+                if not norm:
+                    continue
+                prev = seen.get(norm)
+                if prev is not None and self._payload[prev] <= (sym, kind):
+                    continue
+                if prev is not None:
+                    self._payload[prev] = (sym, kind)
+                    continue
+                seen[norm] = len(patterns)
+                patterns.append(norm)
+                self._payload.append((sym, kind))
+        self._automaton = AhoCorasick(patterns)
+
+    @property
+    def states(self) -> int:
+        return len(self._automaton)
+
+    def match(self, filename: str) -> Optional[str]:
+        """Symbol of the best match in filename (extension ignored), or None."""
+        text = normalize_name(filename.rsplit(".", 1)[0] if "." in filename else filename)
+        if not text:
+            return None
+        best_key = None
+        best_sym = None
+        n = len(text)
+        for start, end, pid in self._automaton.iter_matches(text):
+            length = end - start
+            aligned = (start == 0 or text[start - 1] == " ") and (end == n or text[end] == " ")
+            if not aligned and length < self.MIN_EMBEDDED_LEN:
+                continue
+            sym, kind = self._payload[pid]
+            key = (not aligned, -length, start, kind, sym)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_sym = sym
+        return best_sym
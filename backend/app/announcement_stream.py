@@ -0,0 +1,197 @@
+# ~/marketnews-app/backend/app/announcement_stream.py
+"""
+Live feed of new announcement uploads, for /announcements/stream.
+
+One AnnouncementBroadcaster per process watches the shared UploadsIndex (see
+uploads_index) and fans new entries out to every subscriber through asyncio
+queues, so a thousand open streams cost one change detector, not a thousand
+folder scans. The detector task runs only while someone is subscribed.
+
+Resume tokens are the entry's (mtime_ns, name) cursor. A reconnecting client
+passes the last token it saw and gets every entry modified at or after that
+time (minus the token's own entry) straight from the index, so resuming works
+across workers and restarts. Delivery is at-least-once: a client should dedupe
+by filename (a rewritten file comes again, as its newest version).
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from .paths import ANNOUNCEMENTS_UPLOADS_DIR
+from .uploads_index import UploadEntry, UploadsIndex, decode_cursor, encode_cursor, get_uploads_index
+
+# how often the detector checks the index (the watcher thread updates it within ~200 ms)
+POLL_SECONDS = 0.25
+# a subscriber this many batches behind is dropped; it reconnects with its token
+QUEUE_SIZE = 256
+# entries replayed on resume; further behind than this, the client is told to reload
+MAX_REPLAY = 500
+HEARTBEAT_SECONDS = 15.0
+
+EMPTY_TOKEN = encode_cursor(UploadEntry("", 0, 0))
+
+
+def entry_token(entry: UploadEntry) -> str:
+    return encode_cursor(entry)
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One open stream: replay first, then live batches (oldest first) from queue."""
+    replay: List[UploadEntry]
+    truncated: bool          # replay hit MAX_REPLAY; the client should reload the list
+    token: str               # newest token the client will have after the replay
+    queue: "asyncio.Queue[Optional[List[UploadEntry]]]" = field(default_factory=asyncio.Queue)
+    dropped: bool = False
+
+
+class AnnouncementBroadcaster:
+    def __init__(self, index_factory: Callable[[], UploadsIndex], poll_seconds: float = POLL_SECONDS):
+        self._index_factory = index_factory
+        self.poll_seconds = poll_seconds
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        # high-water mark of what has been broadcast: newest mtime and the names sent at it
+        self._hwm_mtime_ns = 0
+        self._hwm_names: Set[str] = set()
+        self._version = -1
+        self.broadcasts = 0
+        self.entries_sent = 0
+        self.dropped = 0
+
+    @property
+    def index(self) -> UploadsIndex:
+        return self._index_factory()
+
+    # -----------------------
+    # subscribers
+    # -----------------------
+    async def subscribe(self, since: Optional[str] = None) -> Subscription:
+        """
+        Register a subscriber. since is a resume token; without one the stream
+        starts from now. Raises CursorError for a bad token.
+        """
+        index = self.index
+        await asyncio.to_thread(index.refresh)
+        # no awaits from here on: the replay and the registration see the same index state
+        head = index.head()
+        token = entry_token(head) if head else EMPTY_TOKEN
+        replay: List[UploadEntry] = []
+        truncated = False
+        if since:
+            neg_mtime, name = decode_cursor(since)
+            entries, more = index.since(-neg_mtime, MAX_REPLAY + 1)
+            replay = [e for e in entries if not (e.mtime_ns == -neg_mtime and e.name == name)]
+            if more or len(replay) > MAX_REPLAY:
+                truncated, replay = True, []
+            else:
+                replay.reverse()  # oldest first, so the last one sent is the newest token
+                token = entry_token(replay[-1]) if replay else since
+        sub = Subscription(replay=replay, truncated=truncated, token=token)
+        if not self._subscribers:
+            # nobody was listening, so the high-water mark is stale: restart it at the current head
+            self._reset_hwm(index)
+        self._subscribers.add(sub)
+        self._ensure_task()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def _reset_hwm(self, index: UploadsIndex) -> None:
+        head = index.head()
+        self._hwm_mtime_ns = head.mtime_ns if head else 0
+        self._hwm_names = {e.name for e in index.since(self._hwm_mtime_ns)[0]} if head else set()
+        self._version = index.version
+
+    def _ensure_task(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run(), name="announcement-broadcaster")
+
+    # -----------------------
+    # change detector
+    # -----------------------
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.poll_seconds)
+            index = self.index
+            try:
+                # refresh() is a stat, or a folder scan every FULL_RESCAN_SECONDS: keep it off the loop
+                await asyncio.to_thread(index.refresh)
+            except Exception as e:
+                print(f"Announcement stream refresh failed: {e}")
+                continue
+            if index.version == self._version:
+                continue
+            self._version = index.version
+            self.publish(self._new_entries(index))
+
+    def _new_entries(self, index: UploadsIndex) -> List[UploadEntry]:
+        """Entries past the high-water mark, oldest first; advances the mark."""
+        entries, _more = index.since(self._hwm_mtime_ns)
+        fresh = [e for e in entries if e.mtime_ns > self._hwm_mtime_ns or e.name not in self._hwm_names]
+        if fresh:
+            newest = fresh[0].mtime_ns
+            if newest > self._hwm_mtime_ns:
+                self._hwm_mtime_ns = newest
+                self._hwm_names = set()
+            self._hwm_names.update(e.name for e in fresh if e.mtime_ns == newest)
+        fresh.reverse()
+        return fresh
+
+    def publish(self, entries: List[UploadEntry]) -> None:
+        if not entries:
+            return
+        self.broadcasts += 1
+        for sub in list(self._subscribers):
+            if sub.queue.qsize() >= QUEUE_SIZE:
+                # too slow: drop it rather than buffer without bound; it resumes with its token
+                sub.dropped = True
+                self.dropped += 1
+                self._subscribers.discard(sub)
+                sub.queue.put_nowait(None)
+                continue
+            sub.queue.put_nowait(entries)
+            self.entries_sent += len(entries)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "subscribers": len(self._subscribers),
+            "running": self._task is not None and not self._task.done(),
+            "poll_seconds": self.poll_seconds,
+            "broadcasts": self.broadcasts,
+            "entries_sent": self.entries_sent,
+            "dropped": self.dropped,
+        }
+
+
+# process-wide instance for the uploads folder; routers subscribe through it
+announcement_broadcaster = AnnouncementBroadcaster(lambda: get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR))
+
+
+async def stream_batches(sub: Subscription) -> AsyncIterator[List[Tuple[str, Optional[str], Optional[UploadEntry]]]]:
+    """
+    Events for one subscription as (kind, token, entry), in batches: the
+    replay first (with its reset and ready), then one batch per broadcast.
+      ("reset", token, None)      replay was cut at MAX_REPLAY; reload the list
+      ("announcement", token, e)  one new or rewritten upload
+      ("ready", token, None)      replay done; token is the resume point so far
+      ("ping", None, None)        heartbeat, every HEARTBEAT_SECONDS of silence
+    Ends when the subscriber was dropped for falling behind.
+    """
+    first: List[Tuple[str, Optional[str], Optional[UploadEntry]]] = []
+    if sub.truncated:
+        first.append(("reset", sub.token, None))
+    first.extend(("announcement", entry_token(entry), entry) for entry in sub.replay)
+    first.append(("ready", sub.token, None))
+    yield first
+    while True:
+        try:
+            batch = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield [("ping", None, None)]
+            continue
+        if batch is None:
+            return
+        yield [("announcement", entry_token(entry), entry) for entry in batch]
@@ -0,0 +1,181 @@
+# ~/marketnews-app/backend/app/card_ingest.py
+"""
+Batched card ingestion with content-hash deduplication.
+
+Rows are validated one by one. Valid rows are written BATCH_SIZE at a time:
+one SELECT finds hashes that are already stored, then one executemany
+INSERT ... ON CONFLICT DO NOTHING writes the rest, and one commit covers the
+batch. Both the in-request and the stored duplicates are reported, not inserted.
+"""
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .models import Card, as_utc, card_content_hash, utc_now
+
+BATCH_SIZE = 1000
+
+
+class CardIn(BaseModel):
+    """One card in a bulk request. At least one of url / raw_text is required (they form the dedup key)."""
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    source: Optional[str] = None
+    company: Optional[str] = None
+    event_type: Optional[str] = None
+    raw_text: Optional[str] = None
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    published_at: Optional[datetime] = None
+    approved: bool = False
+    metadata_json: Optional[Dict[str, Any]] = Field(None, alias="metadata")
+
+    @model_validator(mode="after")
+    def _has_key(self):
+        if not (self.url or "").strip() and not (self.raw_text or "").strip():
+            raise ValueError("url or raw_text is required")
+        return self
+
+
+def _error_detail(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+    return str(e)
+
+
+def parse_rows(items: Iterable[Any]) -> Iterator[Tuple[Optional[CardIn], Optional[str]]]:
+    """(card, None) for each valid item, (None, error) otherwise; order preserved."""
+    for item in items:
+        try:
+            yield CardIn.model_validate(item), None
+        except (ValidationError, ValueError, TypeError) as e:
+            yield None, _error_detail(e)
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Any]:
+    """Decoded objects from NDJSON lines (blank lines skipped). Bad lines come back as the exception."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"invalid JSON: {e}")
+
+
+def _insert_stmt(session: Session):
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        # rows are pre-filtered against stored hashes; the unique index still guards races
+        return insert(Card)
+    return dialect_insert(Card).on_conflict_do_nothing(index_elements=["content_hash"])
+
+
+class BulkIngest:
+    """
+    Accumulates rows and writes them in batches; results are per input row, in order.
+
+        ingest = BulkIngest(session)
+        for item in items:
+            ingest.add(item)
+            if ingest.full:
+                ingest.flush()
+        report = ingest.finish()
+    """
+
+    def __init__(self, session: Session, batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.batch_size = max(1, batch_size)
+        self.results: List[Dict[str, Any]] = []
+        self._pending: List[Tuple[int, str, Dict[str, Any]]] = []  # (result index, hash, row)
+        self.inserted = 0
+        self.skipped = 0
+        self.errors = 0
+        self.batches = 0
+        self._started = time.perf_counter()
+
+    def add(self, item: Any) -> None:
+        index = len(self.results)
+        if isinstance(item, Exception):
+            card, error = None, str(item)
+        else:
+            card, error = next(parse_rows([item]))
+        if card is None:
+            self.results.append({"index": index, "status": "error", "detail": error})
+            self.errors += 1
+            return
+        row = card.model_dump(exclude={"metadata_json"})
+        row["metadata_json"] = card.metadata_json
+        # one clock and one stored format for every writer (see models.utc_now)
+        row["published_at"] = as_utc(row["published_at"]) or utc_now()
+        h = card_content_hash(card.url, card.raw_text)
+        row["content_hash"] = h
+        self.results.append({"index": index, "status": "pending"})
+        self._pending.append((index, h, row))
+
+    @property
+    def full(self) -> bool:
+        """True once a batch is ready; callers then flush() (in a worker thread from async code)."""
+        return len(self._pending) >= self.batch_size
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        hashes = list({h for _i, h, _r in pending})
+        existing = dict(
+            self.session.execute(select(Card.content_hash, Card.id).where(Card.content_hash.in_(hashes))).all()
+        )
+        to_insert: List[Dict[str, Any]] = []
+        first_in_batch: Dict[str, int] = {}
+        for index, h, row in pending:
+            if h in existing:
+                self.results[index] = {"index": index, "status": "skipped", "reason": "duplicate", "id": existing[h]}
+                self.skipped += 1
+            elif h in first_in_batch:
+                self.results[index] = {
+                    "index": index, "status": "skipped", "reason": "duplicate_in_request",
+                    "duplicate_of": first_in_batch[h],
+                }
+                self.skipped += 1
+            else:
+                first_in_batch[h] = index
+                to_insert.append(row)
+        if to_insert:
+            self.session.execute(_insert_stmt(self.session), to_insert)
+        ids = dict(
+            self.session.execute(
+                select(Card.content_hash, Card.id).where(Card.content_hash.in_(list(first_in_batch)))
+            ).all()
+        )
+        self.session.commit()
+        for h, index in first_in_batch.items():
+            self.results[index] = {"index": index, "status": "inserted", "id": ids.get(h)}
+            self.inserted += 1
+        self.batches += 1
+
+    def finish(self) -> Dict[str, Any]:
+        self.flush()
+        seconds = time.perf_counter() - self._started
+        return {
+            "received": len(self.results),
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "batches": self.batches,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(len(self.results) / seconds, 1) if seconds > 0 else None,
+            "results": self.results,
+        }
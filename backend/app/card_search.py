@@ -0,0 +1,169 @@
+# ~/marketnews-app/backend/app/card_search.py
+"""
+Card search for GET /cards/search.
+
+On SQLite with FTS5 (models.FTS_ENABLED) queries run against the cards_fts
+index: results are ranked with bm25 (company and summary weigh more than the
+announcement body), carry a highlighted snippet of the matching text, and
+the last word is a prefix match, so "infos" finds "Infosys".
+
+Scoring every match of a very common word costs O(matches), so bm25 is
+applied to the newest RANK_WINDOW matches, and ranked_window in the response
+says when that cut applied (an older, better match may exist). A page that
+reaches past the window ranks every match instead. Snippets are built for
+the returned page only.
+
+Fallback: when DATABASE_URL points at another database, or SQLite was built
+without FTS5, the same endpoint runs a LIKE scan instead. Every word must
+appear (case-insensitively) in company, event_type, summary or raw_text.
+Results are newest first, with rank null and a plain text snippet. The
+fallback is correct but O(table), so it only suits small tables. On
+PostgreSQL, add a tsvector index for large ones.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, bindparam, func, or_, select, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .models import Card, FTS_COLUMNS, FTS_TABLE
+
+# bm25 weights, in FTS_COLUMNS order: company, event_type, summary, raw_text
+BM25_WEIGHTS = (5.0, 2.0, 3.0, 1.0)
+SNIPPET_TOKENS = 16
+# bm25 ranks at most this many of the newest matches (by id); rarer queries are ranked exactly
+RANK_WINDOW = 5000
+HIGHLIGHT = ("<mark>", "</mark>")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+RESULT_COLUMNS = (
+    Card.id, Card.source, Card.company, Card.event_type, Card.summary,
+    Card.url, Card.published_at, Card.approved,
+)
+
+
+def query_words(q: str) -> List[str]:
+    return _WORD_RE.findall(q or "")
+
+
+def fts_query(words: List[str], prefix: bool = True) -> str:
+    """
+    FTS5 MATCH expression: every word is quoted (so user input cannot inject FTS
+    syntax) and AND-ed; the last one is a prefix term when prefix is set.
+    """
+    terms = ['"' + w.replace('"', '""') + '"' for w in words]
+    if prefix and terms:
+        terms[-1] += "*"
+    return " AND ".join(terms)
+
+
+def _filters(approved: Optional[bool], source: Optional[str], event_type: Optional[str]) -> Dict[str, Any]:
+    """Equality filters as {column: value}, skipping the ones not given."""
+    out: Dict[str, Any] = {}
+    if approved is not None:
+        out["approved"] = approved
+    if source is not None:
+        out["source"] = source
+    if event_type is not None:
+        out["event_type"] = event_type
+    return out
+
+
+def search_cards(
+    session: Session,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    prefix: bool = True,
+    approved: Optional[bool] = None,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+) -> Dict[str, Any]:
+    words = query_words(q)
+    filters = _filters(approved, source, event_type)
+    if not words:
+        return {"query": q, "engine": None, "count": 0, "ranked_window": None, "results": []}
+    if models.FTS_ENABLED:
+        return _search_fts(session, q, words, limit, offset, prefix, filters)
+    return _search_like(session, q, words, limit, offset, filters)
+
+
+def _search_fts(session, q, words, limit, offset, prefix, filters) -> Dict[str, Any]:
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    where = "".join(f" AND c.{col} = :{col}" for col in filters)
+    match = fts_query(words, prefix)
+    # 1) bm25 over the newest RANK_WINDOW matches only: the inner query walks the
+    #    index by rowid (newest first) and stops, so common words stay cheap. A
+    #    page past the window ranks every match (LIMIT -1) rather than come back empty
+    window = RANK_WINDOW if offset + limit <= RANK_WINDOW else -1
+    ranked = session.execute(
+        text(
+            f"SELECT id, score, COUNT(*) OVER () AS ranked FROM ("
+            f" SELECT {FTS_TABLE}.rowid AS id, bm25({FTS_TABLE}, {weights}) AS score"
+            f" FROM {FTS_TABLE} JOIN cards c ON c.id = {FTS_TABLE}.rowid"
+            f" WHERE {FTS_TABLE} MATCH :match{where}"
+            f" ORDER BY {FTS_TABLE}.rowid DESC LIMIT :window"
+            f") ORDER BY score, id DESC LIMIT :limit OFFSET :offset"
+        ),
+        dict(filters, match=match, window=window, limit=limit, offset=offset),
+    ).all()
+    if not ranked:
+        return {"query": q, "engine": "fts5", "count": 0, "ranked_window": None, "results": []}
+    # a full window means older matches were left unranked
+    ranked_window = RANK_WINDOW if window > 0 and ranked[0][2] >= RANK_WINDOW else None
+
+    # 2) columns and snippets for just the page. FTS5 seeks a rowid range
+    #    cheaply, but handed an IN list (or a join) with a prefix term it re-reads
+    #    the whole doclist per row; so constrain by range and filter with +rowid
+    ids = [card_id for card_id, _score, _ranked in ranked]
+    snippets = dict(
+        session.execute(
+            text(
+                f"SELECT rowid, snippet({FTS_TABLE}, -1, :hl_open, :hl_close, '…', {SNIPPET_TOKENS})"
+                f" FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+                f" AND rowid BETWEEN :lo AND :hi AND +rowid IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"match": match, "lo": min(ids), "hi": max(ids), "ids": ids,
+             "hl_open": HIGHLIGHT[0], "hl_close": HIGHLIGHT[1]},
+        ).all()
+    )
+    rows = {r["id"]: dict(r) for r in session.execute(select(*RESULT_COLUMNS).where(Card.id.in_(ids))).mappings()}
+    results = []
+    for card_id, score, _ranked in ranked:
+        r = rows.get(card_id)
+        if r is not None:
+            r["rank"] = score
+            r["snippet"] = snippets.get(card_id)
+            results.append(r)
+    return {"query": q, "engine": "fts5", "count": len(results), "ranked_window": ranked_window, "results": results}
+
+
+def _search_like(session, q, words, limit, offset, filters) -> Dict[str, Any]:
+    conds = [getattr(Card, col) == value for col, value in filters.items()]
+    for w in words:
+        pattern = f"%{w.lower()}%"
+        conds.append(or_(*(func.lower(getattr(Card, c)).like(pattern) for c in FTS_COLUMNS)))
+    stmt = (
+        select(*RESULT_COLUMNS, Card.raw_text)
+        .where(and_(*conds))
+        .order_by(Card.published_at.desc(), Card.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    results = []
+    for row in session.execute(stmt).mappings():
+        r = dict(row)
+        body = r.pop("raw_text") or r.get("summary") or ""
+        r["rank"] = None
+        r["snippet"] = _plain_snippet(body, words[0])
+        results.append(r)
+    return {"query": q, "engine": "like", "count": len(results), "ranked_window": None, "results": results}
+
+
+def _plain_snippet(body: str, word: str, width: int = 120) -> str:
+    pos = body.lower().find(word.lower())
+    start = max(0, pos - width // 3) if pos >= 0 else 0
+    out = body[start:start + width]
+    return ("…" if start else "") + out + ("…" if start + width < len(body) else "")
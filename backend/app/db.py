@@ -1,14 +1,153 @@
+"""
+Database engines and sessions.
+
+Two engines share DATABASE_URL:
+
+  engine       read-write; POST endpoints, ingestion, schema setup
+  read_engine  GET endpoints; on SQLite it opens the file read-only
+               (mode=ro + query_only), so readers never take write locks
+
+For SQLite, DB_PROFILE picks the connection profile:
+
+  wal (default)  journal_mode=WAL, so readers and the single writer do not
+                 block each other; synchronous=NORMAL (durable at checkpoint,
+                 safe with WAL); busy_timeout so a second writer waits instead
+                 of failing with "database is locked"; mmap_size and
+                 cache_size for read-heavy pages. Each is overridable below.
+  default        SQLite defaults (rollback journal), for comparison.
+
+The schema is not created on import: call init_db() once at startup (the app
+does this from its lifespan hook).
+"""
 import os
-from sqlalchemy import create_engine
+from typing import Generator, Optional
+from urllib.request import pathname2url
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .metrics import instrument_engine
+
 # Default to local sqlite DB for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./marketnews.db")
+# optional separate URL for reads (e.g. a replica); SQLite derives a read-only one
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, so 64 MiB
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _sqlite_file(url: str) -> Optional[str]:
+    """Database file path for a file-backed SQLite URL, None for in-memory ones."""
+    database = make_url(url).database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return database
+
 
-# For sqlite we need check_same_thread
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+def _set_sqlite_pragmas(engine: Engine, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            if DB_PROFILE == "wal":
+                for name, value in SQLITE_PRAGMAS.items():
+                    if read_only and name == "journal_mode":
+                        continue  # WAL is a property of the file; set by the writer
+                    cur.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                cur.execute("PRAGMA query_only=ON")
+        finally:
+            cur.close()
+
+
+def make_engine(url: str, read_only: bool = False) -> Engine:
+    if not _is_sqlite(url):
+        return create_engine(
+            url, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT, pool_pre_ping=True
+        )
+
+    # For sqlite we need check_same_thread
+    connect_args = {"check_same_thread": False}
+    path = _sqlite_file(url)
+    if path is None:
+        # in-memory: one shared connection, nothing to tune
+        return create_engine(url, connect_args=connect_args)
+    if DB_PROFILE == "wal":
+        connect_args["timeout"] = SQLITE_PRAGMAS["busy_timeout"] / 1000
+    if read_only:
+        # an SQLite URI, so that mode=ro applies: the path is escaped (# ? % would cut
+        # or change it), and URL.create passes it on as is where a URL string is unquoted
+        url = URL.create(
+            "sqlite", database=f"file:{pathname2url(os.path.abspath(path))}", query={"mode": "ro", "uri": "true"}
+        )
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    _set_sqlite_pragmas(engine, read_only)
+    return engine
+
+
+engine = make_engine(DATABASE_URL)
+if DATABASE_READ_URL:
+    read_engine = make_engine(DATABASE_READ_URL, read_only=_is_sqlite(DATABASE_READ_URL))
+elif _is_sqlite(DATABASE_URL) and _sqlite_file(DATABASE_URL):
+    read_engine = make_engine(DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
+
+# every statement is timed into the db_query stage (see metrics)
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+Base = declarative_base()
+
+
+def init_db() -> None:
+    """Create tables, indexes and the search index, and run migrations. Idempotent."""
+    from . import models
+
+    models.create_schema()
+
+
+def get_db() -> Generator:
+    """FastAPI dependency: one read-write session per request."""
+    database = SessionLocal()
+    try:
+        yield database
+    finally:
+        database.close()
+
+
+def get_read_db() -> Generator:
+    """FastAPI dependency for GET endpoints: a session on the read-only engine."""
+    database = ReadSessionLocal()
+    try:
+        yield database
+    finally:
+        database.close()
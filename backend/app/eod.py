@@ -0,0 +1,264 @@
+# ~/marketnews-app/backend/app/eod.py
+"""
+Process-wide cache of the latest EOD CSV snapshot.
+
+The EOD file changes once a day, so routers should not list DATA_DIR and
+re-parse the CSV on every request. `SnapshotCache.get()` returns the parsed
+snapshot for the newest file and only reloads it when the file's path, mtime
+or size changes. Reloads are single-flight: concurrent requests wait on one
+parse instead of each starting their own.
+"""
+import os
+import re
+import time
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+import numpy as np
+
+from . import eod_binary
+from .eod_binary import MappedEod
+from .eod_schema import ColumnSchema, EodRecord, read_eod_csv
+from .metrics import stage
+from .symbol_index import SymbolIndex
+
+EOD_DATE_RE = re.compile(r"20[0-9]{2}[-_][01][0-9][-_][0-3][0-9]")
+
+
+def find_latest_csv(data_dir: str) -> Optional[str]:
+    """Find the most recent EOD CSV file in data_dir.
+    Preference order:
+      - files containing a YYYY-MM-DD date in filename -> pick max date
+        (newest mtime among files with the same date)
+      - otherwise fallback to most-recent mtime CSV
+    This is the one "latest file" rule; every router goes through it.
+    Returns full path or None.
+    """
+    if not os.path.isdir(data_dir):
+        return None
+
+    files = [os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.lower().endswith(".csv")]
+    if not files:
+        return None
+
+    date_files: List[tuple] = []
+    for f in files:
+        m = EOD_DATE_RE.search(os.path.basename(f))
+        if m:
+            try:
+                s = m.group(0).replace("_", "-")
+                dt = datetime.strptime(s, "%Y-%m-%d")
+                date_files.append((dt, os.path.getmtime(f), f))
+            except Exception:
+                pass
+
+    if date_files:
+        # pick file with max date found in filename
+        date_files.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        return date_files[0][2]
+
+    # fallback: most recent modification time
+    files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    return files[0]
+
+
+@dataclass
+class EodSnapshot:
+    """
+    One loaded EOD CSV file. Treat as read-only; it is shared across requests.
+
+    source is "csv" when the file was parsed, or "mmap" when it was served from
+    its .eodb binary (see eod_binary). Mapped snapshots answer exact symbol
+    lookups from the file's sorted index and build the full SymbolIndex only
+    on the first lookup that needs it.
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    schema: ColumnSchema
+    records: Sequence[EodRecord]
+    loaded_at: float
+    load_seconds: float
+    source: str = "csv"
+    mapped: Optional[MappedEod] = None
+    _symbol_index: Optional[SymbolIndex] = field(default=None, repr=False)
+    _index_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _columns: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return (self.path, self.mtime_ns, self.size)
+
+    @property
+    def version(self) -> str:
+        return f"{self.filename}:{self.mtime_ns}:{self.size}"
+
+    @property
+    def symbol_index(self) -> SymbolIndex:
+        if self._symbol_index is None:
+            with self._index_lock:
+                if self._symbol_index is None:
+                    self._symbol_index = SymbolIndex.from_records(self.records)
+        return self._symbol_index
+
+    def column(self, name: str) -> np.ndarray:
+        """float64 column for a numeric EodRecord field (NaN = missing), built once per snapshot."""
+        if self.mapped is not None:
+            return self.mapped.column(name)
+        col = self._columns.get(name)
+        if col is None:
+            k = EodRecord._fields.index(name)
+            col = np.array([r[k] for r in self.records], dtype=np.float64)
+            self._columns[name] = col
+        return col
+
+    def resolve(self, ticker: str) -> Optional[int]:
+        """Row id for ticker (same precedence as SymbolIndex.resolve)."""
+        if self.mapped is not None and self._symbol_index is None:
+            row_id = self.mapped.find_symbol((ticker or "").strip())
+            if row_id is not None:
+                return row_id
+        return self.symbol_index.resolve(ticker)
+
+
+def load_snapshot(path: str, st: os.stat_result) -> EodSnapshot:
+    """
+    Load the EOD file at path (st is the stat taken before reading). The mmap'ed
+    .eodb binary is used when it is current; otherwise the CSV is parsed and its
+    ticker index built up front.
+    """
+    started = time.perf_counter()
+    mapped = eod_binary.open_for_csv(path, st)
+    if mapped is not None:
+        return EodSnapshot(
+            path=path,
+            mtime_ns=st.st_mtime_ns,
+            size=st.st_size,
+            schema=mapped.schema(),
+            records=mapped.records,
+            loaded_at=time.time(),
+            load_seconds=time.perf_counter() - started,
+            source="mmap",
+            mapped=mapped,
+        )
+
+    schema, records = read_eod_csv(path)
+    snap = EodSnapshot(
+        path=path,
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        schema=schema,
+        records=records,
+        loaded_at=time.time(),
+        load_seconds=0.0,
+        _symbol_index=SymbolIndex.from_records(records),
+    )
+    snap.load_seconds = time.perf_counter() - started
+    return snap
+
+
+class SnapshotCache:
+    """
+    Holds the snapshot for the newest CSV in data_dir.
+
+    The directory listing is only redone when the directory mtime changes, and
+    the chosen file is stat'ed on each call so an in-place rewrite is noticed.
+    """
+
+    def __init__(self, data_dir: str, loader=load_snapshot):
+        self.data_dir = data_dir
+        self._loader = loader
+        self._snapshot: Optional[EodSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._latest_path: Optional[str] = None
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._waits = 0
+        self._errors = 0
+
+    def latest_path(self) -> Optional[str]:
+        try:
+            dir_mtime_ns = os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            self._dir_mtime_ns = None
+            self._latest_path = None
+            return None
+        if dir_mtime_ns != self._dir_mtime_ns:
+            with stage("csv_discovery"):
+                self._latest_path = find_latest_csv(self.data_dir)
+            self._dir_mtime_ns = dir_mtime_ns
+        return self._latest_path
+
+    def _current_key(self) -> Optional[Tuple[str, int, int, os.stat_result]]:
+        path = self.latest_path()
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            # file vanished between listing and stat; force a re-list next time
+            self._dir_mtime_ns = None
+            return None
+        return (path, st.st_mtime_ns, st.st_size, st)
+
+    def get(self) -> Optional[EodSnapshot]:
+        """Return the snapshot for the latest CSV, (re)loading it if needed. None if no CSV exists."""
+        current = self._current_key()
+        if current is None:
+            return None
+        path, mtime_ns, size, st = current
+
+        snap = self._snapshot
+        if snap is not None and snap.key == (path, mtime_ns, size):
+            self._hits += 1
+            return snap
+
+        acquired = self._load_lock.acquire(blocking=False)
+        if not acquired:
+            # another request is already parsing; wait for it rather than parsing again
+            self._waits += 1
+            self._load_lock.acquire()
+        try:
+            snap = self._snapshot
+            if snap is not None and snap.key == (path, mtime_ns, size):
+                self._hits += 1
+                return snap
+            try:
+                with stage("eod_parse"):
+                    new_snap = self._loader(path, st)
+            except Exception:
+                self._errors += 1
+                raise
+            if snap is None:
+                self._misses += 1
+            else:
+                self._reloads += 1
+            self._snapshot = new_snap
+            return new_snap
+        finally:
+            self._load_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "data_dir": self.data_dir,
+            "hits": self._hits,
+            "misses": self._misses,
+            "reloads": self._reloads,
+            "waits": self._waits,
+            "errors": self._errors,
+            "csv_filename": snap.filename if snap else None,
+            "version": snap.version if snap else None,
+            "rows": len(snap.records) if snap else 0,
+            "source": snap.source if snap else None,
+            "load_seconds": round(snap.load_seconds, 6) if snap else None,
+            "age_seconds": round(time.time() - snap.loaded_at, 3) if snap else None,
+        }
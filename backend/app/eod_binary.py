@@ -0,0 +1,274 @@
+# ~/marketnews-app/backend/app/eod_binary.py
+"""
+Compact binary form of an EOD CSV, read through a read-only mmap.
+
+`convert()` writes `eod_YYYY-MM-DD.eodb` next to `eod_YYYY-MM-DD.csv`. Every
+uvicorn worker then maps the same file, so the pages are shared through the OS
+page cache, and a cold start does no CSV parsing at all.
+
+Layout (little-endian, blocks 8-byte aligned):
+
+    header   struct HEADER: magic, version, nrows, meta length,
+             source CSV mtime_ns and size (staleness check), data offset
+    meta     JSON: CSV header, field lists, block offsets
+    numbers  float64[len(NUMERIC_FIELDS)][nrows], NaN = missing
+    offsets  uint32[len(TEXT_FIELDS)][nrows + 1] into the string blob
+    blob     UTF-8 string table
+    index    uint32[n] row ids sorted by (symbol.upper(), row id)
+
+Run `python -m app.eod_binary [data_dir]` to convert every CSV ahead of a
+deploy; the routers also convert on first load unless EOD_BINARY=0.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .eod_schema import ColumnSchema, EodRecord, read_eod_csv
+
+MAGIC = b"EODB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIqqQ")  # magic, version, reserved, nrows, meta_len, src_mtime_ns, src_size, data_off
+SUFFIX = ".eodb"
+
+TEXT_FIELDS = ("symbol", "company", "turnover_raw", "mcap_raw")
+NUMERIC_FIELDS = tuple(f for f in EodRecord._fields if f not in TEXT_FIELDS)
+# text fields where an empty cell means "no value" (see eod_schema.to_text)
+_EMPTY_IS_NONE = ("symbol", "company")
+
+ENABLED = os.getenv("EOD_BINARY", "1") != "0"
+
+
+def binary_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + SUFFIX
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def convert(csv_path: str, out_path: Optional[str] = None) -> str:
+    """Parse csv_path once and write its binary snapshot (atomically). Returns the output path."""
+    st = os.stat(csv_path)
+    schema, records = read_eod_csv(csv_path)
+    out_path = out_path or binary_path(csv_path)
+    nrows = len(records)
+
+    numbers = np.full((len(NUMERIC_FIELDS), nrows), np.nan, dtype="<f8")
+    for j, field in enumerate(NUMERIC_FIELDS):
+        k = EodRecord._fields.index(field)
+        numbers[j] = [np.nan if r[k] is None else float(r[k]) for r in records]
+
+    blob = bytearray()
+    offsets = np.zeros((len(TEXT_FIELDS), nrows + 1), dtype="<u4")
+    for j, field in enumerate(TEXT_FIELDS):
+        k = EodRecord._fields.index(field)
+        for i, r in enumerate(records):
+            offsets[j, i] = len(blob)
+            if r[k]:
+                blob += r[k].encode("utf-8")
+        offsets[j, nrows] = len(blob)
+
+    keyed = [(r.symbol.upper(), i) for i, r in enumerate(records) if r.symbol]
+    keyed.sort()
+    index = np.array([i for _k, i in keyed], dtype="<u4")
+
+    # offsets are relative to data_off and filled in below
+    meta: Dict[str, Any] = {
+        "header": schema.header,
+        "numeric_fields": list(NUMERIC_FIELDS),
+        "text_fields": list(TEXT_FIELDS),
+        "missing_text": [f for f in TEXT_FIELDS if schema.columns.get(f) is None],
+        "index_len": len(index),
+    }
+    pos = 0
+    meta["numbers_off"] = pos
+    pos = _align(pos + numbers.nbytes)
+    meta["offsets_off"] = pos
+    pos = _align(pos + offsets.nbytes)
+    meta["blob_off"] = pos
+    meta["blob_len"] = len(blob)
+    pos = _align(pos + len(blob))
+    meta["index_off"] = pos
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    data_off = _align(HEADER.size + len(meta_bytes))
+
+    fd, tmp = tempfile.mkstemp(prefix=".eodb-", dir=os.path.dirname(out_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, VERSION, 0, nrows, len(meta_bytes), st.st_mtime_ns, st.st_size, data_off))
+            fh.write(meta_bytes)
+            for off, payload in (
+                (meta["numbers_off"], numbers.tobytes()),
+                (meta["offsets_off"], offsets.tobytes()),
+                (meta["blob_off"], bytes(blob)),
+                (meta["index_off"], index.tobytes()),
+            ):
+                fh.write(b"\0" * (data_off + off - fh.tell()))
+                fh.write(payload)
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return out_path
+
+
+class MappedEod:
+    """Read-only view over one .eodb file. Arrays returned here point into the shared mapping."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _r, nrows, meta_len, src_mtime_ns, src_size, data_off = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an EOD binary snapshot (v{VERSION})")
+        self.nrows = nrows
+        self.source_mtime_ns = src_mtime_ns
+        self.source_size = src_size
+        meta = json.loads(self._mm[HEADER.size:HEADER.size + meta_len].decode("utf-8"))
+        self.meta = meta
+        self.header: List[str] = meta["header"]
+        self._missing_text = set(meta["missing_text"])
+
+        buf = memoryview(self._mm)
+        self._numbers = np.frombuffer(
+            buf, dtype="<f8", count=len(NUMERIC_FIELDS) * nrows, offset=data_off + meta["numbers_off"]
+        ).reshape(len(NUMERIC_FIELDS), nrows)
+        self._offsets = np.frombuffer(
+            buf, dtype="<u4", count=len(TEXT_FIELDS) * (nrows + 1), offset=data_off + meta["offsets_off"]
+        ).reshape(len(TEXT_FIELDS), nrows + 1)
+        self._blob = buf[data_off + meta["blob_off"]:data_off + meta["blob_off"] + meta["blob_len"]]
+        self._index = np.frombuffer(buf, dtype="<u4", count=meta["index_len"], offset=data_off + meta["index_off"])
+        self._numeric_pos = {f: j for j, f in enumerate(NUMERIC_FIELDS)}
+        self._text_pos = {f: j for j, f in enumerate(TEXT_FIELDS)}
+        self.records = MappedRecords(self)
+
+    def matches_source(self, st: os.stat_result) -> bool:
+        return self.source_mtime_ns == st.st_mtime_ns and self.source_size == st.st_size
+
+    def column(self, field: str) -> np.ndarray:
+        """float64 column for a numeric field (zero-copy, read-only)."""
+        return self._numbers[self._numeric_pos[field]]
+
+    def text(self, field: str, i: int) -> Optional[str]:
+        if field in self._missing_text:
+            return None
+        offs = self._offsets[self._text_pos[field]]
+        s = bytes(self._blob[offs[i]:offs[i + 1]]).decode("utf-8")
+        if not s and field in _EMPTY_IS_NONE:
+            return None
+        return s
+
+    def find_symbol(self, symbol: str) -> Optional[int]:
+        """First row (file order) whose symbol.upper() equals symbol.upper(), via the sorted index."""
+        key = (symbol or "").upper()
+        keys = _IndexKeys(self)
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            return int(self._index[pos])
+        return None
+
+    def schema(self) -> ColumnSchema:
+        return ColumnSchema(self.header)
+
+
+class _IndexKeys(Sequence):
+    """Sorted symbol keys decoded on demand, so bisect touches ~log2(n) strings."""
+
+    def __init__(self, mapped: MappedEod):
+        self._m = mapped
+
+    def __len__(self) -> int:
+        return len(self._m._index)
+
+    def __getitem__(self, pos):
+        return (self._m.text("symbol", int(self._m._index[pos])) or "").upper()
+
+
+class MappedRecords(Sequence):
+    """EodRecord sequence decoded row by row from a MappedEod."""
+
+    def __init__(self, mapped: MappedEod):
+        self._m = mapped
+
+    def __len__(self) -> int:
+        return self._m.nrows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        m = self._m
+        values = []
+        for field in EodRecord._fields:
+            if field in m._text_pos:
+                values.append(m.text(field, i))
+            else:
+                v = float(m._numbers[m._numeric_pos[field], i])
+                if math.isnan(v):
+                    values.append(None)
+                elif field == "rank":
+                    values.append(int(v))
+                else:
+                    values.append(v)
+        return EodRecord._make(values)
+
+
+def open_for_csv(csv_path: str, st: os.stat_result, create: bool = ENABLED) -> Optional[MappedEod]:
+    """
+    Mapped snapshot for csv_path if a current .eodb exists next to it. When it is
+    missing or stale and create is set, convert first. Returns None on any
+    failure, and callers then fall back to parsing the CSV.
+    """
+    if not ENABLED:
+        return None
+    bpath = binary_path(csv_path)
+    try:
+        if os.path.exists(bpath):
+            mapped = MappedEod(bpath)
+            if mapped.matches_source(st):
+                return mapped
+        if not create:
+            return None
+        convert(csv_path, bpath)
+        mapped = MappedEod(bpath)
+        return mapped if mapped.matches_source(st) else None
+    except Exception as e:
+        print(f"EOD binary snapshot unavailable for {csv_path}: {e}")
+        return None
+
+
+def convert_dir(data_dir: str) -> List[Tuple[str, str]]:
+    """Convert every CSV in data_dir whose .eodb is missing or stale."""
+    done = []
+    for fname in sorted(os.listdir(data_dir)):
+        if not fname.lower().endswith(".csv"):
+            continue
+        csv_path = os.path.join(data_dir, fname)
+        st = os.stat(csv_path)
+        bpath = binary_path(csv_path)
+        try:
+            if MappedEod(bpath).matches_source(st):
+                continue
+        except Exception:
+            pass
+        done.append((csv_path, convert(csv_path, bpath)))
+    return done
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "data")
+    for src, dst in convert_dir(target):
+        print(f"{src} -> {dst}")
@@ -0,0 +1,156 @@
+# ~/marketnews-app/backend/app/eod_schema.py
+"""
+Column schema for EOD CSV files, shared by every router.
+
+Header names vary between exports ("Symbol" vs "Ticker", "Description" vs
+"Company", ...). ColumnSchema resolves each canonical field to a column index
+once per file header, and rows are then parsed positionally into EodRecord
+tuples with all number cleanup done at load time.
+"""
+import csv
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# symbol/company columns: first header (in file order) that matches
+SYMBOL_HEADERS = ("symbol", "ticker", "securitycode", "security code", "scrip")
+DESC_HEADERS = ("description", "company", "companyname", "nameofthecompany", "name", "description of announcement")
+
+
+def to_float(s: Optional[str]) -> Optional[float]:
+    if s is None or s == "":
+        return None
+    try:
+        cleaned = str(s).replace(",", "").replace("%", "").replace("₹", "").replace("Cr", "").replace("L", "").strip()
+        return float(cleaned)
+    except Exception:
+        return None
+
+
+def to_plain_float(s: Optional[str]) -> Optional[float]:
+    """Float with only thousands separators removed (turnover/volume columns)."""
+    if s in (None, ""):
+        return None
+    try:
+        return float(str(s).replace(",", "").strip())
+    except Exception:
+        return None
+
+
+def to_rank(s: Optional[str]) -> Optional[int]:
+    if not s or not s.isdigit():
+        return None
+    return int(s)
+
+
+def to_text(s: Optional[str]) -> Optional[str]:
+    return s or None
+
+
+def to_raw(s: Optional[str]) -> Optional[str]:
+    """Cell text as-is (stripped); kept for the *_raw response fields."""
+    return s
+
+
+class EodRecord(NamedTuple):
+    symbol: Optional[str]
+    company: Optional[str]
+    price: Optional[float]
+    change_1d: Optional[float]
+    change_1w: Optional[float]
+    turnover_raw: Optional[str]
+    turnover: Optional[float]
+    mcap_raw: Optional[str]
+    mcap: Optional[float]
+    rank: Optional[int]
+    vwap: Optional[float]
+    atr14: Optional[float]
+    relvol: Optional[float]
+    vol_change: Optional[float]
+    volatility: Optional[float]
+    beta: Optional[float]
+
+
+# canonical field -> (converter, header candidates in priority order)
+FIELD_COLUMNS: Dict[str, Tuple[Callable[[Optional[str]], object], Tuple[str, ...]]] = {
+    "price": (to_float, ("Price", "Close", "ClosePrice", "LastPrice")),
+    "change_1d": (to_float, ("Price Change % 1 day",)),
+    "change_1w": (to_float, ("Price Change % 1 week",)),
+    "turnover_raw": (to_raw, ("Price * Volume (Turnover) 1 day", "Volume", "Volume(24H)", "TradedQty", "TOTTRDQTY")),
+    "turnover": (to_plain_float, ("Price * Volume (Turnover) 1 day", "Volume", "Volume(24H)", "TradedQty", "TOTTRDQTY")),
+    "mcap_raw": (to_raw, ("Market capitalization", "Mcap", "MarketCap")),
+    "mcap": (to_float, ("Market capitalization", "Mcap", "MarketCap")),
+    "rank": (to_rank, ("Rank",)),
+    "vwap": (to_float, ("Volume Weighted Average Price 1 day", "VWAP", "Volume Weighted Average Price")),
+    "atr14": (to_float, ("Average True Range % (14) 1 day", "ATR14", "ATR_14", "ATR(14)")),
+    "relvol": (to_float, ("Relative Volume 1 day", "RelVol", "relative_volume", "relative vol", "RelativeVolume", "Relative Vol")),
+    "vol_change": (to_float, ("Volume Change % 1 day",)),
+    "volatility": (to_float, ("Volatility 1 day", "Volatility")),
+    "beta": (to_float, ("Beta", "Beta 1 year")),
+}
+
+
+def _first_in_header_order(header: Sequence[str], candidates: Sequence[str]) -> Optional[int]:
+    wanted = {c.lower() for c in candidates}
+    for i, h in enumerate(header):
+        if h is not None and h.strip().lower() in wanted:
+            return i
+    return None
+
+
+def _first_by_candidate(header: Sequence[str], candidates: Sequence[str]) -> Optional[int]:
+    lowered = [h.strip().lower() if h is not None else None for h in header]
+    for c in candidates:
+        c = c.lower()
+        for i, h in enumerate(lowered):
+            if h == c:
+                return i
+    return None
+
+
+class ColumnSchema:
+    """Canonical field -> column index for one CSV header."""
+
+    def __init__(self, header: Sequence[str]):
+        self.header = list(header)
+        self.columns: Dict[str, Optional[int]] = {}
+
+        sym_idx = _first_in_header_order(self.header, SYMBOL_HEADERS)
+        comp_idx = _first_in_header_order(self.header, DESC_HEADERS)
+        # fallback to first two headers when the export uses unknown names
+        if sym_idx is None and len(self.header) >= 1:
+            sym_idx = 0
+        if comp_idx is None and len(self.header) >= 2:
+            comp_idx = 1
+        self.columns["symbol"] = sym_idx
+        self.columns["company"] = comp_idx
+
+        for field, (_conv, candidates) in FIELD_COLUMNS.items():
+            self.columns[field] = _first_by_candidate(self.header, candidates)
+
+        self._plan: List[Tuple[Optional[int], Callable[[Optional[str]], object]]] = [
+            (self.columns[field], FIELD_COLUMNS[field][0] if field in FIELD_COLUMNS else to_text)
+            for field in EodRecord._fields
+        ]
+
+    def parse(self, row: Sequence[str]) -> EodRecord:
+        n = len(row)
+        values = []
+        for idx, conv in self._plan:
+            if idx is None or idx >= n:
+                values.append(conv(None))
+            else:
+                values.append(conv(row[idx].strip()))
+        return EodRecord._make(values)
+
+    def missing(self) -> List[str]:
+        """Canonical fields this file has no column for."""
+        return [f for f, idx in self.columns.items() if idx is None]
+
+
+def read_eod_csv(path: str) -> Tuple[ColumnSchema, List[EodRecord]]:
+    """Parse an EOD CSV into its schema and typed records (file order preserved)."""
+    with open(path, newline="", encoding="utf-8", errors="ignore") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, [])
+        schema = ColumnSchema(header)
+        records = [schema.parse(row) for row in reader if row]
+    return schema, records
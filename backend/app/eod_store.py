@@ -0,0 +1,260 @@
+# ~/marketnews-app/backend/app/eod_store.py
+"""
+In-memory columnar store of every dated EOD CSV in DATA_DIR.
+
+One observation = one (day, symbol) row. Each metric is a float64 NumPy array
+(NaN for missing), alongside int32 day and symbol id arrays. Symbols get a
+stable id on first sight, and each id keeps a {day_id: row} map, so a history
+lookup touches only that symbol's rows. New days are appended in place as
+files arrive, copied straight from the day's mmap'ed .eodb when there is one.
+A changed or deleted day, or going past the retention window, triggers a full
+rebuild.
+"""
+import os
+import time
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import eod_binary
+from .eod import EOD_DATE_RE
+from .eod_schema import read_eod_csv
+
+# EodRecord fields stored as float64 columns
+METRICS = (
+    "price", "change_1d", "change_1w", "turnover", "mcap", "rank",
+    "vwap", "atr14", "relvol", "vol_change", "volatility", "beta",
+)
+
+DEFAULT_MAX_DAYS = int(os.getenv("EOD_STORE_MAX_DAYS", "400"))
+RECHECK_SECONDS = 2.0
+
+
+def list_dated_csvs(data_dir: str) -> Dict[str, str]:
+    """ISO date -> path for every CSV with a YYYY-MM-DD date in its name (newest mtime wins per date)."""
+    out: Dict[str, Tuple[float, str]] = {}
+    if not os.path.isdir(data_dir):
+        return {}
+    for fname in os.listdir(data_dir):
+        if not fname.lower().endswith(".csv"):
+            continue
+        m = EOD_DATE_RE.search(fname)
+        if not m:
+            continue
+        try:
+            day = date.fromisoformat(m.group(0).replace("_", "-")).isoformat()
+        except ValueError:
+            continue
+        path = os.path.join(data_dir, fname)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if day not in out or mtime > out[day][0]:
+            out[day] = (mtime, path)
+    return {day: path for day, (_mtime, path) in out.items()}
+
+
+class _Growable:
+    """NumPy array with amortised O(1) append of whole blocks."""
+
+    def __init__(self, dtype, fill=0):
+        self.dtype = dtype
+        self.fill = fill
+        self.data = np.full(0, fill, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        need = self.size + len(values)
+        if need > len(self.data):
+            cap = max(need, 2 * len(self.data), 1024)
+            grown = np.full(cap, self.fill, dtype=self.dtype)
+            grown[: self.size] = self.data[: self.size]
+            self.data = grown
+        self.data[self.size:need] = values
+        self.size = need
+
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+
+class EodStore:
+    """All retained EOD days for data_dir; call refresh() before reading to pick up new files."""
+
+    def __init__(self, data_dir: str, max_days: int = DEFAULT_MAX_DAYS):
+        self.data_dir = data_dir
+        self.max_days = max(1, max_days)
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        self.rebuilds = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.days: List[str] = []                  # day_id -> ISO date
+        self._day_keys: Dict[str, Tuple[str, int, int]] = {}
+        self.symbols: List[str] = []               # symbol id -> symbol
+        self.symbol_ids: Dict[str, int] = {}
+        self.companies: List[Optional[str]] = []   # symbol id -> latest company name
+        self._symbol_rows: List[Dict[int, int]] = []  # symbol id -> {day_id: row}
+        self._day_col = _Growable(np.int32)
+        self._sym_col = _Growable(np.int32)
+        self._metrics = {m: _Growable(np.float64, np.nan) for m in METRICS}
+        self._day_order: List[int] = []            # day ids sorted by date
+        self.load_seconds = 0.0
+
+    # -----------------------
+    # loading
+    # -----------------------
+    def refresh(self) -> None:
+        """Append new dated files; rebuild if a loaded day changed or vanished. Cheap when nothing changed."""
+        try:
+            dir_mtime_ns = os.stat(self.data_dir).st_mtime_ns
+        except OSError:
+            return
+        if dir_mtime_ns == self._dir_mtime_ns:
+            # an in-place rewrite of a day's CSV does not touch the directory mtime,
+            # so stat the loaded files too, but at most every RECHECK_SECONDS
+            now = time.monotonic()
+            if now - self._checked_at < RECHECK_SECONDS:
+                return
+            self._checked_at = now
+            if not self._loaded_files_changed():
+                return
+        with self._lock:
+            files = list_dated_csvs(self.data_dir)
+            keys: Dict[str, Tuple[str, int, int]] = {}
+            for day, path in files.items():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                keys[day] = (path, st.st_mtime_ns, st.st_size)
+
+            retained = sorted(keys)[-self.max_days:]
+            stale = any(keys.get(day) != key for day, key in self._day_keys.items())
+            slack = max(1, self.max_days // 4)
+            if stale or len(set(self._day_keys) | set(retained)) > self.max_days + slack:
+                self._reset()
+                self.rebuilds += 1
+
+            started = time.perf_counter()
+            for day in retained:
+                if day not in self._day_keys:
+                    self._append_day(day, keys[day])
+            self.load_seconds += time.perf_counter() - started
+            self._dir_mtime_ns = dir_mtime_ns
+
+    def _loaded_files_changed(self) -> bool:
+        for path, mtime_ns, size in self._day_keys.values():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if st.st_mtime_ns != mtime_ns or st.st_size != size:
+                return True
+        return False
+
+    def _append_day(self, day: str, key: Tuple[str, int, int]) -> None:
+        path = key[0]
+        mapped = eod_binary.open_for_csv(path, os.stat(path))
+        if mapped is not None:
+            n = mapped.nrows
+            symbols = [mapped.text("symbol", i) for i in range(n)]
+            companies = [mapped.text("company", i) for i in range(n)]
+            column = mapped.column
+        else:
+            _schema, records = read_eod_csv(path)
+            symbols = [r.symbol for r in records]
+            companies = [r.company for r in records]
+
+            def column(m: str) -> np.ndarray:
+                return np.array([getattr(r, m) for r in records], dtype=np.float64)
+
+        day_id = len(self.days)
+        is_newest = not self.days or day >= max(self.days)
+        base = self._day_col.size
+        kept: List[int] = []
+        sids: List[int] = []
+        for i, symbol in enumerate(symbols):
+            if not symbol:
+                continue
+            sym = symbol.upper()
+            sid = self.symbol_ids.get(sym)
+            if sid is None:
+                sid = len(self.symbols)
+                self.symbol_ids[sym] = sid
+                self.symbols.append(sym)
+                self.companies.append(companies[i])
+                self._symbol_rows.append({})
+            elif day_id in self._symbol_rows[sid]:
+                continue  # duplicate symbol within one file: first row wins, like the index
+            elif companies[i] and is_newest:
+                self.companies[sid] = companies[i]
+            self._symbol_rows[sid][day_id] = base + len(kept)
+            kept.append(i)
+            sids.append(sid)
+
+        kept_idx = np.asarray(kept, dtype=np.int64)
+        for m in METRICS:
+            self._metrics[m].extend(column(m)[kept_idx])
+        self._day_col.extend(np.full(len(kept), day_id, dtype=np.int32))
+        self._sym_col.extend(np.asarray(sids, dtype=np.int32))
+        self.days.append(day)
+        self._day_keys[day] = key
+        self._day_order = sorted(range(len(self.days)), key=lambda d: self.days[d])
+
+    # -----------------------
+    # queries
+    # -----------------------
+    def history(self, symbol: str, days: int) -> Optional[Dict[str, Any]]:
+        """
+        Last `days` dates in the store and each metric aligned to them (None where
+        the symbol has no row that day). Returns None for an unknown symbol.
+        """
+        with self._lock:
+            sid = self.symbol_ids.get((symbol or "").strip().upper())
+            if sid is None:
+                return None
+            return self._history(sid, days)
+
+    def _history(self, sid: int, days: int) -> Dict[str, Any]:
+        order = self._day_order[-max(1, days):]
+        rows_by_day = self._symbol_rows[sid]
+        rows = np.array([rows_by_day.get(d, -1) for d in order], dtype=np.int64)
+        present = rows >= 0
+        series: Dict[str, List[Optional[float]]] = {}
+        for m in METRICS:
+            values = np.full(len(rows), np.nan)
+            values[present] = self._metrics[m].view()[rows[present]]
+            series[m] = [None if np.isnan(v) else float(v) for v in values]
+        return {
+            "ticker": self.symbols[sid],
+            "company": self.companies[sid],
+            "dates": [self.days[d] for d in order],
+            "series": series,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._day_col.size
+        used = self._day_col.view().nbytes + self._sym_col.view().nbytes
+        used += sum(col.view().nbytes for col in self._metrics.values())
+        allocated = self._day_col.data.nbytes + self._sym_col.data.nbytes
+        allocated += sum(col.data.nbytes for col in self._metrics.values())
+        return {
+            "data_dir": self.data_dir,
+            "days": len(self.days),
+            "first_day": min(self.days) if self.days else None,
+            "last_day": max(self.days) if self.days else None,
+            "symbols": len(self.symbols),
+            "rows": rows,
+            "metrics": list(METRICS),
+            "bytes_per_symbol_day": round(used / rows, 1) if rows else None,
+            "column_bytes": used,
+            "allocated_bytes": allocated,
+            "load_seconds": round(self.load_seconds, 4),
+            "max_days": self.max_days,
+            "rebuilds": self.rebuilds,
+        }
@@ -0,0 +1,413 @@
+# ~/marketnews-app/backend/app/feed_ingest.py
+"""
+Polling ingester for exchange announcement feeds (fills the cards table).
+
+ANNOUNCEMENT_FEEDS lists the pages to poll as SOURCE=URL entries separated
+by commas or whitespace, e.g.
+
+    ANNOUNCEMENT_FEEDS="NSE=https://host/api/corporate-announcements?index=equities,BSE=https://host/ann.html"
+
+FeedIngester is one asyncio task per process. Each round it:
+
+  - fetches every feed concurrently over one pooled aiohttp session, at most
+    CONNECTIONS connections in total and PER_HOST per exchange host;
+  - sends the ETag / Last-Modified it got last time as If-None-Match /
+    If-Modified-Since, so an unchanged page comes back as an empty 304. A
+    server that ignores them still has its page skipped when the body hashes
+    the same as the last one. Validators are persisted under CACHE_DIR, so a
+    restart does not download everything again;
+  - parses changed pages in a process pool (feed_parser: JSON, RSS or HTML
+    tables through BeautifulSoup, which would otherwise hold the GIL);
+  - writes the rows through card_ingest.BulkIngest in a worker thread:
+    BATCH_SIZE rows per executemany INSERT, and announcements that are
+    already stored (same content_hash) are skipped, so re-listing a page
+    adds only its new items.
+
+stats() (GET /cards/ingest-stats, and /metrics) reports fetches by result,
+bytes downloaded and bytes saved by 304s (the size of the page last time),
+items parsed per busy second and cards inserted.
+
+Run it in one process only: either set ANNOUNCEMENT_FEEDS for a
+single-worker uvicorn (the lifespan hook starts it), or leave it unset there
+and run `python -m app.feed_ingest` next to the API.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .card_ingest import BATCH_SIZE, BulkIngest
+from .db import SessionLocal
+from .feed_parser import parse_feed
+from .metrics import stage
+from .paths import CACHE_DIR
+
+POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "60"))
+CONNECTIONS = int(os.getenv("INGEST_CONNECTIONS", "16"))
+PER_HOST = int(os.getenv("INGEST_PER_HOST", "2"))
+TIMEOUT_SECONDS = float(os.getenv("INGEST_TIMEOUT_SECONDS", "30"))
+# 0 parses in a thread instead of a process pool (small feeds, tests)
+PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(min(2, os.cpu_count() or 1))))
+USER_AGENT = os.getenv("INGEST_USER_AGENT", "Mozilla/5.0 (compatible; MarketNews/0.3)")
+VALIDATORS_PATH = os.path.join(CACHE_DIR, "feed-validators.json")
+# pages larger than this are refused (a misconfigured URL pointing at a download)
+MAX_PAGE_BYTES = 20 * 1024 * 1024
+# window for the cards-per-minute figure in stats()
+RATE_WINDOW_SECONDS = 60.0
+
+_SPLIT_RE = re.compile(r"[,\s]+")
+
+
+@dataclass(frozen=True)
+class Feed:
+    source: str   # Card.source of its rows, e.g. "NSE"
+    url: str
+
+
+def parse_feeds(spec: str) -> List[Feed]:
+    """Feeds from a "SOURCE=URL, SOURCE=URL" string. Raises ValueError for an entry without SOURCE=."""
+    feeds = []
+    for entry in filter(None, _SPLIT_RE.split(spec or "")):
+        source, sep, url = entry.partition("=")
+        if not sep or not source or not url.startswith(("http://", "https://")):
+            raise ValueError(f"Invalid ANNOUNCEMENT_FEEDS entry '{entry}' (expected SOURCE=https://...)")
+        feeds.append(Feed(source.strip().upper(), url.strip()))
+    return feeds
+
+
+FEEDS = parse_feeds(os.getenv("ANNOUNCEMENT_FEEDS", ""))
+
+
+class FeedError(Exception):
+    """A feed page that could not be fetched or parsed this round."""
+
+
+class FeedIngester:
+    """
+    Polls feeds into the cards table; see the module docstring.
+
+        ingester = FeedIngester([Feed("NSE", "http://127.0.0.1:8766/nse.json")])
+        ingester.start()        # in a running loop
+        ...
+        await ingester.stop()
+
+    run_once() polls every feed once, for scripts and benchmarks.
+    """
+
+    def __init__(
+        self,
+        feeds: List[Feed],
+        poll_seconds: float = POLL_SECONDS,
+        connections: int = CONNECTIONS,
+        per_host: int = PER_HOST,
+        parse_workers: int = PARSE_WORKERS,
+        batch_size: int = BATCH_SIZE,
+        validators_path: Optional[str] = VALIDATORS_PATH,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.feeds = list(feeds)
+        self.poll_seconds = poll_seconds
+        self.connections = max(1, connections)
+        self.per_host = max(1, per_host)
+        self.parse_workers = max(0, parse_workers)
+        self.batch_size = max(1, batch_size)
+        self.validators_path = validators_path
+        self._session_factory = session_factory
+        self._session = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        # url -> {"etag", "last_modified", "sha256", "bytes"} of the last page downloaded
+        self._validators: Dict[str, Dict[str, Any]] = self._load_validators()
+        self._validators_dirty = False
+        self._feed_status: Dict[str, Dict[str, Any]] = {}
+        self._recent: Deque[Tuple[float, int]] = deque()  # (monotonic, cards inserted) inside RATE_WINDOW_SECONDS
+        self.rounds = 0
+        self.fetched = 0          # 200 responses that were parsed
+        self.not_modified = 0     # 304 responses
+        self.unchanged = 0        # 200 responses with the same body as last time
+        self.errors = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self.items = 0            # rows parsed
+        self.inserted = 0
+        self.duplicates = 0       # rows already stored (or repeated within a round)
+        self.invalid = 0          # rows CardIn rejected
+        self.last_error: Optional[str] = None
+        self._busy_seconds = 0.0
+
+    # -----------------------
+    # conditional request state
+    # -----------------------
+    def _load_validators(self) -> Dict[str, Dict[str, Any]]:
+        if not self.validators_path:
+            return {}
+        try:
+            with open(self.validators_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_validators(self) -> None:
+        if not self.validators_path or not self._validators_dirty:
+            return
+        self._validators_dirty = False
+        os.makedirs(os.path.dirname(self.validators_path), exist_ok=True)
+        tmp = f"{self.validators_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._validators, f)
+        os.replace(tmp, self.validators_path)
+
+    # -----------------------
+    # fetching
+    # -----------------------
+    def _client(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            # created lazily: the session binds to the running loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections, limit_per_host=self.per_host),
+                timeout=aiohttp.ClientTimeout(total=TIMEOUT_SECONDS),
+                headers={"User-Agent": USER_AGENT, "Accept": "application/json, text/html, application/rss+xml;q=0.9, */*;q=0.8"},
+            )
+        return self._session
+
+    async def _fetch(self, feed: Feed) -> Optional[Tuple[bytes, Optional[str]]]:
+        """(body, content type) of a changed page, None when it is unchanged. Raises FeedError."""
+        import aiohttp
+
+        known = self._validators.get(feed.url, {})
+        headers = {}
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+        try:
+            async with self._client().get(feed.url, headers=headers) as resp:
+                if resp.status == 304:
+                    self.not_modified += 1
+                    self.bytes_saved += known.get("bytes", 0)
+                    return None
+                if resp.status != 200:
+                    raise FeedError(f"HTTP {resp.status}")
+                if (resp.content_length or 0) > MAX_PAGE_BYTES:
+                    raise FeedError(f"page of {resp.content_length} bytes is over {MAX_PAGE_BYTES}")
+                body = await resp.read()
+                etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                content_type = resp.headers.get("Content-Type")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FeedError(f"{type(e).__name__}: {e}") from e
+
+        self.bytes_downloaded += len(body)
+        digest = hashlib.sha256(body).hexdigest()
+        unchanged = digest == known.get("sha256")
+        self._validators[feed.url] = {"etag": etag, "last_modified": last_modified, "sha256": digest, "bytes": len(body)}
+        self._validators_dirty = True
+        if unchanged:
+            self.unchanged += 1
+            return None
+        self.fetched += 1
+        return body, content_type
+
+    # -----------------------
+    # parsing
+    # -----------------------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the API process runs threads (watchers, other services)
+            self._pool = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def _parse(self, feed: Feed, body: bytes, content_type: Optional[str]) -> List[Dict[str, Any]]:
+        try:
+            with stage("feed_parse"):
+                if not self.parse_workers:
+                    return await asyncio.to_thread(parse_feed, body, content_type, feed.source, feed.url)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor(), parse_feed, body, content_type, feed.source, feed.url)
+        except BrokenProcessPool as e:
+            # a worker died: start a new pool next time; the page is retried next round
+            self._pool = None
+            self._validators.pop(feed.url, None)
+            raise FeedError(f"parser pool broke: {e}") from e
+        except Exception as e:
+            # forget the page, so it is downloaded and parsed again (say, after a parser fix)
+            # instead of answering 304 / unchanged from now on
+            self._validators.pop(feed.url, None)
+            raise FeedError(f"unparseable page: {type(e).__name__}: {e}") from e
+
+    async def _poll(self, feed: Feed) -> List[Dict[str, Any]]:
+        """New-or-not rows of one feed ([] when unchanged or failed); failures are recorded, not raised."""
+        status: Dict[str, Any] = {"source": feed.source, "polled_at": time.time()}
+        try:
+            with stage("feed_fetch"):
+                page = await self._fetch(feed)
+            if page is None:
+                status["result"] = "unchanged"
+                rows: List[Dict[str, Any]] = []
+            else:
+                rows = await self._parse(feed, *page)
+                status["result"] = "fetched"
+                status["items"] = len(rows)
+        except FeedError as e:
+            self.errors += 1
+            self.last_error = f"{feed.url}: {e}"
+            status.update(result="error", error=str(e))
+            print(f"Feed {feed.source} {feed.url} failed: {e}")
+            rows = []
+        self._feed_status[feed.url] = status
+        return rows
+
+    # -----------------------
+    # writing (worker thread)
+    # -----------------------
+    def _write(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self._session_factory() as session:
+            ingest = BulkIngest(session, self.batch_size)
+            for row in rows:
+                ingest.add(row)
+                if ingest.full:
+                    ingest.flush()
+            report = ingest.finish()
+        for result in report["results"]:
+            if result["status"] == "error":
+                print(f"Feed row rejected: {result['detail']}")
+        return report
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Poll every feed once and store the new rows. Returns the round's items, inserted, duplicates and seconds."""
+        started = time.perf_counter()
+        pages = await asyncio.gather(*(self._poll(feed) for feed in self.feeds))
+        rows = [row for page in pages for row in page]
+        report = {"inserted": 0, "skipped": 0, "errors": 0}
+        if rows:
+            try:
+                report = await asyncio.to_thread(self._write, rows)
+            except Exception:
+                # forget these pages' validators, so the next round downloads and writes them again
+                for feed, page in zip(self.feeds, pages):
+                    if page:
+                        self._validators.pop(feed.url, None)
+                raise
+        await asyncio.to_thread(self._save_validators)
+
+        seconds = time.perf_counter() - started
+        self.rounds += 1
+        self.items += len(rows)
+        self.inserted += report["inserted"]
+        self.duplicates += report["skipped"]
+        self.invalid += report["errors"]
+        self._recent.append((time.monotonic(), report["inserted"]))
+        self._busy_seconds += seconds
+        return {"items": len(rows), "inserted": report["inserted"], "duplicates": report["skipped"], "seconds": round(seconds, 4)}
+
+    # -----------------------
+    # background task
+    # -----------------------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Feed ingest round failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        """Start the background task on the running loop (no-op if it is already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="feed-ingest")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._save_validators()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW_SECONDS:
+            self._recent.popleft()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "feeds": len(self.feeds),
+            "poll_seconds": self.poll_seconds,
+            "connections": self.connections,
+            "per_host": self.per_host,
+            "parse_workers": self.parse_workers,
+            "rounds": self.rounds,
+            "fetched": self.fetched,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_saved": self.bytes_saved,
+            "items": self.items,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "items_per_second": round(self.items / self._busy_seconds, 1) if self._busy_seconds else None,
+            "cards_per_minute": round(sum(n for _t, n in self._recent) * 60.0 / RATE_WINDOW_SECONDS, 1),
+            "last_error": self.last_error,
+            "by_feed": dict(self._feed_status),
+        }
+
+
+# process-wide ingester, None unless ANNOUNCEMENT_FEEDS is set; main's lifespan starts it
+feed_ingester: Optional[FeedIngester] = FeedIngester(FEEDS) if FEEDS else None
+
+
+async def _main() -> None:
+    import argparse
+
+    from . import db
+
+    ap = argparse.ArgumentParser(description="Poll ANNOUNCEMENT_FEEDS into the cards table.")
+    ap.add_argument("--once", action="store_true", help="poll every feed once and exit")
+    args = ap.parse_args()
+    if not FEEDS:
+        raise SystemExit("ANNOUNCEMENT_FEEDS is not set")
+
+    db.init_db()
+    ingester = FeedIngester(FEEDS)
+    print(f"Feed ingester: {len(ingester.feeds)} feeds, poll every {ingester.poll_seconds:.0f} s, "
+          f"{ingester.per_host} per host, {ingester.parse_workers} parse workers")
+    try:
+        if args.once:
+            print(await ingester.run_once())
+            return
+        ingester.start()
+        while True:
+            await asyncio.sleep(30)
+            print(ingester.stats())
+    finally:
+        await ingester.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
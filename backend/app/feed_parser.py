@@ -0,0 +1,230 @@
+# ~/marketnews-app/backend/app/feed_parser.py
+"""
+Announcement feed pages -> card rows.
+
+parse_feed() runs in the ingester's worker processes (see feed_ingest), so
+this module imports nothing from the app: a spawned worker loads it without
+building database engines. Three page shapes are understood:
+
+  json  NSE-style API lists ([{...}] or {"data": [...]}) and BSE-style
+        {"Table": [...]}; fields are looked up by the aliases in JSON_FIELDS
+  rss   <item> elements (title, link, description, pubDate)
+  html  announcement tables; columns are matched on their header text
+        (HTML_COLUMNS), else company is the first cell and the text the
+        longest one
+
+Each row is a dict CardIn accepts: source, company, event_type, raw_text,
+url, published_at and metadata {"symbol", "feed"}. Rows with neither a url
+nor any text are dropped. published_at is naive UTC, like every DateTime
+column (models.utc_now): times with an offset are converted, and times
+without one are taken as exchange time (EXCHANGE_TZ, IST).
+"""
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+
+# card field -> keys tried in order, across the NSE and BSE JSON shapes
+JSON_FIELDS = {
+    "symbol": ("symbol", "SCRIP_CD", "scrip_cd", "scrip"),
+    "company": ("sm_name", "SLONGNAME", "companyName", "company"),
+    "event_type": ("desc", "CATEGORYNAME", "category", "subject"),
+    "raw_text": ("attchmntText", "HEADLINE", "NEWSSUB", "headline", "text", "details"),
+    "url": ("attchmntFile", "ATTACHMENTNAME", "NSURL", "url", "link"),
+    "published_at": ("an_dt", "sort_date", "NEWS_DT", "DT_TM", "date", "published_at"),
+}
+# card field -> words that identify its column in a table header. A header
+# equal to one of them wins; otherwise the first field (in this order) whose
+# word appears as a whole word, so "Announcement Date" is a date, not text
+HTML_COLUMNS = (
+    ("symbol", ("symbol", "scrip", "security code")),
+    ("company", ("company", "name")),
+    ("published_at", ("broadcast", "date", "time")),
+    ("event_type", ("subject", "category", "purpose")),
+    ("url", ("attachment", "file", "pdf")),
+    ("raw_text", ("details", "headline", "announcement", "description")),
+)
+DATE_FORMATS = (
+    "%d-%b-%Y %H:%M:%S", "%d-%b-%Y %H:%M", "%d-%b-%Y",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%d %b %Y %H:%M:%S", "%d %b %Y",
+)
+# the exchanges publish times without an offset in Indian Standard Time (no DST)
+EXCHANGE_TZ = timezone(timedelta(hours=5, minutes=30))
+# longer texts are cut; the exchange pages carry a paragraph at most, attachments hold the rest
+MAX_TEXT_CHARS = 20000
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = _WS_RE.sub(" ", str(value)).strip()
+    return text[:MAX_TEXT_CHARS] or None
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """
+    Naive UTC datetime from the formats the exchanges use (ISO, 17-Oct-2026
+    10:15:00, RFC 822...), else None. Times without an offset are EXCHANGE_TZ.
+    """
+    text = _clean(value)
+    if not text:
+        return None
+    dt = None
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                dt = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            try:
+                dt = parsedate_to_datetime(text)
+            except (TypeError, ValueError, IndexError):
+                return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=EXCHANGE_TZ)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _row(source: str, feed_url: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    url = _clean(fields.get("url"))
+    raw_text = _clean(fields.get("raw_text"))
+    if not url and not raw_text:
+        return None
+    return {
+        "source": source,
+        "company": _clean(fields.get("company")),
+        "event_type": _clean(fields.get("event_type")),
+        "raw_text": raw_text,
+        "url": urljoin(feed_url, url) if url else None,
+        "published_at": parse_datetime(fields.get("published_at")),
+        "metadata": {"symbol": _clean(fields.get("symbol")), "feed": feed_url},
+    }
+
+
+# -----------------------
+# page shapes
+# -----------------------
+def parse_json(body: bytes, source: str, feed_url: str) -> List[Dict[str, Any]]:
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = next((payload[k] for k in ("data", "Table", "items", "announcements") if isinstance(payload.get(k), list)), [])
+    rows = []
+    for item in payload if isinstance(payload, list) else []:
+        if not isinstance(item, dict):
+            continue
+        fields = {
+            field: next((item[k] for k in keys if item.get(k) not in (None, "")), None)
+            for field, keys in JSON_FIELDS.items()
+        }
+        row = _row(source, feed_url, fields)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def parse_rss(body: bytes, source: str, feed_url: str) -> List[Dict[str, Any]]:
+    root = ElementTree.fromstring(body)
+    rows = []
+    for item in root.iter("item"):
+        title = item.findtext("title")
+        row = _row(source, feed_url, {
+            "company": title,
+            "raw_text": item.findtext("description") or title,
+            "url": item.findtext("link"),
+            "published_at": item.findtext("pubDate"),
+        })
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def _header_columns(headers: List[str]) -> Dict[str, int]:
+    """card field -> column index, from header cell texts; the first column wins for each field."""
+    cells = [" ".join(_WORD_RE.findall(h.lower())) for h in headers]
+    columns: Dict[str, int] = {}
+    for field, words in HTML_COLUMNS:
+        exact = next((i for i, cell in enumerate(cells) if cell in words), None)
+        if exact is not None:
+            columns[field] = exact
+    matched = set(columns.values())
+    for i, cell in enumerate(cells):
+        if i in matched:
+            continue
+        for field, words in HTML_COLUMNS:
+            if field not in columns and any(f" {w} " in f" {cell} " for w in words):
+                columns[field] = i
+                break
+    return columns
+
+
+def parse_html(body: bytes, source: str, feed_url: str) -> List[Dict[str, Any]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, "html.parser")
+    rows = []
+    for table in soup.find_all("table"):
+        columns: Dict[str, int] = {}
+        for tr in table.find_all("tr"):
+            headers = tr.find_all("th")
+            if headers:
+                columns = _header_columns([th.get_text(" ", strip=True) for th in headers])
+                continue
+            cells = tr.find_all("td")
+            if len(cells) < 2:
+                continue
+            texts = [cell.get_text(" ", strip=True) for cell in cells]
+            link = tr.find("a", href=True)
+            if columns:
+                fields = {field: texts[i] for field, i in columns.items() if i < len(texts)}
+                if "url" in columns and columns["url"] < len(cells):
+                    anchor = cells[columns["url"]].find("a", href=True)
+                    fields["url"] = anchor["href"] if anchor else None
+                elif link is not None:
+                    fields["url"] = link["href"]
+            else:
+                fields = {
+                    "company": texts[0],
+                    "raw_text": max(texts[1:], key=len),
+                    "url": link["href"] if link is not None else None,
+                    "published_at": next((t for t in texts if parse_datetime(t)), None),
+                }
+            row = _row(source, feed_url, fields)
+            if row is not None:
+                rows.append(row)
+    return rows
+
+
+PARSERS = {"json": parse_json, "rss": parse_rss, "html": parse_html}
+
+
+def detect_kind(body: bytes, content_type: Optional[str]) -> str:
+    """json / rss / html from the Content-Type, else from the first bytes of the body."""
+    ctype = (content_type or "").lower()
+    if "json" in ctype:
+        return "json"
+    if "rss" in ctype or "xml" in ctype:
+        return "rss"
+    if "html" in ctype:
+        return "html"
+    head = body[:512].lstrip().lower()
+    if head[:1] in (b"{", b"["):
+        return "json"
+    if head.startswith(b"<?xml") or b"<rss" in head:
+        return "rss"
+    return "html"
+
+
+def parse_feed(body: bytes, content_type: Optional[str], source: str, feed_url: str) -> List[Dict[str, Any]]:
+    """Card rows of one fetched page, in page order. Raises on a page that is not valid for its kind."""
+    return PARSERS[detect_kind(body, content_type)](body, source, feed_url)
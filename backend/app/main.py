@@ -1,38 +1,82 @@
 # ~/marketnews-app/backend/app/main.py
-import os
-import re
-from typing import Generator, Any, Dict
+import asyncio
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException, Request
+# first: its clock measures how long the imports below and the warmup take
+from .startup import WAIT as STARTUP_WAIT, step_samples, warmup
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 
-# import DB & models if you use them (keeps your existing endpoints working)
-from . import db, models
+# import DB (db.init_db imports the models itself)
+from . import db, metrics
 
 # import routers
-from .routers import market_summary, announcements
+from .routers import market_summary, announcements, cards
+
+# shared symbol master (latest EOD file), used by every router
+from .symbol_master import snapshot_cache, symbol_master_service
+from .compression import CompressionMiddleware
+from .static_assets import CachedStaticFiles, asset_versions, static_images_assets, uploads_assets
+from .feed_ingest import feed_ingester
+from .summarizer import summary_worker
+from .thumbnails import thumbnail_service
+from .upload_extract import ENABLED as UPLOAD_EXTRACT_ENABLED, upload_extractor
+from .uploads_index import get_uploads_index
+from .announcement_stream import announcement_broadcaster
 
 # -----------------------
-# Path helpers (project layout)
-# backend/
-#   app/           <-- this file lives here
-#   data/          <-- CSV files (eod_YYYY-MM-DD.csv)
-#   static/images/ <-- logos
-#   announcements/uploads/ <-- announcement images/PDFs
+# Path helpers (project layout, see paths.py; the directories are created by the warmup)
 # -----------------------
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-DATA_DIR = os.path.join(PROJECT_ROOT, "data")
-STATIC_IMAGES_DIR = os.path.join(PROJECT_ROOT, "static", "images")
-ANNOUNCEMENTS_UPLOADS_DIR = os.path.join(PROJECT_ROOT, "announcements", "uploads")
-
-# ensure directories exist
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(STATIC_IMAGES_DIR, exist_ok=True)
-os.makedirs(ANNOUNCEMENTS_UPLOADS_DIR, exist_ok=True)
-
-app = FastAPI(title="MarketNews API", version="0.3")
+from .paths import DATA_DIR, STATIC_IMAGES_DIR, ANNOUNCEMENTS_UPLOADS_DIR
+
+
+async def _warm_and_start() -> None:
+    # directories, schema, EOD snapshot + symbol index + summary bodies, uploads index, hash manifests (see startup.py)
+    await warmup.run()
+    # hash new and changed static files in the background, for the ?v= URLs
+    asset_versions.start()
+    # render thumbnails for existing and newly discovered uploads in the background
+    thumbnail_service.start(lambda: get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR))
+    # extract PDF/image text of new and changed uploads into cards in the background (see upload_extract.py)
+    if UPLOAD_EXTRACT_ENABLED:
+        upload_extractor.start(lambda: get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR))
+    # fill missing card summaries in the background when SUMMARY_BACKEND is set (see summarizer.py)
+    if summary_worker is not None:
+        summary_worker.start()
+    # poll exchange announcement feeds into cards when ANNOUNCEMENT_FEEDS is set (see feed_ingest.py)
+    if feed_ingester is not None:
+        feed_ingester.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # by default nothing is served until warmed up; STARTUP_WAIT=0 serves at once and /ready says when
+    warming = None
+    if STARTUP_WAIT:
+        await _warm_and_start()
+    else:
+        warming = asyncio.create_task(_warm_and_start())
+    yield
+    # /ready answers 503 from here on, so load balancers drain this process first
+    warmup.stopping = True
+    if warming is not None:
+        warming.cancel()
+        try:
+            await warming
+        except (asyncio.CancelledError, Exception):
+            pass
+    if feed_ingester is not None:
+        await feed_ingester.stop()
+    if summary_worker is not None:
+        await summary_worker.stop()
+    upload_extractor.stop()
+    thumbnail_service.stop()
+    asset_versions.stop()
+
+
+app = FastAPI(title="MarketNews API", version="0.3", lifespan=lifespan)
 
 # CORS - allow all during development (tighten later)
 app.add_middleware(
@@ -41,26 +85,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[cards.NEXT_CURSOR_HEADER],
 )
+# brotli/gzip for JSON and other text bodies above COMPRESS_MIN_BYTES (see compression.py)
+app.add_middleware(CompressionMiddleware)
+# outermost: latency by route template, the in-flight gauge, X-Profile sampling (see metrics.py)
+app.add_middleware(metrics.MetricsMiddleware)
 
-# mount static folders
-app.mount("/static/images", StaticFiles(directory=STATIC_IMAGES_DIR), name="static_images")
-app.mount("/announcements/file", StaticFiles(directory=ANNOUNCEMENTS_UPLOADS_DIR), name="announcements_files")
+# mount static folders (created by the warmup, hence check_dir=False); links with ?v=<content hash> are served as immutable (see static_assets.py)
+app.mount("/static/images", CachedStaticFiles(assets=static_images_assets, check_dir=False), name="static_images")
+app.mount("/announcements/file", CachedStaticFiles(assets=uploads_assets, check_dir=False), name="announcements_files")
 
 # include routers
 app.include_router(market_summary.router)
 app.include_router(announcements.router)
+app.include_router(cards.router)
 
 
 # -----------------------
-# DB session dependency
+# DB session dependency (see db.get_db)
 # -----------------------
-def get_db() -> Generator:
-    database = db.SessionLocal()
-    try:
-        yield database
-    finally:
-        database.close()
+get_db = db.get_db
 
 
 # -----------------------
@@ -73,25 +118,99 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process answers. Readiness is /ready."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready_check():
+    """200 once the warmup is done (503 before it and while shutting down), with each step's status and seconds."""
+    report = warmup.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 # -----------------------
-# Card endpoints (from DB)
+# Metrics (Prometheus text format, see metrics.py)
 # -----------------------
-@app.post("/cards")
-def create_card(card: dict, database=Depends(get_db)):
-    new_card = models.Card(**card)
-    database.add(new_card)
-    database.commit()
-    database.refresh(new_card)
-    return {"id": new_card.id, "message": "Card created"}
-
-
-@app.get("/cards")
-def list_cards(database=Depends(get_db)):
-    cards = database.query(models.Card).all()
-    return cards
+def _cache_samples():
+    eod_stats = snapshot_cache.stats()
+    samples = [
+        ({"cache": "eod_snapshot", "result": "hit"}, eod_stats["hits"]),
+        ({"cache": "eod_snapshot", "result": "miss"}, eod_stats["misses"] + eod_stats["reloads"]),
+    ]
+    if summary_worker is not None:
+        samples += [
+            ({"cache": "summary_text", "result": "hit"}, summary_worker.cache_hits),
+            ({"cache": "summary_text", "result": "miss"}, summary_worker.generated + summary_worker.failures),
+        ]
+    return samples
+
+
+def _snapshot_info():
+    s = snapshot_cache.stats()
+    if s["version"] is None:
+        return []
+    return [({"version": s["version"], "csv_filename": s["csv_filename"], "source": s["source"]}, 1)]
+
+
+def _uploads_stats():
+    return get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR).stats()
+
+
+def _feed_fetches():
+    if feed_ingester is None:
+        return []
+    s = feed_ingester.stats()
+    return [({"result": r}, s[key]) for r, key in (
+        ("fetched", "fetched"), ("not_modified", "not_modified"), ("unchanged", "unchanged"), ("error", "errors"))]
+
+
+# extra samples for the cache_requests_total family from services that count their own
+metrics.registry.collector("cache_requests_total", "counter", "", _cache_samples)
+for _name, _kind, _help, _collect in (
+    ("eod_snapshot_info", "gauge", "Loaded EOD snapshot (value 1); the version label changes with the file.", _snapshot_info),
+    ("eod_snapshot_age_seconds", "gauge", "Seconds since the EOD snapshot was loaded.", lambda: [({}, snapshot_cache.stats()["age_seconds"])]),
+    ("eod_snapshot_rows", "gauge", "Rows in the loaded EOD snapshot.", lambda: [({}, snapshot_cache.stats()["rows"])]),
+    ("eod_snapshot_load_seconds", "gauge", "Time the current EOD snapshot took to load.", lambda: [({}, snapshot_cache.stats()["load_seconds"])]),
+    ("eod_snapshot_errors_total", "counter", "EOD snapshot loads that failed.", lambda: [({}, snapshot_cache.stats()["errors"])]),
+    ("symbol_master_swaps_total", "counter", "Symbol master rebuilds after an EOD file change.", lambda: [({}, symbol_master_service.swaps)]),
+    ("symbol_master_errors_total", "counter", "Symbol master reloads that failed (the previous one kept serving).", lambda: [({}, symbol_master_service.errors)]),
+    ("symbol_master_symbols", "gauge", "Symbols in the current symbol master.", lambda: [({}, symbol_master_service.stats()["symbols"])]),
+    ("uploads_files", "gauge", "Files in the uploads index.", lambda: [({}, _uploads_stats()["files"])]),
+    ("uploads_scans_total", "counter", "Full directory scans of the uploads folder.", lambda: [({}, _uploads_stats()["scans"])]),
+    ("thumbnails_pending", "gauge", "Thumbnail renders queued or running.", lambda: [({}, thumbnail_service.stats()["pending"])]),
+    ("thumbnails_rendered_total", "counter", "Thumbnails rendered.", lambda: [({}, thumbnail_service.rendered)]),
+    ("upload_extract_backlog", "gauge", "Uploads whose text has not been extracted yet.", lambda: [({}, upload_extractor.backlog)]),
+    ("upload_extract_files_total", "counter", "Uploads processed by text extraction, by result.", lambda: [
+        ({"result": "text"}, upload_extractor.extracted), ({"result": "no_text"}, upload_extractor.no_text),
+        ({"result": "failed"}, upload_extractor.failed)]),
+    ("ready", "gauge", "1 once the startup warmup is done and until shutdown begins, else 0.", lambda: [({}, int(warmup.ready))]),
+    ("startup_step_seconds", "gauge", "Time each startup warmup step took.", step_samples),
+    ("stream_subscribers", "gauge", "Open announcement streams.", lambda: [({}, announcement_broadcaster.stats()["subscribers"])]),
+    ("summary_queue_depth", "gauge", "Cards waiting for a summary.", lambda: [({}, summary_worker.queue_depth if summary_worker else None)]),
+    ("feed_fetches_total", "counter", "Announcement feed polls by result (fetched, not_modified, unchanged, error).", _feed_fetches),
+    ("feed_bytes_saved_total", "counter", "Page bytes not downloaded thanks to 304 responses.", lambda: [({}, feed_ingester.bytes_saved if feed_ingester else 0)]),
+    ("feed_cards_inserted_total", "counter", "Cards inserted from announcement feeds.", lambda: [({}, feed_ingester.inserted if feed_ingester else 0)]),
+):
+    metrics.registry.collector(_name, _kind, _help, _collect)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/profiles/{profile_id}", include_in_schema=False)
+def metrics_profile(profile_id: str):
+    """Collapsed stacks of a request sent with X-Profile: 1 (its X-Profile-Id), while METRICS_PROFILING=1."""
+    profile = metrics.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found (only the last {metrics.MAX_PROFILES} are kept)")
+    return PlainTextResponse(profile["text"], headers={
+        "X-Profile-Path": profile["path"],
+        "X-Profile-Seconds": f"{profile['seconds']:.4f}",
+        "X-Profile-Samples": str(profile["samples"]),
+    })
 
 
 # -----------------------
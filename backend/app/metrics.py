@@ -0,0 +1,419 @@
+# ~/marketnews-app/backend/app/metrics.py
+"""
+Process metrics in the Prometheus text format, served at /metrics.
+
+  - MetricsMiddleware times every HTTP request by route template
+    (marketnews_http_request_duration_seconds, marketnews_http_requests_total)
+    and tracks requests in flight.
+  - stage("name") times an internal step into marketnews_stage_duration_seconds:
+    csv_discovery, eod_parse, ticker_resolve, uploads_scan, enrichment,
+    feed_fetch, feed_parse, text_extract (per upload, timed in the worker)
+    and db_query (every statement on an engine passed to instrument_engine).
+  - cache_events counts cache hits and misses by cache name. Services that
+    keep their own counters (snapshot cache, symbol master, thumbnails...)
+    are read at scrape time through collectors registered in main.
+
+No client library: Counter, Gauge and Histogram below cover what we use.
+Metrics are per process; with several uvicorn workers each one reports its
+own and Prometheus scrapes them as separate targets (or sums across them).
+
+Profiling: with METRICS_PROFILING=1, a request carrying "X-Profile: 1" (and
+X-Profile-Token matching METRICS_PROFILE_TOKEN, when that is set) is sampled
+by SamplingProfiler. The response gets an X-Profile-Id header, and
+/metrics/profiles/{id} returns the samples as collapsed stacks (one
+"frame;frame;frame count" line per stack, for flamegraph.pl or speedscope).
+"""
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PREFIX = "marketnews_"
+# seconds; request and stage latencies of this app sit between ~50 us and a few seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILING_ENABLED = os.getenv("METRICS_PROFILING", "0") == "1"
+PROFILE_TOKEN = os.getenv("METRICS_PROFILE_TOKEN", "")
+PROFILE_INTERVAL = float(os.getenv("METRICS_PROFILE_INTERVAL", "0.001"))
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# profiles kept for /metrics/profiles/{id}, oldest dropped first
+MAX_PROFILES = 32
+
+# (label pairs, value) lines a collector returns for one metric
+Samples = List[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# -----------------------
+# metric types
+# -----------------------
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(zip(self.labelnames, k))} {_number(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(zip(self.labelnames, k))} {_number(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (not cumulative) + overflow, sum]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        # first bucket whose upper bound holds value; len(buckets) is the +Inf overflow
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics owned here plus collectors read at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Tuple[str, str, str, Callable[[], Samples]]] = []
+
+    def add(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, name: str, kind: str, help: str, collect: Callable[[], Samples]) -> None:
+        """
+        Expose values a service already keeps (kind: counter or gauge);
+        collect() returns [(labels, value)]. A name that belongs to an owned
+        metric adds its samples to that family (e.g. more cache_requests_total).
+        """
+        self._collectors.append((PREFIX + name, kind, help, collect))
+
+    def _collect(self, name: str, collect: Callable[[], Samples]) -> List[str]:
+        try:
+            samples = collect()
+        except Exception as e:
+            # one broken collector must not take the whole scrape down
+            print(f"Metrics collector {name} failed: {e}")
+            return []
+        return [f"{name}{_labels(labels.items())} {_number(value)}" for labels, value in samples if value is not None]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        owned = {metric.name for metric in self._metrics}
+        for metric in self._metrics:
+            lines.extend(metric.render())
+            for name, _kind, _help, collect in self._collectors:
+                if name == metric.name:
+                    lines.extend(self._collect(name, collect))
+        for name, kind, help, collect in self._collectors:
+            if name in owned:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(self._collect(name, collect))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.add(Counter("http_requests_total", "HTTP requests by method, route template and status.", ("method", "route", "status")))
+http_duration = registry.add(Histogram("http_request_duration_seconds", "HTTP request latency until the last body byte, by route template.", ("method", "route")))
+http_in_flight = registry.add(Gauge("http_requests_in_flight", "HTTP requests being served.", ()))
+stage_duration = registry.add(Histogram("stage_duration_seconds", "Time spent in internal stages (csv_discovery, eod_parse, ticker_resolve, uploads_scan, enrichment, feed_fetch, feed_parse, text_extract, db_query).", ("stage",)))
+cache_events = registry.add(Counter("cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")))
+profiles_taken = registry.add(Counter("profiles_total", "Requests sampled by the profiler.", ()))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block into marketnews_stage_duration_seconds{stage=name}."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - started, name)
+
+
+def instrument_engine(engine, stage_name: str = "db_query") -> None:
+    """Time every statement run on a SQLAlchemy engine as a stage."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, _cursor, _statement, _parameters, _context, _executemany):
+        started = conn.info.get("metrics_started")
+        if started:
+            stage_duration.observe(time.perf_counter() - started.pop(), stage_name)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        started = conn.info.get("metrics_started") if conn is not None else None
+        if started:
+            started.pop()
+
+
+# -----------------------
+# sampling profiler
+# -----------------------
+# a thread whose innermost frame is in one of these is waiting, not working
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every other busy thread each `interval` seconds
+    while running. Sync endpoints run in threadpool threads and async ones on
+    the loop thread, so all threads are sampled; under concurrent load other
+    requests show up in the profile too. The sampler needs the GIL, so a
+    CPU-bound request is in practice sampled every sys.getswitchinterval()
+    (5 ms by default).
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Dict[str, int] = defaultdict(int)
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = 0.0
+        self.seconds = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="metrics-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                # skip this thread and idle ones (parked in a lock, queue or selector)
+                if ident == me or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(parts))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text: one 'root;...;leaf count' line per distinct stack, most frequent first."""
+        lines = [f"{stack} {n}" for stack, n in sorted(self.stacks.items(), key=lambda kv: -kv[1])]
+        return "\n".join(lines) + "\n"
+
+
+_profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_profile_ids = itertools.count(1)
+_profiles_lock = threading.Lock()
+
+
+def _keep_profile(profile_id: str, path: str, profiler: SamplingProfiler) -> None:
+    with _profiles_lock:
+        _profiles[profile_id] = {"path": path, "seconds": profiler.seconds, "samples": profiler.samples, "text": profiler.collapsed()}
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def _wants_profile(headers: Dict[bytes, bytes]) -> bool:
+    if headers.get(PROFILE_HEADER.encode()) not in (b"1", b"true"):
+        return False
+    return not PROFILE_TOKEN or headers.get(b"x-profile-token", b"").decode("latin-1") == PROFILE_TOKEN
+
+
+# -----------------------
+# ASGI middleware
+# -----------------------
+def _template_from_params(path: str, params: Dict[str, Any]) -> Optional[str]:
+    """path with each parameter's value replaced by {name}, from the right; None if one is not found."""
+    for name, value in params.items():
+        value = str(value)
+        cut = path.rfind("/" + value) + 1
+        end = cut + len(value)
+        if not value or cut == 0 or (end < len(path) and path[end] != "/"):
+            return None
+        path = f"{path[:cut]}{{{name}}}{path[end:]}"
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Times HTTP requests by route template (/market/summary/{ticker}, not the
+    raw path, so label cardinality stays bounded). The template is read from
+    the scope once the app has routed the request, so nothing is matched
+    twice; requests that matched no route are counted as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def route_template(scope, root_path: str = "") -> str:
+        """Template of the route that served scope; root_path is the scope's value before routing."""
+        route = scope.get("route")  # FastAPI's APIRoute puts itself here
+        template = getattr(route, "path_format", None) or getattr(route, "path", None)
+        if template:
+            return template
+        mounted = scope.get("root_path", "")
+        if mounted != root_path and mounted.startswith(root_path):
+            return mounted[len(root_path):] + "/{path}"  # StaticFiles and other mounted apps
+        endpoint = scope.get("endpoint")
+        if endpoint is not None:
+            # a plain Starlette Route (router.add_route): put the parameter names back
+            return _template_from_params(scope["path"], scope.get("path_params") or {}) or getattr(
+                endpoint, "__qualname__", "unmatched")
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status = {"code": 500}
+        profiler: Optional[SamplingProfiler] = None
+        profile_id: Optional[str] = None
+        if PROFILING_ENABLED and _wants_profile(dict(scope.get("headers") or [])):
+            profile_id = str(next(_profile_ids))
+            profiler = SamplingProfiler()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if profile_id is not None:
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (PROFILE_ID_HEADER.lower().encode(), profile_id.encode())
+                    ])
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            route = self.route_template(scope, root_path)
+            http_duration.observe(elapsed, method, route)
+            http_requests.inc(method, route, str(status["code"]))
+            if profiler is not None:
+                profiler.stop()
+                profiles_taken.inc()
+                _keep_profile(profile_id, scope["path"], profiler)
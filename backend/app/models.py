@@ -1,7 +1,45 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON
-from sqlalchemy.sql import func
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Boolean, JSON, Index, inspect, text
 from .db import Base, engine
 
+_WS_RE = re.compile(r"\s+")
+
+
+def utc_now() -> datetime:
+    """
+    Default for every DateTime column and for writers that fill one in: naive
+    UTC, whole seconds. Going through the DateTime type (instead of the
+    database's now()) keeps one stored format, "YYYY-MM-DD HH:MM:SS.ffffff" on
+    SQLite, so string comparisons such as the GET /cards cursor are ordered.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """A datetime for a DateTime column: aware values converted to naive UTC, naive ones taken as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def card_content_hash(url: Optional[str], raw_text: Optional[str]) -> str:
+    """
+    Dedup key of a card: sha256 over the normalized url and raw_text. Scheme and
+    host are lowercased and a trailing slash dropped; text whitespace is collapsed.
+    """
+    u = (url or "").strip()
+    if u:
+        parts = urlsplit(u)
+        u = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+    t = _WS_RE.sub(" ", (raw_text or "")).strip()
+    return hashlib.sha256(f"{u}\n{t}".encode("utf-8")).hexdigest()
+
+
 class Card(Base):
     __tablename__ = "cards"
     id = Column(Integer, primary_key=True, index=True)
@@ -11,9 +49,151 @@ class Card(Base):
     raw_text = Column(Text)                    # original announcement text
     summary = Column(Text, nullable=True)      # short summary (generated later)
     url = Column(String, nullable=True)        # source link
-    published_at = Column(DateTime(timezone=False), default=func.now())
+    published_at = Column(DateTime(timezone=False), default=utc_now)
     approved = Column(Boolean, default=False)  # whether admin approved the card
     metadata_json = Column("metadata", JSON, nullable=True)  # extra info as JSON (attribute renamed to avoid conflict)
+    content_hash = Column(String(64), nullable=True)  # card_content_hash(url, raw_text); unique when set
+
+    # GET /cards pages newest-first on (published_at, id), optionally filtered
+    # on one equality column; each index serves one of those query shapes
+    __table_args__ = (
+        Index("ix_cards_published_id", "published_at", "id"),
+        Index("ix_cards_approved_published_id", "approved", "published_at", "id"),
+        Index("ix_cards_source_published_id", "source", "published_at", "id"),
+        Index("ix_cards_event_type_published_id", "event_type", "published_at", "id"),
+        Index("ux_cards_content_hash", "content_hash", unique=True),
+        # upload cards are upserted by their file URL (see upload_extract)
+        Index("ix_cards_url", "url"),
+    )
+
+
+class SummaryCache(Base):
+    """Generated summaries by raw_text hash (see summarizer), so a repeated text is summarized once."""
+    __tablename__ = "summary_cache"
+    text_hash = Column(String(64), primary_key=True)  # summary_text_hash(raw_text)
+    summary = Column(Text, nullable=False)
+    model = Column(String, nullable=True)             # backend that wrote it
+    created_at = Column(DateTime(timezone=False), default=utc_now)
+
+
+class UploadText(Base):
+    """Text extraction of an upload by content hash (see upload_extract), so each file version is processed once."""
+    __tablename__ = "upload_texts"
+    content_hash = Column(String(64), primary_key=True)  # sha256 of the file
+    filename = Column(String, index=True)              # upload it was extracted from (the latest, for copies)
+    status = Column(String, nullable=False)            # done / no_text / failed
+    method = Column(String, nullable=True)             # pdf_text / ocr / none
+    pages = Column(Integer, nullable=True)
+    chars = Column(Integer, nullable=True)
+    seconds = Column(Float, nullable=True)             # extraction time in the worker
+    card_id = Column(Integer, nullable=True)           # card holding the text, when done
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=False), default=utc_now)
+
+
+def summary_text_hash(raw_text: Optional[str]) -> str:
+    """Cache key of a text to summarize: sha256 of raw_text with whitespace collapsed."""
+    return hashlib.sha256(_WS_RE.sub(" ", raw_text or "").strip().encode("utf-8")).hexdigest()
+
+
+def _migrate_content_hash() -> None:
+    """
+    Add cards.content_hash to databases created before it existed and backfill
+    it. Rows that duplicate an earlier row keep NULL, so the unique index can
+    still be built.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns("cards")}
+    if "content_hash" in columns:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE cards ADD COLUMN content_hash VARCHAR(64)"))
+        seen = set()
+        updates = []
+        for card_id, url, raw_text in conn.execute(text("SELECT id, url, raw_text FROM cards ORDER BY id")):
+            h = card_content_hash(url, raw_text)
+            if h not in seen:
+                seen.add(h)
+                updates.append({"id": card_id, "h": h})
+        if updates:
+            conn.execute(text("UPDATE cards SET content_hash = :h WHERE id = :id"), updates)
+
+
+def _migrate_published_at() -> None:
+    """
+    Rows written by the old func.now() default hold "YYYY-MM-DD HH:MM:SS",
+    which sorts before the same second in the DateTime format. Rewrite them to
+    that format. A no-op once done (the check is a covering index scan).
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE cards SET published_at = replace(published_at, 'T', ' ') || '.000000' "
+            "WHERE length(published_at) = 19"
+        ))
+
+# Full-text index over cards for GET /cards/search (SQLite FTS5). It is an
+# external-content table: it stores only the index, reads text from cards, and
+# is kept in sync by the triggers below. FTS_COLUMNS order matters for bm25 weights.
+FTS_TABLE = "cards_fts"
+FTS_COLUMNS = ("company", "event_type", "summary", "raw_text")
+
+_FTS_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {", ".join(FTS_COLUMNS)},
+        content='cards', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE OF {", ".join(FTS_COLUMNS)} ON cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+    END""",
+)
+
+
+def _ensure_fts() -> bool:
+    """
+    Create the FTS5 table and triggers when missing (indexing existing rows once).
+    Returns False when the database is not SQLite or SQLite lacks FTS5; search
+    then falls back to LIKE (see card_search).
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :t"), {"t": FTS_TABLE}
+            ).first() is not None
+            for ddl in _FTS_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except Exception as e:
+        print(f"FTS5 unavailable, card search falls back to LIKE: {e}")
+        return False
+    return True
+
+
+# set by create_schema(); card_search falls back to LIKE while False
+FTS_ENABLED = False
+
 
-# Create the table in the database
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+def create_schema() -> None:
+    """Create the tables, add newer columns and indexes to existing ones, and set up FTS (see db.init_db)."""
+    global FTS_ENABLED
+    Base.metadata.create_all(bind=engine)
+    _migrate_content_hash()
+    _migrate_published_at()
+    # create_all skips tables that already exist, so add any newer indexes to them
+    for index in Card.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    FTS_ENABLED = _ensure_fts()
@@ -0,0 +1,29 @@
+# ~/marketnews-app/backend/app/ndjson.py
+"""
+NDJSON (one JSON object per line) output for streaming endpoints.
+
+Lines are grouped into chunks of about CHUNK_BYTES. StreamingResponse
+iterates a sync generator through the threadpool, one hop per item, so one
+item per line would cost a thread switch per object. 64 KiB is a few hundred
+list entries, so the first ones still go out within milliseconds.
+"""
+import json
+from typing import Any, Iterable, Iterator
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CHUNK_BYTES = 64 * 1024
+# json.dumps() with options builds a new encoder per call; this one is reused
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def ndjson_chunks(objects: Iterable[Any], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Serialize objects as NDJSON, yielding about chunk_bytes at a time."""
+    buf = bytearray()
+    for obj in objects:
+        buf += _encoder.encode(obj).encode("utf-8")
+        buf += b"\n"
+        if len(buf) >= chunk_bytes:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
@@ -0,0 +1,27 @@
+# ~/marketnews-app/backend/app/paths.py
+"""
+Project layout, in one place so routers stop hardcoding their own copies.
+
+backend/
+  app/                    <-- code
+  data/                   <-- CSV files (eod_YYYY-MM-DD.csv)
+  static/images/          <-- logos
+  announcements/uploads/  <-- announcement images/PDFs
+  announcements/thumbs/   <-- generated thumbnails (see thumbnails.py)
+  .cache/                 <-- content-hash manifests (see static_assets.py)
+
+DATA_DIR, ANNOUNCEMENTS_UPLOADS_DIR, THUMBS_DIR and CACHE_DIR can be moved
+with the MARKETNEWS_DATA_DIR / MARKETNEWS_UPLOADS_DIR / MARKETNEWS_THUMBS_DIR /
+MARKETNEWS_CACHE_DIR environment variables.
+"""
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.getenv("MARKETNEWS_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+STATIC_IMAGES_DIR = os.path.join(PROJECT_ROOT, "static", "images")
+ANNOUNCEMENTS_UPLOADS_DIR = os.getenv(
+    "MARKETNEWS_UPLOADS_DIR", os.path.join(PROJECT_ROOT, "announcements", "uploads")
+)
+# outside the uploads folder, so generated files never show up as announcements
+THUMBS_DIR = os.getenv("MARKETNEWS_THUMBS_DIR", os.path.join(PROJECT_ROOT, "announcements", "thumbs"))
+CACHE_DIR = os.getenv("MARKETNEWS_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
@@ -1,15 +1,24 @@
 # ~/marketnews-app/backend/app/routers/announcements.py
+import asyncio
+import itertools
+import json
 import os
 import re
-import csv
-from typing import Dict, Any, List
-from fastapi import APIRouter, Request, HTTPException
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, Request, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 
-router = APIRouter(prefix="/announcements", tags=["announcements"])
+from ..announcement_stream import announcement_broadcaster, stream_batches
+from ..metrics import stage
+from ..ndjson import NDJSON_MEDIA_TYPE, ndjson_chunks
+from ..paths import ANNOUNCEMENTS_UPLOADS_DIR
+from ..static_assets import IMMUTABLE, logo_url, uploads_assets
+from ..symbol_master import SymbolMaster, get_symbol_master, symbol_master_service
+from ..thumbnails import DEFAULT_WIDTH, FORMATS, thumbnail_info, thumbnail_service
+from ..upload_extract import upload_extractor
+from ..uploads_index import CursorError, UploadEntry, decode_cursor, encode_cursor, get_uploads_index
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-DATA_DIR = os.path.join(PROJECT_ROOT, "data")
-ANNOUNCEMENTS_UPLOADS_DIR = os.path.join(PROJECT_ROOT, "announcements", "uploads")
+router = APIRouter(prefix="/announcements", tags=["announcements"])
 
 FNAME_DATE_RE = re.compile(r"20[0-9]{2}[-_][01][0-9][-_][0-3][0-9]")
 
@@ -17,61 +26,215 @@ def _extract_date_from_filename(fname: str) -> str:
     m = FNAME_DATE_RE.search(fname)
     return m.group(0) if m else "no-date"
 
-def _load_symbol_map() -> Dict[str, Dict[str, str]]:
+def enrich_upload(upload: UploadEntry, master: SymbolMaster, base: str) -> Dict[str, Any]:
+    """One list-enriched entry: the file plus the company guessed from its name."""
+    fname = upload.name
+    sym_guess = os.path.splitext(fname)[0].upper()
+    return {
+        "filename": fname,
+        "symbol": sym_guess,
+        "company": master.company(sym_guess) or sym_guess,
+        "download_url": uploads_assets.url(upload, base),
+        "logo_url": logo_url(sym_guess, base),
+        "filename_date": _extract_date_from_filename(fname),
+        "thumbnail": thumbnail_info(upload, base),
+    }
+
+@router.get("/list-enriched")
+def announcements_list_enriched(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="page size; omit for every file"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson: stream one entry per line"),
+    master: SymbolMaster = Depends(get_symbol_master),
+) -> Dict[str, Any]:
     """
-    Load mapping from Symbol → Description from latest CSV
+    List uploaded announcement files enriched with company name (from the shared symbol master),
+    newest first. Pass `limit` (and then `cursor`) to page through large folders.
+
+    format=ndjson streams the entries instead, one JSON object per line as
+    they are enriched, each with its own `cursor` to resume after it; memory
+    stays flat however large the folder. `limit` still caps the stream.
     """
-    mapping = {}
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    base = str(request.base_url).rstrip("/")
+    if format == "ndjson":
+        # walk -> enrich -> serialize, all lazy: StreamingResponse pulls chunks as it sends them
+        walk = get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR).walk(cursor)
+        if limit is not None:
+            walk = itertools.islice(walk, limit)
+        enriched = (dict(enrich_upload(upload, master, base), cursor=encode_cursor(upload)) for upload in walk)
+        return StreamingResponse(ndjson_chunks(enriched), media_type=NDJSON_MEDIA_TYPE)
     try:
-        csv_files = sorted(
-            [f for f in os.listdir(DATA_DIR) if f.endswith(".csv")],
-            reverse=True,
-        )
-        if not csv_files:
-            return mapping
-        latest_csv = os.path.join(DATA_DIR, csv_files[0])
-        with open(latest_csv, newline="", encoding="utf-8", errors="ignore") as fh:
-            reader = csv.DictReader(fh)
-            for row in reader:
-                sym = row.get("Symbol") or row.get("SYMBOL")
-                desc = row.get("Description") or row.get("Company") or row.get("Name")
-                if sym:
-                    mapping[sym.strip().upper()] = {
-                        "symbol": sym.strip().upper(),
-                        "company": desc.strip() if desc else sym.strip().upper(),
-                    }
+        index = get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR)
+        page, next_cursor = index.page(limit, cursor)
+        with stage("enrichment"):
+            entries: List[Dict[str, Any]] = [enrich_upload(upload, master, base) for upload in page]
+
+        return {"count": len(entries), "total": len(index), "next_cursor": next_cursor, "files": entries}
     except Exception as e:
-        print(f"Failed to load CSV symbol map: {e}")
-    return mapping
+        raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/list-enriched")
-def announcements_list_enriched(request: Request) -> Dict[str, Any]:
+
+# -----------------------
+# Thumbnails (see thumbnails.py)
+# -----------------------
+# how long a request waits for a thumbnail that is not rendered yet before falling back to the original
+THUMB_WAIT_SECONDS = 10.0
+
+@router.get("/thumb/{fname}")
+async def announcement_thumbnail(
+    fname: str,
+    request: Request,
+    w: int = Query(DEFAULT_WIDTH, ge=16, le=2048, description="wanted width in px; served from the nearest rendered size"),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg)$", description="default: webp if the client accepts it"),
+    v: Optional[str] = Query(None, description="content version from list-enriched; a current one makes the response immutable"),
+):
     """
-    List uploaded announcement files enriched with company name (from CSV).
+    Resized WebP/JPEG of an uploaded image, or of a PDF's first page.
+    Rendered once per file content in a process pool and cached on disk;
+    falls back to the original file (307) when no thumbnail can be made.
     """
-    try:
-        symbol_map = _load_symbol_map()
-        entries: List[Dict[str, Any]] = []
+    index = get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR)
+    entry = index.get(fname)
+    if entry is None:
+        await asyncio.to_thread(index.refresh)
+        entry = index.get(fname)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Announcement file '{fname}' not found")
+
+    original = RedirectResponse(f"/announcements/file/{fname}", status_code=307)
+    if not thumbnail_service.handles(fname) or thumbnail_service.failed(entry):
+        return original
+    meta = thumbnail_service.lookup(entry)
+    if meta is None:
+        try:
+            meta = await asyncio.wait_for(asyncio.wrap_future(thumbnail_service.submit(entry)), THUMB_WAIT_SECONDS)
+        except Exception as e:
+            print(f"Thumbnail for {fname} not available: {e}")
+            return original
+
+    fmt = format or ("webp" if "image/webp" in request.headers.get("accept", "") else "jpeg")
+    path, _w, _h = thumbnail_service.variant(meta, w, fmt)
+    # a URL with the current content version never changes meaning; without one it names
+    # the file, not its content: let clients keep it a day, then revalidate (ETag)
+    current = v is not None and v == uploads_assets.version(entry)
+    return FileResponse(
+        path,
+        media_type=FORMATS[fmt],
+        headers={"Cache-Control": IMMUTABLE if current else "public, max-age=86400", "Vary": "Accept"},
+    )
+
+@router.get("/thumb-stats")
+def announcement_thumbnail_stats() -> Dict[str, Any]:
+    """Thumbnail pipeline: enabled, queued and rendered counts."""
+    return thumbnail_service.stats()
+
+@router.get("/extract-stats")
+def announcement_extract_stats() -> Dict[str, Any]:
+    """Upload text extraction: backlog, files per minute, per-file timings by method, cards written."""
+    return upload_extractor.stats()
+
 
-        for fname in sorted(os.listdir(ANNOUNCEMENTS_UPLOADS_DIR)):
-            fpath = os.path.join(ANNOUNCEMENTS_UPLOADS_DIR, fname)
-            if not os.path.isfile(fpath):
+# -----------------------
+# Live stream of new uploads
+# -----------------------
+def _event_payloads(
+    events: List[Tuple[str, Optional[str], Optional[UploadEntry]]], base: str
+) -> List[Tuple[str, Optional[str], Dict[str, Any]]]:
+    """
+    (kind, token, payload) for one batch of stream events. Runs in a worker
+    thread: enrichment may reload the EOD master and reads thumbnail metas.
+    """
+    master = None
+    payloads = []
+    for kind, token, entry in events:
+        if entry is None:
+            payloads.append((kind, token, {"token": token}))
+            continue
+        if master is None:
+            # master per batch: a stream can outlive an EOD swap
+            master = symbol_master_service.current()
+        payloads.append((kind, token, dict(enrich_upload(entry, master, base), token=token)))
+    return payloads
+
+@router.get("/stream")
+async def announcements_stream(
+    request: Request,
+    since: Optional[str] = Query(None, description="resume token (the id of the last event seen)"),
+    last_event_id: Optional[str] = Header(None, description="sent by EventSource on reconnect; same as since"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events: one `announcement` event (a list-enriched entry, id =
+    resume token) per new or rewritten upload, within a second of it landing.
+    On connect the client gets what it missed since `since`/Last-Event-ID
+    (or nothing, without one), then a `ready` event carrying the current
+    token. `reset` means too much was missed: reload list-enriched. See
+    announcement_stream for delivery details.
+    """
+    resume = since or last_event_id
+    if resume:
+        try:
+            decode_cursor(resume)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    base = str(request.base_url).rstrip("/")
+
+    async def body():
+        # subscribe once streaming starts, so the finally below always unsubscribes
+        sub = await announcement_broadcaster.subscribe(resume)
+        try:
+            yield "retry: 1000\n\n"
+            async for events in stream_batches(sub):
+                if events[0][0] == "ping":
+                    yield ": ping\n\n"
+                    continue
+                payloads = await asyncio.to_thread(_event_payloads, events, base)
+                yield "".join(
+                    f"id: {token}\nevent: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                    for kind, token, payload in payloads
+                )
+        finally:
+            announcement_broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/stream")
+async def announcements_stream_ws(websocket: WebSocket, since: Optional[str] = None):
+    """
+    The same feed over a WebSocket (React Native has WebSocket but no EventSource).
+    Each message is {"event": ..., "token": ...} plus the entry fields for
+    announcement events; reconnect with ?since=<last token>.
+    """
+    await websocket.accept()
+    try:
+        sub = await announcement_broadcaster.subscribe(since)
+    except CursorError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    scheme = "https" if websocket.url.scheme == "wss" else "http"
+    base = str(websocket.base_url.replace(scheme=scheme)).rstrip("/")
+    try:
+        async for events in stream_batches(sub):
+            if events[0][0] == "ping":
+                await websocket.send_json({"event": "ping", "token": None})
                 continue
-            sym_guess = os.path.splitext(fname)[0].upper()
-            company_info = symbol_map.get(sym_guess, {"symbol": sym_guess, "company": sym_guess})
-            base = str(request.base_url).rstrip("/")
-            download_url = f"{base}/announcements/file/{fname}"
-
-            entries.append(
-                {
-                    "filename": fname,
-                    "symbol": company_info["symbol"],
-                    "company": company_info["company"],
-                    "download_url": download_url,
-                    "filename_date": _extract_date_from_filename(fname),
-                }
-            )
-
-        return {"count": len(entries), "files": entries}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            for kind, _token, payload in await asyncio.to_thread(_event_payloads, events, base):
+                await websocket.send_json(dict(payload, event=kind))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        announcement_broadcaster.unsubscribe(sub)
+
+@router.get("/stream-stats")
+def announcements_stream_stats() -> Dict[str, Any]:
+    """Open streams and broadcast counters."""
+    return announcement_broadcaster.stats()
@@ -0,0 +1,213 @@
+# ~/marketnews-app/backend/app/routers/cards.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from .. import models
+from ..card_ingest import BATCH_SIZE, BulkIngest, iter_ndjson
+from ..card_search import search_cards
+from ..db import get_db, get_read_db
+from ..feed_ingest import feed_ingester
+from ..summarizer import summary_worker
+
+router = APIRouter(tags=["cards"])
+
+Card = models.Card
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# columns returned by view=light (everything except raw_text and metadata)
+LIGHT_COLUMNS = (
+    Card.id, Card.source, Card.company, Card.event_type, Card.summary,
+    Card.url, Card.published_at, Card.approved,
+)
+FULL_COLUMNS = LIGHT_COLUMNS + (Card.raw_text, Card.metadata_json)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# newest first; the NULL placement is spelled out so it matches after_cursor on every database
+CARD_ORDER = (Card.published_at.desc().nullslast(), Card.id.desc())
+
+
+# -----------------------
+# Keyset cursor
+# -----------------------
+def encode_card_cursor(published_at: Optional[datetime], card_id: int) -> str:
+    raw = f"{published_at.isoformat() if published_at else ''}|{card_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_card_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published, card_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return (datetime.fromisoformat(published) if published else None, int(card_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+
+def after_cursor(published_at: Optional[datetime], card_id: int):
+    """
+    Rows strictly after (published_at, id) in CARD_ORDER: cards without a date
+    come last. On SQLite the comparison is on the stored text, which is why
+    every writer stores one format (see models.utc_now).
+    """
+    if published_at is None:
+        return and_(Card.published_at.is_(None), Card.id < card_id)
+    return or_(
+        Card.published_at < published_at,
+        and_(Card.published_at == published_at, Card.id < card_id),
+        Card.published_at.is_(None),
+    )
+
+
+# -----------------------
+# Endpoints
+# -----------------------
+@router.post("/cards")
+def create_card(card: dict, database=Depends(get_db)):
+    new_card = models.Card(**card)
+    new_card.content_hash = models.card_content_hash(new_card.url, new_card.raw_text)
+    database.add(new_card)
+    try:
+        database.commit()
+    except IntegrityError:
+        database.rollback()
+        existing = database.execute(
+            select(Card.id).where(Card.content_hash == new_card.content_hash)
+        ).scalar_one_or_none()
+        raise HTTPException(status_code=409, detail={"message": "Card already exists", "id": existing})
+    database.refresh(new_card)
+    return {"id": new_card.id, "message": "Card created"}
+
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+@router.post("/cards/bulk")
+async def create_cards_bulk(
+    request: Request,
+    batch_size: int = Query(BATCH_SIZE, ge=1, le=10000),
+    details: bool = Query(True, description="include the per-row results list"),
+    database=Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Insert many cards at once. The body is a JSON array of card objects or, with
+    Content-Type application/x-ndjson, one object per line (streamed, so large
+    loads are not held in memory as one document).
+
+    Cards are deduplicated on content_hash (normalized url + raw_text) against
+    the table and within the request. Every input row gets a result:
+    inserted (with id), skipped (duplicate / duplicate_in_request) or error.
+    """
+    ingest = BulkIngest(database, batch_size)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_TYPES:
+        tail = b""
+        async for chunk in request.stream():
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for item in iter_ndjson(line.decode("utf-8", "replace") for line in lines):
+                ingest.add(item)
+                if ingest.full:
+                    await run_in_threadpool(ingest.flush)
+        for item in iter_ndjson([tail.decode("utf-8", "replace")]):
+            ingest.add(item)
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Body is not valid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of cards (or NDJSON)")
+        for item in items:
+            ingest.add(item)
+            if ingest.full:
+                await run_in_threadpool(ingest.flush)
+
+    report = await run_in_threadpool(ingest.finish)
+    if not details:
+        report.pop("results")
+    return report
+
+
+@router.get("/cards")
+def list_cards(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    approved: Optional[bool] = None,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|light)$", description="light leaves out raw_text and metadata"),
+    database=Depends(get_read_db),
+) -> List[Dict[str, Any]]:
+    """
+    Cards newest first, ordered by (published_at, id). The body stays a plain
+    list; when there are more rows the cursor for the next page is sent in the
+    X-Next-Cursor header. Filters are exact matches, and each is backed by a
+    composite (column, published_at, id) index.
+    """
+    columns = LIGHT_COLUMNS if view == "light" else FULL_COLUMNS
+    stmt = select(*columns)
+    if approved is not None:
+        stmt = stmt.where(Card.approved == approved)
+    if source is not None:
+        stmt = stmt.where(Card.source == source)
+    if event_type is not None:
+        stmt = stmt.where(Card.event_type == event_type)
+    if cursor:
+        stmt = stmt.where(after_cursor(*decode_card_cursor(cursor)))
+    # one extra row tells us whether another page exists
+    stmt = stmt.order_by(*CARD_ORDER).limit(limit + 1)
+
+    rows = database.execute(stmt).mappings().all()
+    cards = [dict(row) for row in rows[:limit]]
+    if len(rows) > limit:
+        last = cards[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_card_cursor(last["published_at"], last["id"])
+    return cards
+
+
+@router.get("/cards/search")
+def search(
+    q: str = Query(..., min_length=1, description="words to find; all must match, the last one as a prefix"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=10000),
+    prefix: bool = Query(True, description="treat the last word as a prefix (infos -> Infosys)"),
+    approved: Optional[bool] = None,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    database=Depends(get_read_db),
+) -> Dict[str, Any]:
+    """
+    Full-text search over company, event_type, summary and raw_text, best match
+    first (bm25), each result with a <mark>-highlighted snippet. engine in the
+    response says whether the FTS5 index or the LIKE fallback answered;
+    ranked_window, when set, that only the newest that many matches were
+    ranked (see card_search).
+    """
+    return search_cards(database, q, limit, offset, prefix, approved, source, event_type)
+
+
+@router.get("/cards/summary-stats")
+def summary_stats() -> Dict[str, Any]:
+    """Background summarizer: backend, queue depth, throughput, cache hits, retries and failures."""
+    if summary_worker is None:
+        return {"backend": None, "running": False}
+    return summary_worker.stats()
+
+
+@router.get("/cards/ingest-stats")
+def ingest_stats() -> Dict[str, Any]:
+    """Exchange feed ingester: fetches (304s, unchanged pages), bytes saved, items per second and cards inserted."""
+    if feed_ingester is None:
+        return {"feeds": 0, "running": False}
+    return feed_ingester.stats()
@@ -1,72 +1,28 @@
 # ~/marketnews-app/backend/app/routers/market_summary.py
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional, List
-import os
-import csv
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional, List, Tuple
+import functools
+import hashlib
+import json
 import re
+import threading
+import time
 from datetime import datetime
 
-router = APIRouter(prefix="/market", tags=["market"])
-
-DATA_DIR = os.path.expanduser("~/marketnews-app/backend/data")
-
-def find_latest_csv() -> Optional[str]:
-    """Find the most recent EOD CSV file in DATA_DIR.
-    Preference order:
-      - files containing a YYYY-MM-DD date in filename -> pick max date
-      - otherwise fallback to most-recent mtime CSV
-    Returns full path or None.
-    """
-    if not os.path.isdir(DATA_DIR):
-        return None
-
-    files = [os.path.join(DATA_DIR, f) for f in os.listdir(DATA_DIR) if f.lower().endswith(".csv")]
-    if not files:
-        return None
-
-    date_files: List[tuple] = []
-    date_re = re.compile(r"20[0-9]{2}[-_][01][0-9][-_][0-3][0-9]")
-    for f in files:
-        m = date_re.search(os.path.basename(f))
-        if m:
-            try:
-                s = m.group(0).replace("_", "-")
-                dt = datetime.strptime(s, "%Y-%m-%d")
-                date_files.append((dt, f))
-            except Exception:
-                pass
-
-    if date_files:
-        # pick file with max date found in filename
-        date_files.sort(key=lambda x: x[0], reverse=True)
-        return date_files[0][1]
-
-    # fallback: most recent modification time
-    files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-    return files[0]
+from .. import eod, screener
+from ..metrics import cache_events, stage
+from ..eod_schema import EodRecord
+from ..eod_store import EodStore, DEFAULT_MAX_DAYS
+from ..paths import DATA_DIR
+from ..symbol_master import SymbolMaster, get_symbol_master, snapshot_cache, symbol_master_service
 
-def safe_keys(row: Dict[str, str]) -> List[str]:
-    return [k for k in row.keys()]
+router = APIRouter(prefix="/market", tags=["market"])
 
-def pick(row: Dict[str, str], candidates):
-    """Pick first matching column (case-insensitive name) from csv row dict"""
-    for c in candidates:
-        for k in row.keys():
-            if k is None: 
-                continue
-            if k.strip().lower() == c.lower():
-                v = row.get(k)
-                return v.strip() if isinstance(v, str) else v
-    return None
-
-def to_float(s: Optional[str]) -> Optional[float]:
-    if s is None or s == "":
-        return None
-    try:
-        cleaned = str(s).replace(",", "").replace("%", "").replace("₹", "").replace("Cr", "").replace("L", "").strip()
-        return float(cleaned)
-    except Exception:
-        return None
+# every dated CSV in DATA_DIR, columnar, for /history
+eod_store = EodStore(DATA_DIR)
 
 def format_rupee_cr(value: Optional[float]) -> Optional[str]:
     if value is None:
@@ -90,156 +46,25 @@ def format_pct(value: Optional[float]) -> Optional[str]:
     except Exception:
         return None
 
-def normalize_text(s: Optional[str]) -> str:
-    if s is None:
-        return ""
-    return re.sub(r"[^A-Za-z0-9]", "", str(s)).strip().upper()
-
-@router.get("/summary/{ticker}")
-def market_summary(ticker: str) -> Dict[str, Any]:
-    """
-    Return a compact market summary for the given ticker using latest CSV in data/.
-    Matching is flexible: exact symbol, symbol contains token, or description contains company text.
-    """
-    csv_path = find_latest_csv()
-    if not csv_path or not os.path.exists(csv_path):
-        raise HTTPException(status_code=500, detail=f"EOD CSV not found in {DATA_DIR}")
-
-    rows = []
-    try:
-        with open(csv_path, newline="", encoding="utf-8", errors="ignore") as fh:
-            reader = csv.DictReader(fh)
-            for r in reader:
-                rows.append(r)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed reading CSV: {e}")
-
-    t_raw = (ticker or "").strip()
-    if not t_raw:
-        raise HTTPException(status_code=400, detail="Empty ticker")
-
-    t = t_raw.upper()
-    t_norm = normalize_text(t_raw)
-
-    match = None
-
-    # first pass: exact symbol match against likely symbol-like headers
-    symbol_headers = ("symbol", "ticker", "securitycode", "security code", "scrip")
-    desc_headers = ("description", "company", "companyname", "nameofthecompany", "name", "description of announcement")
-
-    # helper to get header-insensitive value
-    def header_get(row, header_candidates):
-        for k in row.keys():
-            if k is None:
-                continue
-            if k.strip().lower() in [h.lower() for h in header_candidates]:
-                return row.get(k)
-        return None
-
-    # 1) exact symbol match (case-insensitive)
-    for r in rows:
-        sym = header_get(r, symbol_headers)
-        if sym and isinstance(sym, str) and sym.strip().upper() == t:
-            match = r
-            break
-
-    # 2) normalized symbol comparison (remove punctuation) exact
-    if not match:
-        for r in rows:
-            sym = header_get(r, symbol_headers)
-            if sym:
-                if normalize_text(sym) == t_norm:
-                    match = r
-                    break
-
-    # 3) symbol contains requested token (e.g. t=INFOSYS might match sym INFY if token present) 
-    if not match:
-        for r in rows:
-            sym = header_get(r, symbol_headers)
-            if sym:
-                if t in str(sym).upper() or t_norm in normalize_text(sym):
-                    match = r
-                    break
-
-    # 4) fallback: match by description/company containing the requested text (partial, case-insensitive)
-    if not match:
-        lowered_t = t_raw.lower()
-        for r in rows:
-            comp = header_get(r, desc_headers)
-            if comp and isinstance(comp, str) and lowered_t in comp.lower():
-                match = r
-                break
-
-    # 5) last resort: partial token match across description words (split company name and check tokens)
-    if not match:
-        t_tokens = re.split(r"\s+|[^A-Za-z0-9]+", t_raw)
-        t_tokens = [tok for tok in t_tokens if tok]
-        if t_tokens:
-            for r in rows:
-                comp = header_get(r, desc_headers)
-                if comp and isinstance(comp, str):
-                    comp_low = comp.lower()
-                    for tok in t_tokens:
-                        if tok.lower() and tok.lower() in comp_low:
-                            match = r
-                            break
-                if match:
-                    break
-
-    if not match:
-        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found in CSV at {os.path.basename(csv_path)}")
-
-    # Now extract fields using header names present in that CSV row
-    # Use the visible header text from CSV and common variants
-    price_raw = pick(match, ["Price", "price", "Close", "ClosePrice", "LastPrice"])
-    price = to_float(price_raw)
-
-    change_1d_raw = pick(match, ["Price Change % 1 day", "Price Change % 1 day ", "Price Change % 1 day", "Price Change % 1 day", "Price Change % 1 day"])
-    change_1d = to_float(change_1d_raw)
-
-    change_1w_raw = pick(match, ["Price Change % 1 week", "Price Change % 1 week "])
-    change_1w = to_float(change_1w_raw)
-
-    volume_raw = pick(match, ["Price * Volume (Turnover) 1 day", "Price * Volume (Turnover) 1 day ", "Volume", "Volume(24H)", "TradedQty", "TOTTRDQTY"])
-    try:
-        volume_num = None
-        if volume_raw not in (None, ""):
-            volume_num = float(str(volume_raw).replace(",", "").strip())
-    except Exception:
-        volume_num = None
-
-    mcap_raw = pick(match, ["Market capitalization", "Mcap", "MarketCap", "marketcap"])
-    mcap_num = to_float(mcap_raw)
-
-    rank_raw = pick(match, ["Rank", "rank"])
-    try:
-        rank_num = int(str(rank_raw).strip()) if rank_raw and str(rank_raw).strip().isdigit() else None
-    except Exception:
-        rank_num = None
-
-    vwap_raw = pick(match, ["Volume Weighted Average Price 1 day", "VWAP", "vwap", "Volume Weighted Average Price"])
-    vwap = to_float(vwap_raw)
-
-    atr14_raw = pick(match, ["Average True Range % (14) 1 day", "Average True Range % (14) 1 day ", "ATR14", "ATR_14", "ATR(14)"])
-    atr14 = to_float(atr14_raw)
-
-    relvol_raw = pick(match, ["Relative Volume 1 day", "RelVol", "relative_volume", "relative vol", "RelativeVolume", "Relative Vol"])
-    relvol = to_float(relvol_raw)
-
-    vol_change_raw = pick(match, ["Volume Change % 1 day", "Volume Change % 1 day ", "Volume Change % 1 day", "Volume Change % 1 day"])
-    vol_change = to_float(vol_change_raw)
-
-    volatility_raw = pick(match, ["Volatility 1 day", "Volatility 1 day ", "Volatility", "volatility"])
-    volatility = to_float(volatility_raw)
-
-    beta_raw = pick(match, ["Beta", "beta"])
-    beta = to_float(beta_raw) if beta_raw else None
+@router.get("/cache-stats")
+def market_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/reload counters, the currently cached EOD snapshot and the symbol master built from it."""
+    stats = snapshot_cache.stats()
+    stats["symbol_master"] = symbol_master_service.stats()
+    rendered = _rendered
+    stats["summary_responses"] = {
+        "version": rendered.snapshot.version if rendered else None,
+        "etag": rendered.etag if rendered else None,
+        "bodies": len(rendered.by_symbol) if rendered else 0,
+        "bytes": rendered.bytes if rendered else 0,
+        "render_seconds": round(rendered.render_seconds, 4) if rendered else None,
+    }
+    return stats
 
-    # company/description
-    company = pick(match, ["Description", "description", "Company", "company", "CompanyName", "NameOfTheCompany"]) or None
 
-    # Try to parse an EOD date from filename (if present) otherwise None
-    filename = os.path.basename(csv_path)
+@functools.lru_cache(maxsize=64)
+def eod_date_from_filename(filename: str) -> Optional[str]:
+    """Parse an EOD date (ISO format) from the CSV filename if present, otherwise None."""
     date_match = re.search(r"(20[0-9]{2})[-_](0[1-9]|1[0-2])[-_](0[1-9]|[12][0-9]|3[01])", filename)
     eod_date = None
     if date_match:
@@ -250,33 +75,298 @@ def market_summary(ticker: str) -> Dict[str, Any]:
                 eod_date = datetime.strptime(date_match.group(0).replace("_", "-"), "%Y-%m-%d").date().isoformat()
             except Exception:
                 eod_date = None
+    return eod_date
+
+def get_snapshot(master: SymbolMaster = Depends(get_symbol_master)) -> eod.EodSnapshot:
+    """Dependency: snapshot of the latest CSV from the shared symbol master, or HTTP 500 if there is none."""
+    if master.snapshot is None:
+        raise HTTPException(status_code=500, detail=master.error or f"EOD CSV not found in {DATA_DIR}")
+    return master.snapshot
+
+def resolve_row(snapshot: eod.EodSnapshot, ticker: str) -> EodRecord:
+    """Matched CSV record for ticker; raises 400 for an empty ticker and 404 when nothing matches."""
+    t_raw = (ticker or "").strip()
+    if not t_raw:
+        raise HTTPException(status_code=400, detail="Empty ticker")
+
+    # resolve through the per-file index: exact symbol, normalized symbol,
+    # symbol substring, description substring, then description tokens
+    with stage("ticker_resolve"):
+        row_id = snapshot.resolve(t_raw)
+    match = snapshot.records[row_id] if row_id is not None else None
+
+    if match is None:
+        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found in CSV at {snapshot.filename}")
+    return match
+
+def build_summary(snapshot: eod.EodSnapshot, match: EodRecord, ticker: str) -> Dict[str, Any]:
+    """Compact summary dict for one matched CSV record (the /summary response body)."""
+    # values were parsed and cleaned once when the snapshot loaded (see eod_schema)
+    price = match.price
+    change_1d = match.change_1d
+    change_1w = match.change_1w
+    volume_num = match.turnover
+    mcap_num = match.mcap
+    vwap = match.vwap
+    atr14 = match.atr14
 
     resp = {
-        "ticker": (pick(match, ["Symbol", "symbol", "Ticker", "ticker"]) or ticker).strip().upper(),
-        "company": company,
-        "csv_filename": os.path.basename(csv_path),
-        "eod_date": eod_date,
+        "ticker": (match.symbol or ticker).strip().upper(),
+        "company": match.company,
+        "csv_filename": snapshot.filename,
+        "eod_date": eod_date_from_filename(snapshot.filename),
         "price": price,
         "price_display": format_rupee_cr(price) if price is not None else None,
         "change_1d_pct": change_1d,
         "change_1d_display": format_pct(change_1d),
         "change_1w_pct": change_1w,
         "change_1w_display": format_pct(change_1w),
-        "volume_24h_raw": volume_raw,
+        "volume_24h_raw": match.turnover_raw,
         "volume_24h": volume_num,
         "volume_24h_display": format_rupee_cr(volume_num) if volume_num is not None else None,
-        "mcap_raw": mcap_raw,
+        "mcap_raw": match.mcap_raw,
         "mcap": mcap_num,
         "mcap_display": format_rupee_cr(mcap_num),
-        "rank": rank_num,
+        "rank": match.rank,
         "vwap": vwap,
         "vwap_display": f"{vwap:.2f}" if vwap is not None else None,
         "atr14": atr14,
         "atr14_display": f"{atr14:.2f}%" if atr14 is not None else None,
-        "relative_vol": relvol,
-        "vol_change": vol_change,
-        "volatility": volatility,
-        "beta": beta,
+        "relative_vol": match.relvol,
+        "vol_change": match.vol_change,
+        "volatility": match.volatility,
+        "beta": match.beta,
+    }
+
+    return resp
+
+# -----------------------
+# Pre-rendered /summary/{ticker} responses
+# -----------------------
+# bump when the /summary body changes shape, so clients holding an old ETag refetch
+SUMMARY_FORMAT = "1"
+
+def render_json(content: Any) -> bytes:
+    """JSON bytes exactly as FastAPI's JSONResponse would encode content."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def summary_etag(snapshot: eod.EodSnapshot) -> str:
+    """Strong ETag for every /summary/{ticker} body of one snapshot (they only change with the file)."""
+    digest = hashlib.sha1(f"{SUMMARY_FORMAT}:{snapshot.version}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored, * matches anything."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class RenderedSummaries:
+    """
+    Every /summary/{ticker} body of one snapshot, rendered to JSON bytes once.
+
+    by_row holds the body for each record (None for rows without a symbol,
+    whose body echoes the requested ticker and is rendered per request);
+    by_symbol is the exact-symbol fast path, first row wins like the ticker index.
+    """
+
+    def __init__(self, snapshot: eod.EodSnapshot):
+        started = time.perf_counter()
+        self.snapshot = snapshot
+        self.etag = summary_etag(snapshot)
+        self.by_row: List[Optional[bytes]] = []
+        self.by_symbol: Dict[str, bytes] = {}
+        for rec in snapshot.records:
+            symbol = (rec.symbol or "").strip().upper()
+            if not symbol:
+                self.by_row.append(None)
+                continue
+            body = render_json(build_summary(snapshot, rec, symbol))
+            self.by_row.append(body)
+            self.by_symbol.setdefault(symbol, body)
+        self.bytes = sum(len(b) for b in self.by_row if b is not None)
+        self.render_seconds = time.perf_counter() - started
+
+    def body(self, ticker: str) -> bytes:
+        """Body for ticker, resolved like resolve_row (same 400/404 errors)."""
+        body = self.by_symbol.get(ticker.strip().upper())
+        if body is not None:
+            cache_events.inc("summary_body", "hit")
+            return body
+        with stage("ticker_resolve"):
+            row_id = self.snapshot.resolve(ticker)
+        body = self.by_row[row_id] if row_id is not None else None
+        cache_events.inc("summary_body", "hit" if body is not None else "miss")
+        if body is None:
+            body = render_json(build_summary(self.snapshot, resolve_row(self.snapshot, ticker), ticker))
+        return body
+
+
+_rendered: Optional[RenderedSummaries] = None
+_render_lock = threading.Lock()
+
+def rendered_summaries(snapshot: eod.EodSnapshot) -> RenderedSummaries:
+    """RenderedSummaries for snapshot, rendered once per snapshot (single-flight)."""
+    global _rendered
+    rendered = _rendered
+    if rendered is not None and rendered.snapshot is snapshot:
+        return rendered
+    with _render_lock:
+        rendered = _rendered
+        if rendered is None or rendered.snapshot is not snapshot:
+            rendered = RenderedSummaries(snapshot)
+            _rendered = rendered
+    return rendered
+
+
+def _summary_body(ticker: str) -> Tuple[RenderedSummaries, bytes]:
+    """Current rendered summaries and ticker's body (400/404 like resolve_row); runs in the threadpool."""
+    rendered = rendered_summaries(get_snapshot(symbol_master_service.current()))
+    return rendered, rendered.body(ticker)
+
+
+async def market_summary(request: Request) -> Response:
+    """
+    Return a compact market summary for the given ticker using latest CSV in data/.
+    Matching is flexible: exact symbol, symbol contains token, or description contains company text.
+
+    Bodies are pre-rendered once per EOD snapshot and carry a strong ETag
+    derived from the snapshot version; a matching If-None-Match gets 304.
+    An unknown ticker is a 404 whatever If-None-Match says.
+
+    This is the hottest endpoint, so it is a plain Starlette route (added
+    below): no parameter/dependency solving per request. The lookup runs in
+    the threadpool as one call: usually two stat calls and a dict lookup,
+    but after an EOD file change it re-reads the file and rebuilds the
+    symbol master and the bodies, which must not block the event loop.
+    """
+    rendered, body = await run_in_threadpool(_summary_body, request.path_params["ticker"])
+    headers = {"ETag": rendered.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# add_route does not apply the router prefix (only the api_route decorators do)
+router.add_route(router.prefix + "/summary/{ticker}", market_summary, methods=["GET"], name="market_summary")
+
+
+MAX_BATCH_TICKERS = 500
+
+class TickerBatch(BaseModel):
+    tickers: List[str]
+
+def summarize_batch(snapshot: eod.EodSnapshot, tickers: List[str]) -> Dict[str, Any]:
+    """
+    Resolve every ticker against one snapshot.
+    results maps each requested ticker to the same body /summary/{ticker} returns;
+    errors maps tickers that failed to {"status_code", "detail"}.
+    """
+    requested: List[str] = []
+    seen = set()
+    for t in tickers:
+        t = (t or "").strip()
+        if t and t not in seen:
+            seen.add(t)
+            requested.append(t)
+    if not requested:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    if len(requested) > MAX_BATCH_TICKERS:
+        raise HTTPException(status_code=400, detail=f"Too many tickers ({len(requested)} > {MAX_BATCH_TICKERS})")
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, Any] = {}
+    for t in requested:
+        try:
+            results[t] = build_summary(snapshot, resolve_row(snapshot, t), t)
+        except HTTPException as e:
+            errors[t] = {"status_code": e.status_code, "detail": e.detail}
+
+    return {
+        "csv_filename": snapshot.filename,
+        "eod_date": eod_date_from_filename(snapshot.filename),
+        "count": len(results),
+        "results": results,
+        "errors": errors,
     }
 
-    return resp
\ No newline at end of file
+@router.get("/summary")
+def market_summary_batch(
+    tickers: str = Query(..., description="Comma-separated tickers, e.g. INFY,LT,TCS"),
+    snapshot: eod.EodSnapshot = Depends(get_snapshot),
+) -> Dict[str, Any]:
+    """Batch version of /summary/{ticker}: one round trip and one snapshot for a whole card list."""
+    return summarize_batch(snapshot, tickers.split(","))
+
+@router.post("/summary")
+def market_summary_batch_post(batch: TickerBatch, snapshot: eod.EodSnapshot = Depends(get_snapshot)) -> Dict[str, Any]:
+    """Same as GET /summary?tickers=... for lists too long for a query string."""
+    return summarize_batch(snapshot, batch.tickers)
+
+
+@router.get("/history/{ticker}")
+def market_history(
+    ticker: str,
+    days: int = Query(30, ge=1, le=DEFAULT_MAX_DAYS),
+    master: SymbolMaster = Depends(get_symbol_master),
+) -> Dict[str, Any]:
+    """
+    Daily series for ticker over the last `days` EOD files in data/.
+    All series are aligned to `dates`; a day the symbol is missing from is null.
+    Tickers that are not an exact symbol are resolved like /summary/{ticker}.
+    """
+    try:
+        eod_store.refresh()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed loading EOD history: {e}")
+
+    hist = eod_store.history(ticker, days)
+    if hist is None:
+        match = resolve_row(get_snapshot(master), ticker)
+        hist = eod_store.history(match.symbol or "", days)
+    if hist is None:
+        raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' has no EOD history in {DATA_DIR}")
+    return hist
+
+@router.get("/history-stats")
+def market_history_stats() -> Dict[str, Any]:
+    """Days, symbols, rows and memory footprint of the columnar EOD store."""
+    eod_store.refresh()
+    return eod_store.stats()
+
+
+@router.get("/screener")
+def market_screener(
+    where: Optional[str] = Query(None, alias="filter", description="e.g. change_1d_pct>2 AND relative_vol>1.5 AND mcap>10000"),
+    sort: str = Query("relative_vol", description="field to rank by"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=MAX_BATCH_TICKERS),
+    snapshot: eod.EodSnapshot = Depends(get_snapshot),
+) -> Dict[str, Any]:
+    """
+    Screen the whole latest EOD universe: AND-ed numeric filters, then the top
+    `limit` rows by `sort`. results use the same shape as /summary/{ticker};
+    count is the number of rows that passed the filter.
+    """
+    try:
+        rows, total = screener.screen(snapshot.column, len(snapshot.records), where, sort, order == "desc", limit)
+    except screener.ScreenerError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results = []
+    for i in rows:
+        rec = snapshot.records[int(i)]
+        results.append(build_summary(snapshot, rec, rec.symbol or ""))
+    return {
+        "csv_filename": snapshot.filename,
+        "eod_date": eod_date_from_filename(snapshot.filename),
+        "filter": where,
+        "sort": sort,
+        "order": order,
+        "count": total,
+        "results": results,
+    }
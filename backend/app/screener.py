@@ -0,0 +1,119 @@
+# ~/marketnews-app/backend/app/screener.py
+"""
+Vectorized screener over one EOD snapshot.
+
+Filters are small expressions over the summary field names, for example
+
+    change_1d_pct>2 AND relative_vol>1.5 AND mcap>10000
+
+Each comparison becomes a NumPy boolean mask over a whole column. The masks
+are AND-ed, and the top-k rows by the sort field are picked with argpartition,
+so no Python loop runs over the universe. Missing values (NaN) never match a
+comparison and never rank; a match without a sort value still counts in the
+total.
+"""
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+# public (summary response) field name -> EodRecord numeric field
+FIELDS = {
+    "price": "price",
+    "change_1d_pct": "change_1d",
+    "change_1w_pct": "change_1w",
+    "volume_24h": "turnover",
+    "mcap": "mcap",
+    "rank": "rank",
+    "vwap": "vwap",
+    "atr14": "atr14",
+    "relative_vol": "relvol",
+    "vol_change": "vol_change",
+    "volatility": "volatility",
+    "beta": "beta",
+}
+# canonical names are accepted too
+FIELDS.update({v: v for v in list(FIELDS.values())})
+
+_OPS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_TERM_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|==|!=|>|<|=)\s*(-?[0-9]+(?:\.[0-9]*)?(?:[eE][-+]?[0-9]+)?)\s*$")
+_AND_RE = re.compile(r"\s+AND\s+|\s*&&\s*|\s*,\s*", re.IGNORECASE)
+
+Condition = Tuple[str, Callable, float]
+
+
+class ScreenerError(ValueError):
+    """Bad filter or sort field; the router turns it into HTTP 400."""
+
+
+def column_name(field: str) -> str:
+    try:
+        return FIELDS[field.strip()]
+    except KeyError:
+        raise ScreenerError(f"Unknown field '{field}'. Use one of: {', '.join(sorted(FIELDS))}")
+
+
+@lru_cache(maxsize=256)
+def parse_filter(expr: Optional[str]) -> Tuple[Condition, ...]:
+    """'a>1 AND b<=2' -> ((column, op, value), ...). Cached, so repeated screens skip parsing."""
+    if not expr or not expr.strip():
+        return ()
+    conditions: List[Condition] = []
+    for term in _AND_RE.split(expr.strip()):
+        m = _TERM_RE.match(term)
+        if not m:
+            raise ScreenerError(f"Cannot parse filter term '{term}' (expected e.g. relative_vol>1.5)")
+        field, op, value = m.groups()
+        conditions.append((column_name(field), _OPS[op], float(value)))
+    return tuple(conditions)
+
+
+def screen(
+    column: Callable[[str], np.ndarray],
+    nrows: int,
+    expr: Optional[str],
+    sort: str,
+    descending: bool = True,
+    limit: int = 50,
+) -> Tuple[np.ndarray, int]:
+    """
+    Row ids of the top `limit` matches ordered by `sort` (ties in file order),
+    and the total match count: every row that passed the filter, including
+    rows with no `sort` value, which are never returned.
+    column(name) must return the float64 column for an EodRecord field.
+    """
+    mask = np.ones(nrows, dtype=bool)
+    for col, op, value in parse_filter(expr):
+        mask &= op(column(col), value)
+
+    key = column(column_name(sort))
+    total = int(np.count_nonzero(mask))
+    rows = np.flatnonzero(mask & ~np.isnan(key))
+    if len(rows) == 0 or limit <= 0:
+        return rows[:0], total
+
+    vals = key[rows]
+    if descending:
+        vals = -vals
+    if limit < len(rows):
+        # everything better than the k-th value, then the rows tied with it in file
+        # order (rows is ascending): argpartition alone picks arbitrarily among ties
+        kth = np.partition(vals, limit - 1)[limit - 1]
+        better = np.flatnonzero(vals < kth)
+        tied = np.flatnonzero(vals == kth)[: limit - len(better)]
+        keep = np.concatenate((better, tied))
+        rows, vals = rows[keep], vals[keep]
+    # order the top-k by value, ties by file order
+    order = np.lexsort((rows, vals))
+    return rows[order], total
@@ -0,0 +1,192 @@
+# ~/marketnews-app/backend/app/startup.py
+"""
+Startup warmup, run from the app lifespan before traffic is accepted.
+
+Importing the app used to do work (makedirs in main, create_all in models),
+and everything else was loaded by whichever request came first: the EOD
+snapshot, its symbol index, the pre-rendered summaries, the uploads scan and
+the hash manifests. Warmup does all of it explicitly, as chains of steps:
+
+  directories -> uploads_index -> asset_hashes
+  database
+  eod_snapshot -> symbol_index -> summaries
+
+A step only runs once the previous one in its chain succeeded (else it is
+"skipped"). With STARTUP_PARALLEL=1 (the default) the chains run at the same
+time in threads: the database and uploads steps are mostly I/O and overlap
+with parsing the EOD file; STARTUP_PARALLEL=0 runs them one after another.
+
+Required steps (directories, database) abort startup when they fail. The
+others leave the app up but degraded (without an EOD file the market
+endpoints answer 500, as before, and pick the file up once it appears).
+/ready reports every step with its status, seconds and details, and answers
+503 until warmup is done and while shutting down; /health stays a plain
+liveness check. With STARTUP_WAIT=0 the lifespan does
+not wait for warmup: the server accepts connections at once and /ready
+tells a load balancer when to send traffic.
+
+Libraries that only the worker processes need (Pillow, pypdfium2,
+pytesseract) are imported there, not here or at module import.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# main imports this module before anything else, so import_seconds covers
+# fastapi, sqlalchemy and the app modules; the steps import what they load
+IMPORTED_AT = time.perf_counter()
+
+PARALLEL = os.getenv("STARTUP_PARALLEL", "1") != "0"
+WAIT = os.getenv("STARTUP_WAIT", "1") != "0"
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    run: Callable[[], Optional[Dict[str, Any]]]  # returns details for /ready
+    required: bool = False
+
+
+class Warmup:
+    """Runs the step chains once and keeps what /ready reports."""
+
+    def __init__(self, chains: Sequence[Sequence[Step]], parallel: bool = PARALLEL):
+        self.chains = chains
+        self.parallel = parallel
+        self.steps: Dict[str, Dict[str, Any]] = {
+            step.name: {"status": "pending", "seconds": None} for chain in chains for step in chain
+        }
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stopping = False
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.done and not self.stopping
+
+    def _run_chain(self, chain: Sequence[Step]) -> None:
+        failed = None
+        for step in chain:
+            if failed is not None:
+                self.steps[step.name] = {"status": "skipped", "seconds": None, "error": f"{failed} failed"}
+                continue
+            t0 = time.perf_counter()
+            try:
+                detail = step.run() or {}
+            except Exception as e:
+                self.steps[step.name] = {"status": "error", "seconds": round(time.perf_counter() - t0, 4), "error": str(e)}
+                print(f"Startup step {step.name} failed: {e}")
+                if step.required:
+                    raise
+                failed = step.name
+                continue
+            self.steps[step.name] = {"status": "ok", "seconds": round(time.perf_counter() - t0, 4), **detail}
+
+    async def run(self) -> None:
+        """Run every chain; raises if a required step failed."""
+        self.started_at = time.perf_counter()
+        if self.parallel:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._run_chain, chain) for chain in self.chains), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+        else:
+            for chain in self.chains:
+                await asyncio.to_thread(self._run_chain, chain)
+        self.finished_at = time.perf_counter()
+        print(f"Ready in {self.finished_at - IMPORTED_AT:.2f} s after import "
+              f"(warmup {self.finished_at - self.started_at:.2f} s, {'parallel' if self.parallel else 'sequential'})")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "stopping": self.stopping,
+            "parallel": self.parallel,
+            "import_seconds": round(self.started_at - IMPORTED_AT, 4) if self.started_at else None,
+            "warmup_seconds": round(self.finished_at - self.started_at, 4) if self.done else None,
+            "ready_seconds": round(self.finished_at - IMPORTED_AT, 4) if self.done else None,
+            "degraded": [name for name, s in self.steps.items() if s["status"] in ("error", "skipped")],
+            "steps": self.steps,
+        }
+
+
+# -----------------------
+# steps
+# -----------------------
+def _directories() -> Dict[str, Any]:
+    from .paths import ANNOUNCEMENTS_UPLOADS_DIR, DATA_DIR, STATIC_IMAGES_DIR
+
+    for path in (DATA_DIR, STATIC_IMAGES_DIR, ANNOUNCEMENTS_UPLOADS_DIR):
+        os.makedirs(path, exist_ok=True)
+    return {}
+
+
+def _uploads_index() -> Dict[str, Any]:
+    from .paths import ANNOUNCEMENTS_UPLOADS_DIR, STATIC_IMAGES_DIR
+    from .uploads_index import get_uploads_index
+
+    uploads = get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR)
+    images = get_uploads_index(STATIC_IMAGES_DIR)
+    return {"uploads": len(uploads), "static_images": len(images)}
+
+
+def _asset_hashes() -> Dict[str, Any]:
+    from .static_assets import asset_versions
+
+    return {assets.prefix: assets.manifest.load() for assets in asset_versions.dirs}
+
+
+def _database() -> Dict[str, Any]:
+    from . import db
+
+    db.init_db()
+    return {}
+
+
+def _eod_snapshot() -> Dict[str, Any]:
+    from .symbol_master import symbol_master_service
+
+    master = symbol_master_service.load()
+    if master.snapshot is None:
+        raise RuntimeError(master.error)
+    snapshot = master.snapshot
+    return {"file": snapshot.filename, "rows": len(snapshot.records), "source": snapshot.source, "symbols": len(master.companies)}
+
+
+def _current_snapshot():
+    from .symbol_master import symbol_master_service
+
+    return symbol_master_service.current().snapshot
+
+
+def _symbol_index() -> Dict[str, Any]:
+    # mapped snapshots build it on the first non-exact lookup otherwise
+    _current_snapshot().symbol_index
+    return {}
+
+
+def _summaries() -> Dict[str, Any]:
+    from .routers import market_summary
+
+    rendered = market_summary.rendered_summaries(_current_snapshot())
+    return {"bodies": len(rendered.by_symbol), "bytes": rendered.bytes}
+
+
+warmup = Warmup([
+    [Step("directories", _directories, required=True), Step("uploads_index", _uploads_index), Step("asset_hashes", _asset_hashes)],
+    [Step("database", _database, required=True)],
+    [Step("eod_snapshot", _eod_snapshot), Step("symbol_index", _symbol_index), Step("summaries", _summaries)],
+])
+
+
+def step_samples():
+    """marketnews_startup_step_seconds samples, one per finished step."""
+    return [({"step": name}, s["seconds"]) for name, s in warmup.steps.items() if s["seconds"] is not None]
@@ -0,0 +1,262 @@
+# ~/marketnews-app/backend/app/static_assets.py
+"""
+Content-hashed URLs for the static mounts (/static/images, /announcements/file).
+
+A plain StaticFiles URL names a file, not its content, so a client cannot
+cache it for long: a replaced LT.png keeps the same URL. Links handed out by
+the API now carry the content hash, /announcements/file/LT.png?v=<hash>. A
+request whose v matches the file's current hash is answered with
+`Cache-Control: public, max-age=31536000, immutable`. Any other request,
+without v or with an outdated one, gets `no-cache` and revalidates with the
+ETag as before. Range and If-Range requests are handled by StaticFiles.
+
+Hashes come from a HashManifest per directory: name -> (size, mtime_ns,
+sha256), persisted under CACHE_DIR. A background thread brings it up to date
+when the directory's UploadsIndex changes, hashing only new or changed
+files. Requests only look hashes up; a file not hashed yet is linked
+without v until the thread gets to it.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from .paths import ANNOUNCEMENTS_UPLOADS_DIR, CACHE_DIR, STATIC_IMAGES_DIR
+from .uploads_index import UploadEntry, UploadsIndex, get_uploads_index
+
+VERSION_LENGTH = 16  # hex chars of the sha256 in ?v=
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SYNC_SECONDS = 1.0
+SAVE_SECONDS = 5.0
+LOGO_EXTENSIONS = (".png", ".webp", ".jpg", ".jpeg", ".svg")
+
+
+def file_sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class HashManifest:
+    """name -> sha256 for one directory, valid while (size, mtime_ns) match. Thread-safe."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path  # where it is persisted; None keeps it in memory
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._hashes = {name: tuple(v) for name, v in json.load(f).items()}
+        except (OSError, ValueError):
+            self._hashes = {}
+
+    def load(self) -> int:
+        """Read the persisted hashes now instead of on the first lookup; returns how many."""
+        with self._lock:
+            self._load()
+            return len(self._hashes)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get(self, name: str, size: int, mtime_ns: int) -> Optional[str]:
+        with self._lock:
+            self._load()
+            known = self._hashes.get(name)
+        if known is None or known[0] != size or known[1] != mtime_ns:
+            return None
+        return known[2]
+
+    def put(self, name: str, size: int, mtime_ns: int, digest: str) -> None:
+        with self._lock:
+            self._load()
+            self._hashes[name] = (size, mtime_ns, digest)
+            self._dirty = True
+
+    def prune(self, names: set) -> None:
+        """Forget files that are gone."""
+        with self._lock:
+            self._load()
+            for name in [n for n in self._hashes if n not in names]:
+                del self._hashes[name]
+                self._dirty = True
+
+    def save(self, force: bool = False) -> None:
+        """Persist (at most every SAVE_SECONDS unless forced)."""
+        with self._lock:
+            if not self.path or not self._dirty or (not force and time.monotonic() - self._saved_at < SAVE_SECONDS):
+                return
+            data = json.dumps(self._hashes).encode("utf-8")
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+class AssetDirectory:
+    """One served directory: URL prefix, maintained index and hash manifest."""
+
+    def __init__(self, prefix: str, directory: str, manifest_path: Optional[str]):
+        self.prefix = prefix
+        self.directory = directory
+        self.manifest = HashManifest(manifest_path)
+        self._synced_version = -1
+        self._stems: Dict[str, str] = {}  # SYMBOL -> file name, for logo lookups
+        self._stems_version = -1
+        self.hashed = 0
+
+    @property
+    def index(self) -> UploadsIndex:
+        return get_uploads_index(self.directory)
+
+    def digest(self, entry: UploadEntry) -> Optional[str]:
+        return self.manifest.get(entry.name, entry.size, entry.mtime_ns)
+
+    def version(self, entry: UploadEntry) -> Optional[str]:
+        digest = self.digest(entry)
+        return digest[:VERSION_LENGTH] if digest else None
+
+    def url(self, entry: UploadEntry, base: str = "") -> str:
+        """Link to entry, content-versioned once its hash is known."""
+        version = self.version(entry)
+        url = f"{base}{self.prefix}/{quote(entry.name)}"
+        return f"{url}?v={version}" if version else url
+
+    def find_stem(self, stem: str) -> Optional[UploadEntry]:
+        """File whose name without extension is stem, case-insensitively (INFY -> INFY.PNG)."""
+        index = self.index
+        if self._stems_version != index.version:
+            stems: Dict[str, str] = {}
+            entries, _next = index.page()
+            for e in entries:
+                root, ext = os.path.splitext(e.name)
+                if ext.lower() in LOGO_EXTENSIONS:
+                    stems.setdefault(root.upper(), e.name)
+            self._stems, self._stems_version = stems, index.version
+        name = self._stems.get((stem or "").strip().upper())
+        return index.get(name) if name else None
+
+    def sync(self) -> int:
+        """Hash new and changed files (runs on the background thread). Returns how many were hashed."""
+        index = self.index
+        index.refresh()
+        if index.version == self._synced_version:
+            return 0
+        version = index.version
+        entries, _next = index.page()
+        hashed = 0
+        for entry in entries:
+            if self.digest(entry) is not None:
+                continue
+            try:
+                digest = file_sha256(os.path.join(self.directory, entry.name))
+            except OSError:
+                continue  # vanished or unreadable; the next index change retries
+            self.manifest.put(entry.name, entry.size, entry.mtime_ns, digest)
+            hashed += 1
+        self.manifest.prune({e.name for e in entries})
+        self._synced_version = version
+        self.hashed += hashed
+        return hashed
+
+
+class AssetVersions:
+    """The versioned directories and the thread that keeps their hashes current."""
+
+    def __init__(self):
+        self.dirs: List[AssetDirectory] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def add(self, prefix: str, directory: str, manifest_path: Optional[str]) -> AssetDirectory:
+        assets = AssetDirectory(prefix, directory, manifest_path)
+        self.dirs.append(assets)
+        return assets
+
+    def sync(self) -> None:
+        for assets in self.dirs:
+            try:
+                assets.sync()
+                assets.manifest.save()
+            except Exception as e:
+                print(f"Hashing {assets.directory} failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="static-assets-hash", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(SYNC_SECONDS)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(SYNC_SECONDS + 1)
+            self._thread = None
+        for assets in self.dirs:
+            assets.manifest.save(force=True)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            assets.prefix: {"directory": assets.directory, "hashed_files": len(assets.manifest), "hashed": assets.hashed}
+            for assets in self.dirs
+        }
+
+
+# process-wide instances, one per static mount in main.py
+asset_versions = AssetVersions()
+uploads_assets = asset_versions.add(
+    "/announcements/file", ANNOUNCEMENTS_UPLOADS_DIR, os.path.join(CACHE_DIR, "uploads-hashes.json")
+)
+static_images_assets = asset_versions.add(
+    "/static/images", STATIC_IMAGES_DIR, os.path.join(CACHE_DIR, "static-images-hashes.json")
+)
+
+
+def logo_url(symbol: str, base: str = "") -> Optional[str]:
+    """Versioned /static/images URL of symbol's logo (any case, png/webp/jpg/svg), or None."""
+    entry = static_images_assets.find_stem(symbol)
+    return static_images_assets.url(entry, base) if entry else None
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks responses immutable when ?v= matches the file's content hash."""
+
+    def __init__(self, *, assets: AssetDirectory, **kwargs):
+        super().__init__(directory=assets.directory, **kwargs)
+        self.assets = assets
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        wanted = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        digest = self.assets.manifest.get(os.path.basename(full_path), stat_result.st_size, stat_result.st_mtime_ns)
+        immutable = wanted is not None and digest is not None and wanted == digest[:VERSION_LENGTH]
+        response.headers["Cache-Control"] = IMMUTABLE if immutable else REVALIDATE
+        return response
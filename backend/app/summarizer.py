@@ -0,0 +1,466 @@
+# ~/marketnews-app/backend/app/summarizer.py
+"""
+Background summarization of cards (fills Card.summary).
+
+SummaryWorker is one asyncio task per process. Each round it:
+
+  - selects up to BATCH_SIZE cards with text and a NULL summary, in id order
+    after the last card it saw (the cursor wraps to the start once it runs dry);
+  - looks the raw_text hashes up in summary_cache (models.SummaryCache), so a
+    text that was summarized once is never sent again, and duplicates inside
+    the batch are sent once;
+  - summarizes the remaining distinct texts concurrently, at most CONCURRENCY
+    at a time, retrying transient failures (timeouts, 429, 5xx) with
+    exponential backoff and jitter;
+  - writes the summaries and the new cache rows in one transaction (one
+    executemany UPDATE, one INSERT ... ON CONFLICT DO NOTHING).
+
+Database work runs in worker threads, so the event loop keeps serving
+requests. A text that fails for good is skipped until FAILED_RETRY_SECONDS
+have passed (for good = a non-retryable error or MAX_RETRIES exhausted).
+
+The model backend is pluggable, chosen by SUMMARY_BACKEND:
+
+  openai   chat completions through the openai client (OPENAI_API_KEY,
+           SUMMARY_MODEL, optional OPENAI_BASE_URL)
+  http     POST {"text": ..., "model": ...} to SUMMARY_URL and read
+           {"summary": ...} back; anything that speaks this works, such as
+           the local stub in benchmarks/summarizer.py
+  (unset)  no worker
+
+Run the worker in one process only: either set SUMMARY_BACKEND for a
+single-worker uvicorn (the lifespan hook starts it), or leave it unset there
+and run `python -m app.summarizer` next to the API.
+"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, select
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import Card, SummaryCache, summary_text_hash
+
+SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "").strip().lower()
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_URL = os.getenv("SUMMARY_URL", "http://127.0.0.1:8765/summarize")
+BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "100"))
+CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "4"))
+TIMEOUT_SECONDS = float(os.getenv("SUMMARY_TIMEOUT_SECONDS", "60"))
+# backoff before retry n (0-based): uniform(0.5, 1) * min(BACKOFF_MAX, BACKOFF_BASE * 2**n)
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# sleep between rounds once every summarizable card is done
+IDLE_SECONDS = float(os.getenv("SUMMARY_IDLE_SECONDS", "10"))
+FAILED_RETRY_SECONDS = 600.0
+# longer announcements are cut before they are sent (the head carries the news)
+MAX_INPUT_CHARS = 12000
+# window for the cards-per-minute figure in stats()
+RATE_WINDOW_SECONDS = 60.0
+
+PROMPT = (
+    "Summarize this Indian stock exchange corporate announcement for a retail investor "
+    "in at most two short sentences. Keep company names, amounts, record dates and ratios. "
+    "Answer with the summary only."
+)
+
+
+class SummaryError(Exception):
+    """A failed summarization. Retryable ones are retried with backoff (after retry_after seconds, if given)."""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+# -----------------------
+# backends
+# -----------------------
+class SummaryBackend:
+    """One text in, one summary out. Raise SummaryError for failures; other exceptions count as retryable."""
+    name = "none"
+
+    async def summarize(self, text: str) -> str:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPBackend(SummaryBackend):
+    """POST {"text", "model"} as JSON to url; the response is {"summary": ...}. One pooled aiohttp session."""
+    name = "http"
+
+    def __init__(self, url: str = SUMMARY_URL, model: str = SUMMARY_MODEL,
+                 concurrency: int = CONCURRENCY, timeout: float = TIMEOUT_SECONDS):
+        self.url = url
+        self.model = model
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._session = None
+
+    def _client(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            # created lazily: the session binds to the running loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def summarize(self, text: str) -> str:
+        import aiohttp
+
+        try:
+            async with self._client().post(self.url, json={"text": text, "model": self.model}) as resp:
+                if resp.status == 429 or resp.status >= 500:
+                    raise SummaryError(f"HTTP {resp.status}", retry_after=_retry_after(resp.headers.get("Retry-After")))
+                if resp.status >= 400:
+                    raise SummaryError(f"HTTP {resp.status}: {(await resp.text())[:200]}", retryable=False)
+                payload = await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise SummaryError(f"{type(e).__name__}: {e}") from e
+        summary = payload.get("summary") if isinstance(payload, dict) else None
+        if not isinstance(summary, str):
+            raise SummaryError("response has no 'summary' string", retryable=False)
+        return summary
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class OpenAIBackend(SummaryBackend):
+    """Chat completions through openai.AsyncOpenAI. Its own retries are off; the worker retries."""
+    name = "openai"
+
+    def __init__(self, model: str = SUMMARY_MODEL, timeout: float = TIMEOUT_SECONDS):
+        self.model = model
+        self.timeout = timeout
+        self._client = None
+
+    async def summarize(self, text: str) -> str:
+        import openai
+
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(max_retries=0, timeout=self.timeout)
+        try:
+            resp = await self._client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "system", "content": PROMPT}, {"role": "user", "content": text}],
+                temperature=0.2,
+                max_tokens=160,
+            )
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            headers = getattr(getattr(e, "response", None), "headers", None) or {}
+            raise SummaryError(f"{type(e).__name__}: {e}", retry_after=_retry_after(headers.get("retry-after"))) from e
+        except openai.APIStatusError as e:
+            raise SummaryError(f"{type(e).__name__}: {e}", retryable=False) from e
+        return resp.choices[0].message.content or ""
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+BACKENDS: Dict[str, Callable[[], SummaryBackend]] = {
+    "http": HTTPBackend,
+    "openai": OpenAIBackend,
+}
+
+
+def make_backend(name: str = SUMMARY_BACKEND) -> Optional[SummaryBackend]:
+    """The backend for SUMMARY_BACKEND, or None when it is unset. Raises ValueError for an unknown name."""
+    if not name:
+        return None
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SUMMARY_BACKEND '{name}' (expected one of {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]()
+
+
+def _cache_insert_stmt(session: Session):
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(SummaryCache)
+    return dialect_insert(SummaryCache).on_conflict_do_nothing(index_elements=["text_hash"])
+
+
+# cards the worker still has to summarize (a card without text gets no summary)
+_PENDING = (Card.summary.is_(None), func.length(func.trim(Card.raw_text)) > 0)
+
+# executemany; only cards that are still unsummarized (an admin may have written one meanwhile)
+_UPDATE_SUMMARY = (
+    Card.__table__.update()
+    .where(Card.__table__.c.id == bindparam("card_id"), Card.__table__.c.summary.is_(None))
+    .values(summary=bindparam("new_summary"))
+)
+
+
+# -----------------------
+# worker
+# -----------------------
+class SummaryWorker:
+    """
+    Fills Card.summary in the background; see the module docstring.
+
+        worker = SummaryWorker(HTTPBackend("http://127.0.0.1:8765/summarize"))
+        worker.start()          # in a running loop
+        ...
+        await worker.stop()
+
+    run_once() processes a single batch, for scripts and benchmarks.
+    """
+
+    def __init__(
+        self,
+        backend: SummaryBackend,
+        batch_size: int = BATCH_SIZE,
+        concurrency: int = CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        idle_seconds: float = IDLE_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.idle_seconds = idle_seconds
+        self._session_factory = session_factory
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._after_id = 0
+        self._failed: Dict[str, Tuple[float, str]] = {}  # text hash -> (retry after, monotonic; error)
+        self._recent: Deque[Tuple[float, int]] = deque()  # (monotonic, cards written) inside RATE_WINDOW_SECONDS
+        self.queue_depth: Optional[int] = None  # cards with a NULL summary, counted at the start of each pass
+        self.in_flight = 0
+        self.batches = 0
+        self.summarized = 0     # cards written
+        self.generated = 0      # backend calls that returned a summary
+        self.cache_hits = 0     # distinct texts answered from summary_cache
+        self.deduplicated = 0   # cards that shared a text with another card in their batch
+        self.retries = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._busy_seconds = 0.0
+
+    # -----------------------
+    # database (worker threads)
+    # -----------------------
+    def _select(self, after_id: int) -> List[Tuple[int, str]]:
+        with self._session_factory() as session:
+            return [
+                tuple(row) for row in session.execute(
+                    select(Card.id, Card.raw_text)
+                    .where(*_PENDING, Card.id > after_id)
+                    .order_by(Card.id)
+                    .limit(self.batch_size)
+                )
+            ]
+
+    def _count_pending(self) -> int:
+        with self._session_factory() as session:
+            return session.execute(select(func.count()).select_from(Card).where(*_PENDING)).scalar_one()
+
+    def _cached(self, hashes: List[str]) -> Dict[str, str]:
+        with self._session_factory() as session:
+            return dict(
+                session.execute(
+                    select(SummaryCache.text_hash, SummaryCache.summary).where(SummaryCache.text_hash.in_(hashes))
+                ).all()
+            )
+
+    def _write(self, updates: List[Dict[str, Any]], fresh: Dict[str, str]) -> int:
+        with self._session_factory() as session:
+            if fresh:
+                session.execute(
+                    _cache_insert_stmt(session),
+                    [{"text_hash": h, "summary": s, "model": self.backend.name} for h, s in fresh.items()],
+                )
+            written = session.connection().execute(_UPDATE_SUMMARY, updates).rowcount if updates else 0
+            session.commit()
+        # some drivers report -1 for executemany
+        return written if written >= 0 else len(updates)
+
+    # -----------------------
+    # summarization
+    # -----------------------
+    async def _summarize(self, text_hash: str, text: str) -> Optional[str]:
+        """Summary of text, or None (recorded in _failed) once retries are exhausted."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        text = text.strip()[:MAX_INPUT_CHARS]
+        for attempt in range(self.max_retries + 1):
+            # the slot is released while backing off, so other texts can use it
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    summary = (await self.backend.summarize(text)).strip()
+                    if not summary:
+                        raise SummaryError("empty summary", retryable=False)
+                    self.generated += 1
+                    return summary
+                except SummaryError as e:
+                    error = e
+                except Exception as e:
+                    error = SummaryError(f"{type(e).__name__}: {e}")
+                finally:
+                    self.in_flight -= 1
+            self.last_error = str(error)
+            if not error.retryable or attempt == self.max_retries:
+                break
+            self.retries += 1
+            delay = error.retry_after
+            if delay is None:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+            await asyncio.sleep(min(delay, BACKOFF_MAX))
+        self.failures += 1
+        self._failed[text_hash] = (time.monotonic() + FAILED_RETRY_SECONDS, str(error))
+        print(f"Summary failed for text {text_hash[:12]}: {error}")
+        return None
+
+    async def run_once(self) -> int:
+        """Summarize one batch after the cursor. Returns the number of cards selected (0 once past the last one)."""
+        started = time.perf_counter()
+        if self._after_id == 0:
+            self.queue_depth = await asyncio.to_thread(self._count_pending)
+        rows = await asyncio.to_thread(self._select, self._after_id)
+        if not rows:
+            self._after_id = 0
+            return 0
+        self._after_id = rows[-1][0]
+
+        ids_by_hash: Dict[str, List[int]] = {}
+        texts: Dict[str, str] = {}
+        for card_id, raw_text in rows:
+            h = summary_text_hash(raw_text)
+            ids_by_hash.setdefault(h, []).append(card_id)
+            texts.setdefault(h, raw_text)
+        self.deduplicated += len(rows) - len(ids_by_hash)
+
+        summaries = await asyncio.to_thread(self._cached, list(ids_by_hash))
+        self.cache_hits += len(summaries)
+        now = time.monotonic()
+        todo = [h for h in ids_by_hash if h not in summaries and self._failed.get(h, (0.0, ""))[0] <= now]
+        results = await asyncio.gather(*(self._summarize(h, texts[h]) for h in todo))
+        fresh = {h: s for h, s in zip(todo, results) if s is not None}
+        for h in fresh:
+            self._failed.pop(h, None)
+        summaries.update(fresh)
+
+        updates = [
+            {"card_id": card_id, "new_summary": summaries[h]}
+            for h, card_ids in ids_by_hash.items() if h in summaries
+            for card_id in card_ids
+        ]
+        written = await asyncio.to_thread(self._write, updates, fresh)
+        self.batches += 1
+        self.summarized += written
+        if self.queue_depth is not None:
+            self.queue_depth = max(0, self.queue_depth - written)
+        self._recent.append((time.monotonic(), written))
+        self._busy_seconds += time.perf_counter() - started
+        return len(rows)
+
+    # -----------------------
+    # background task
+    # -----------------------
+    async def _run(self) -> None:
+        while True:
+            try:
+                selected = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Summary worker round failed: {e}")
+                selected = 0
+            if not selected:
+                await asyncio.sleep(self.idle_seconds)
+
+    def start(self) -> None:
+        """Start the background task on the running loop (no-op if it is already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="summary-worker")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW_SECONDS:
+            self._recent.popleft()
+        return {
+            "backend": self.backend.name,
+            "running": self._task is not None and not self._task.done(),
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "summarized": self.summarized,
+            "generated": self.generated,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "retries": self.retries,
+            "failures": self.failures,
+            "failed_texts": len(self._failed),
+            "cards_per_minute": round(sum(n for _t, n in self._recent) * 60.0 / RATE_WINDOW_SECONDS, 1),
+            "cards_per_busy_second": round(self.summarized / self._busy_seconds, 1) if self._busy_seconds else None,
+            "last_error": self.last_error,
+        }
+
+
+# process-wide worker, None unless SUMMARY_BACKEND is set; main's lifespan starts it
+_backend = make_backend()
+summary_worker: Optional[SummaryWorker] = SummaryWorker(_backend) if _backend is not None else None
+
+
+async def _main() -> None:
+    from . import db
+
+    backend = make_backend(SUMMARY_BACKEND or "http")
+    db.init_db()
+    worker = SummaryWorker(backend)
+    print(f"Summary worker: backend={backend.name} batch={worker.batch_size} concurrency={worker.concurrency}")
+    worker.start()
+    try:
+        while True:
+            await asyncio.sleep(30)
+            print(worker.stats())
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,135 @@
+# ~/marketnews-app/backend/app/symbol_index.py
+"""
+Ticker resolution index built once per EOD snapshot.
+
+`market_summary()` used to resolve a ticker with up to five linear passes over
+every row. SymbolIndex answers the same five questions from hash maps and a
+character n-gram index, and returns the same row the linear passes would:
+
+  1) exact symbol (case-insensitive)
+  2) exact normalize_text(symbol)
+  3) normalized symbol contains the normalized ticker
+  4) description contains the ticker text
+  5) description contains any alphanumeric token of the ticker
+
+Within a pass the first row in file order wins, so every lookup structure keeps
+row ids in ascending order.
+"""
+import re
+from typing import Dict, List, Optional, Sequence
+
+from .eod_schema import EodRecord
+
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]")
+_TOKEN_SPLIT_RE = re.compile(r"\s+|[^A-Za-z0-9]+")
+
+
+def normalize_text(s: Optional[str]) -> str:
+    if s is None:
+        return ""
+    return _NON_ALNUM_RE.sub("", str(s)).strip().upper()
+
+
+class SubstringIndex:
+    """
+    Character n-gram index answering "first text (by position) containing needle".
+
+    Every 1..n-gram of every text is posted to an ascending list of text ids.
+    Needles shorter than n are answered straight from their posting list; longer
+    needles walk the rarest of their n-grams' postings and verify with `in`.
+    """
+
+    def __init__(self, texts: Sequence[Optional[str]], n: int = 3):
+        self.n = n
+        self._texts = texts
+        self._postings: Dict[str, List[int]] = {}
+        self._first_any: Optional[int] = None
+        for i, text in enumerate(texts):
+            if text is None:
+                continue
+            if self._first_any is None:
+                self._first_any = i
+            seen = set()
+            for size in range(1, n + 1):
+                for start in range(0, len(text) - size + 1):
+                    gram = text[start:start + size]
+                    if gram in seen:
+                        continue
+                    seen.add(gram)
+                    self._postings.setdefault(gram, []).append(i)
+
+    def first(self, needle: str) -> Optional[int]:
+        if needle == "":
+            return self._first_any
+        if len(needle) <= self.n:
+            posting = self._postings.get(needle)
+            return posting[0] if posting else None
+
+        rarest: Optional[List[int]] = None
+        for start in range(0, len(needle) - self.n + 1):
+            posting = self._postings.get(needle[start:start + self.n])
+            if not posting:
+                return None
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        texts = self._texts
+        for i in rarest or ():
+            if needle in texts[i]:
+                return i
+        return None
+
+
+class SymbolIndex:
+    """Row lookup for one EOD file; build once, query from any thread."""
+
+    def __init__(self, symbols: Sequence[Optional[str]], descriptions: Sequence[Optional[str]]):
+        self._exact: Dict[str, int] = {}
+        self._normalized: Dict[str, int] = {}
+        norm_symbols: List[Optional[str]] = []
+        for i, sym in enumerate(symbols):
+            if not sym:
+                norm_symbols.append(None)
+                continue
+            if isinstance(sym, str):
+                self._exact.setdefault(sym.strip().upper(), i)
+            norm = normalize_text(sym)
+            self._normalized.setdefault(norm, i)
+            norm_symbols.append(norm)
+        self._symbol_substrings = SubstringIndex(norm_symbols)
+        self._description_substrings = SubstringIndex(
+            [d.lower() if d and isinstance(d, str) else None for d in descriptions]
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[EodRecord]) -> "SymbolIndex":
+        return cls([r.symbol for r in records], [r.company for r in records])
+
+    def resolve(self, ticker: str) -> Optional[int]:
+        """Row id for ticker using the five-pass precedence above, or None."""
+        t_raw = (ticker or "").strip()
+        if not t_raw:
+            return None
+        t = t_raw.upper()
+        t_norm = normalize_text(t_raw)
+
+        i = self._exact.get(t)
+        if i is not None:
+            return i
+        i = self._normalized.get(t_norm)
+        if i is not None:
+            return i
+        i = self._symbol_substrings.first(t_norm)
+        if i is not None:
+            return i
+        i = self._description_substrings.first(t_raw.lower())
+        if i is not None:
+            return i
+
+        best: Optional[int] = None
+        for tok in _TOKEN_SPLIT_RE.split(t_raw):
+            if not tok:
+                continue
+            i = self._description_substrings.first(tok.lower())
+            if i is not None and (best is None or i < best):
+                best = i
+        return best
@@ -0,0 +1,153 @@
+# ~/marketnews-app/backend/app/symbol_master.py
+"""
+The one symbol master shared by every router.
+
+A SymbolMaster is an immutable view of the latest EOD file: the snapshot
+(records, ticker index, numeric columns), a SYMBOL -> company dict and the
+compiled filename matcher. SymbolMasterService builds it at startup (see the
+lifespan hook in main.py) and, when a newer or rewritten EOD file shows up,
+builds the next one off to the side and swaps a single reference, so a request
+always sees one consistent version.
+
+Routers take it as a dependency:
+
+    def endpoint(master: SymbolMaster = Depends(get_symbol_master)): ...
+"""
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from .aho_corasick import CompanyMatcher
+from .eod import EodSnapshot, SnapshotCache
+from .paths import DATA_DIR
+
+# leading ticker-like token of an upload name (RELIANCE_Q2.pdf -> RELIANCE)
+_TICKER_PREFIX_RE = re.compile(r"^([A-Z0-9\.\-]{1,20})")
+
+
+@dataclass(frozen=True)
+class SymbolMaster:
+    snapshot: Optional[EodSnapshot]
+    companies: Dict[str, str] = field(default_factory=dict)  # SYMBOL -> company (symbol if blank)
+    matcher: Optional[CompanyMatcher] = None
+    built_at: float = 0.0
+    build_seconds: float = 0.0
+    error: Optional[str] = None  # why there is no snapshot, when there is none
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.snapshot.version if self.snapshot else None
+
+    @property
+    def csv_filename(self) -> Optional[str]:
+        return self.snapshot.filename if self.snapshot else None
+
+    def company(self, symbol: str) -> Optional[str]:
+        """Company for an exact symbol (case-insensitive), O(1)."""
+        return self.companies.get((symbol or "").strip().upper())
+
+    def match_filename(self, filename: str) -> Optional[str]:
+        """Symbol whose ticker or company name best matches filename (see CompanyMatcher)."""
+        return self.matcher.match(filename) if self.matcher is not None else None
+
+    def resolve_filename(self, filename: str) -> Tuple[str, Optional[str]]:
+        """
+        (ticker guess, symbol) for an upload name. The guess is the name's
+        leading ticker-like token; the symbol is that token when it is listed
+        (with or without a .E1 suffix), else the best CompanyMatcher match,
+        else None.
+        """
+        guess = os.path.splitext(filename)[0].strip().upper()
+        m = _TICKER_PREFIX_RE.match(guess)
+        if m:
+            guess = m.group(1)
+        for candidate in (guess, guess.replace(".E1", "")):
+            if candidate in self.companies:
+                return guess, candidate
+        return guess, self.match_filename(filename)
+
+
+def build_master(snapshot: EodSnapshot) -> SymbolMaster:
+    started = time.perf_counter()
+    companies: Dict[str, str] = {}
+    for rec in snapshot.records:
+        if rec.symbol:
+            # first row wins, as in the ticker index
+            companies.setdefault(rec.symbol.upper(), rec.company or rec.symbol.upper())
+    return SymbolMaster(
+        snapshot=snapshot,
+        companies=companies,
+        matcher=CompanyMatcher(companies) if companies else None,
+        built_at=time.time(),
+        build_seconds=time.perf_counter() - started,
+    )
+
+
+class SymbolMasterService:
+    """Keeps the current SymbolMaster for a SnapshotCache and swaps it when the EOD file changes."""
+
+    def __init__(self, cache: SnapshotCache):
+        self.cache = cache
+        self._master = SymbolMaster(snapshot=None, error="not loaded yet")
+        self._build_lock = threading.Lock()
+        self.swaps = 0
+        self.errors = 0
+
+    def load(self) -> SymbolMaster:
+        """Build the master now (called from the app lifespan so the first request is warm)."""
+        return self.current()
+
+    def current(self) -> SymbolMaster:
+        """
+        The master for the latest EOD file. Costs a couple of stats when nothing
+        changed. If reloading fails, the previous master keeps being served.
+        """
+        master = self._master
+        try:
+            snapshot = self.cache.get()
+        except Exception as e:
+            self.errors += 1
+            print(f"Symbol master reload failed: {e}")
+            if master.snapshot is not None:
+                return master
+            return SymbolMaster(snapshot=None, error=f"Failed reading CSV: {e}")
+        if snapshot is None:
+            missing = f"EOD CSV not found in {self.cache.data_dir}"
+            if master.snapshot is not None or master.error != missing:
+                master = self._master = SymbolMaster(snapshot=None, error=missing)
+            return master
+        if snapshot is master.snapshot:
+            return master
+        with self._build_lock:
+            master = self._master
+            if snapshot is not master.snapshot:
+                master = build_master(snapshot)
+                self._master = master
+                self.swaps += 1
+        return master
+
+    def stats(self) -> Dict[str, Any]:
+        master = self._master
+        return {
+            "version": master.version,
+            "csv_filename": master.csv_filename,
+            "symbols": len(master.companies),
+            "matcher_states": master.matcher.states if master.matcher is not None else 0,
+            "build_seconds": round(master.build_seconds, 4),
+            "swaps": self.swaps,
+            "errors": self.errors,
+            "error": master.error,
+        }
+
+
+# process-wide instances; routers go through get_symbol_master
+snapshot_cache = SnapshotCache(DATA_DIR)
+symbol_master_service = SymbolMasterService(snapshot_cache)
+
+
+def get_symbol_master() -> SymbolMaster:
+    """FastAPI dependency: the current shared SymbolMaster."""
+    return symbol_master_service.current()
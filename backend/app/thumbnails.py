@@ -0,0 +1,366 @@
+# ~/marketnews-app/backend/app/thumbnails.py
+"""
+Thumbnails for announcement uploads.
+
+Phones used to download the full-size upload (a 300 KB, 1900 px PNG) to draw a
+card. For every image and PDF in the uploads folder we now render resized
+WebP and JPEG variants (WIDTHS) once; a PDF gets a preview of its first page.
+
+  - Rendering runs in a process pool (decoding and resizing are CPU-bound and
+    would hold the GIL), fed by a background thread that submits every upload
+    the UploadsIndex discovers, and on demand by /announcements/thumb.
+  - Results are cached on disk by content hash under THUMBS_DIR:
+    ab/<sha256>-<width>.<webp|jpg> plus <sha256>.json with the dimensions, so
+    identical files share thumbnails and a restart re-renders nothing.
+    name -> sha256 comes from the uploads' HashManifest (static_assets), so
+    unchanged files are not re-hashed either.
+
+Pillow is optional (pip install pillow), and pypdfium2 is optional on top of
+it for PDF previews. Without them `enabled` is False, list-enriched returns
+no thumbnail and /announcements/thumb redirects to the original file.
+"""
+import hashlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from .paths import ANNOUNCEMENTS_UPLOADS_DIR, THUMBS_DIR
+from .static_assets import HashManifest, uploads_assets
+from .uploads_index import UploadEntry, UploadsIndex
+
+# probed, not imported: Pillow and pypdfium2 load only in the render workers,
+# which keeps them (~100 ms of imports) off the API's startup path
+HAVE_PIL = importlib.util.find_spec("PIL") is not None
+HAVE_PDFIUM = importlib.util.find_spec("pypdfium2") is not None
+
+WIDTHS = (160, 320, 640)
+DEFAULT_WIDTH = 320
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+QUALITY = int(os.getenv("THUMB_QUALITY", "80"))
+WORKERS = int(os.getenv("THUMB_WORKERS", str(min(4, os.cpu_count() or 1))))
+SYNC_SECONDS = 1.0
+# at most this many renders are queued in the pool; the background thread
+# feeds the rest in slices, requests only top the queue up to it
+MAX_IN_FLIGHT = 64
+# an upload in flight this many times when the pool broke is taken for the culprit and failed
+MAX_POOL_BREAKS = 3
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+PDF_EXTENSIONS = (".pdf",)
+
+
+def _ext(fmt: str) -> str:
+    return "jpg" if fmt == "jpeg" else fmt
+
+
+def variant_path(thumbs_dir: str, digest: str, width: int, fmt: str) -> str:
+    return os.path.join(thumbs_dir, digest[:2], f"{digest}-{width}.{_ext(fmt)}")
+
+
+def meta_path(thumbs_dir: str, digest: str) -> str:
+    return os.path.join(thumbs_dir, digest[:2], f"{digest}.json")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# -----------------------
+# rendering (runs in the pool's worker processes)
+# -----------------------
+def _open_source(data: bytes, is_pdf: bool, max_width: int):
+    from PIL import Image, ImageOps
+
+    if is_pdf:
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(data)
+        try:
+            page = pdf[0]
+            # render straight at the largest thumbnail width instead of full size
+            image = page.render(scale=max_width / page.get_width()).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+        return image
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (max_width, max_width * 4))  # JPEG: decode at a reduced scale when possible
+    return ImageOps.exif_transpose(image)
+
+
+def _flatten(image):
+    """RGB on white: uploads are documents, and JPEG has no alpha."""
+    from PIL import Image
+
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_thumbnails(src_path: str, thumbs_dir: str, widths=WIDTHS, quality: int = QUALITY) -> Dict[str, Any]:
+    """
+    Hash src_path and render its variants unless the hash is already cached.
+    Returns the meta dict: digest, kind, source width/height and
+    variants {width: [w, h]}. The .json is written last, so it only exists
+    once every variant does.
+    """
+    with open(src_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    mpath = meta_path(thumbs_dir, digest)
+    if os.path.exists(mpath):
+        with open(mpath, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    from PIL import Image
+
+    is_pdf = src_path.lower().endswith(PDF_EXTENSIONS)
+    image = _flatten(_open_source(data, is_pdf, max(widths)))
+    src_w, src_h = image.size
+    os.makedirs(os.path.dirname(mpath), exist_ok=True)
+
+    variants: Dict[str, Any] = {}
+    current = image
+    for width in sorted(widths, reverse=True):
+        tw = min(width, src_w)
+        th = max(1, round(src_h * tw / src_w))
+        if current.size != (tw, th):
+            # each smaller variant is resized from the previous one: cheaper, same quality at these ratios
+            current = current.resize((tw, th), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in FORMATS:
+            buf = io.BytesIO()
+            current.save(buf, format=fmt.upper(), quality=quality, **({"method": 4} if fmt == "webp" else {"optimize": True}))
+            _write_atomic(variant_path(thumbs_dir, digest, width, fmt), buf.getvalue())
+        variants[str(width)] = [tw, th]
+
+    meta = {"digest": digest, "kind": "pdf" if is_pdf else "image", "width": src_w, "height": src_h, "variants": variants}
+    _write_atomic(mpath, json.dumps(meta).encode("utf-8"))
+    return meta
+
+
+# -----------------------
+# service (API process)
+# -----------------------
+class ThumbnailService:
+    """Finds uploads without thumbnails, renders them in a process pool and answers lookups."""
+
+    def __init__(self, uploads_dir: str, thumbs_dir: str, hashes: Optional[HashManifest] = None, workers: int = WORKERS):
+        self.uploads_dir = uploads_dir
+        self.thumbs_dir = thumbs_dir
+        self.hashes = hashes if hashes is not None else HashManifest(None)  # name -> sha256, shared with the file URLs
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._metas: Dict[str, Dict[str, Any]] = {}            # sha256 -> meta
+        self._pending: Dict[Tuple[str, int], Future] = {}      # (name, mtime_ns) -> render
+        self._failed: Dict[Tuple[str, int], str] = {}          # not retried until the file changes
+        self._breaks: Dict[Tuple[str, int], int] = {}          # pool breaks while in flight
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.rendered = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return HAVE_PIL
+
+    def handles(self, name: str) -> bool:
+        lower = name.lower()
+        if lower.endswith(PDF_EXTENSIONS):
+            return self.enabled and HAVE_PDFIUM
+        return self.enabled and lower.endswith(IMAGE_EXTENSIONS)
+
+    # -----------------------
+    # lookups
+    # -----------------------
+    def _is_current(self, entry: UploadEntry) -> bool:
+        """Whether this exact version of entry has been rendered."""
+        return self.lookup(entry) is not None
+
+    def lookup(self, entry: UploadEntry) -> Optional[Dict[str, Any]]:
+        """Meta for the current version of entry, or None if it has not been rendered yet. O(1)."""
+        digest = self.hashes.get(entry.name, entry.size, entry.mtime_ns)
+        if digest is None:
+            return None
+        with self._lock:
+            meta = self._metas.get(digest)
+        if meta is None:
+            try:
+                with open(meta_path(self.thumbs_dir, digest), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                return None
+            with self._lock:
+                self._metas[digest] = meta
+        return meta
+
+    def variant(self, meta: Dict[str, Any], width: int, fmt: str) -> Tuple[str, int, int]:
+        """(path, width, height) of the smallest rendered variant at least `width` wide (else the largest)."""
+        widths = sorted(int(w) for w in meta["variants"])
+        chosen = next((w for w in widths if w >= width), widths[-1])
+        tw, th = meta["variants"][str(chosen)]
+        return variant_path(self.thumbs_dir, meta["digest"], chosen, fmt), tw, th
+
+    # -----------------------
+    # rendering
+    # -----------------------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the API process runs threads (watchers, this service)
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, entry: UploadEntry) -> Future:
+        """Render entry in the pool (or join the render already running). The future's result is the meta."""
+        key = (entry.name, entry.mtime_ns)
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                return fut
+            fut = self._executor().submit(
+                render_thumbnails, os.path.join(self.uploads_dir, entry.name), self.thumbs_dir
+            )
+            self._pending[key] = fut
+        fut.add_done_callback(lambda f, entry=entry: self._finished(entry, f))
+        return fut
+
+    def _finished(self, entry: UploadEntry, fut: Future) -> None:
+        key = (entry.name, entry.mtime_ns)
+        with self._lock:
+            self._pending.pop(key, None)
+            try:
+                meta = fut.result()
+            except BrokenProcessPool as e:
+                # a worker died (OOM, killed): start a new pool next time; the file may be fine,
+                # unless it was in flight for MAX_POOL_BREAKS breaks, which makes it the likely cause
+                self.errors += 1
+                self._pool = None
+                breaks = self._breaks[key] = self._breaks.get(key, 0) + 1
+                if breaks >= MAX_POOL_BREAKS:
+                    self._failed[key] = f"worker died {breaks} times while rendering it"
+                print(f"Thumbnail pool broke while rendering {entry.name}: {e}")
+                return
+            except Exception as e:
+                self.errors += 1
+                self._failed[key] = str(e)
+                print(f"Thumbnail failed for {entry.name}: {e}")
+                return
+            self._breaks.pop(key, None)
+            self._metas[meta["digest"]] = meta
+            self.rendered += 1
+        self.hashes.put(entry.name, entry.size, entry.mtime_ns, meta["digest"])
+
+    def failed(self, entry: UploadEntry) -> bool:
+        """This version of entry could not be rendered (not an image, corrupt...)."""
+        return (entry.name, entry.mtime_ns) in self._failed
+
+    def ensure(self, entry: UploadEntry) -> Optional[Dict[str, Any]]:
+        """
+        Meta if ready; otherwise queue the render (unless it already failed or
+        MAX_IN_FLIGHT renders are queued, which the background sync works
+        through) and return None.
+        """
+        meta = self.lookup(entry)
+        if meta is None and self.handles(entry.name) and not self.failed(entry) and len(self._pending) < MAX_IN_FLIGHT:
+            self.submit(entry)
+        return meta
+
+    def sync(self, index: UploadsIndex) -> int:
+        """Queue renders for uploads that have none, up to MAX_IN_FLIGHT at a time. Returns how many were queued."""
+        queued = 0
+        entries, _next = index.page()
+        for entry in entries:
+            if len(self._pending) >= MAX_IN_FLIGHT:
+                break
+            if not self.handles(entry.name) or self.failed(entry):
+                continue
+            if (entry.name, entry.mtime_ns) in self._pending or self._is_current(entry):
+                continue
+            self.submit(entry)
+            queued += 1
+        return queued
+
+    # -----------------------
+    # background discovery
+    # -----------------------
+    def start(self, index_factory: Callable[[], UploadsIndex]) -> None:
+        """Render thumbnails for existing and newly discovered uploads on a daemon thread."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sync_loop, args=(index_factory,), name="thumbnails-sync", daemon=True)
+        self._thread.start()
+
+    def _sync_loop(self, index_factory: Callable[[], UploadsIndex]) -> None:
+        version = -1
+        while not self._stop.is_set():
+            try:
+                index = index_factory()
+                index.refresh()
+                # re-sync while renders are still being fed in MAX_IN_FLIGHT slices
+                if index.version != version or self._pending:
+                    version = index.version
+                    self.sync(index)
+                self.hashes.save()
+            except Exception as e:
+                print(f"Thumbnail sync failed: {e}")
+            self._stop.wait(SYNC_SECONDS)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(SYNC_SECONDS + 1)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.hashes.save(force=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pdf_previews": self.enabled and HAVE_PDFIUM,
+            "thumbs_dir": self.thumbs_dir,
+            "workers": self.workers,
+            "known": len(self._metas),
+            "pending": len(self._pending),
+            "rendered": self.rendered,
+            "errors": self.errors,
+        }
+
+
+# process-wide instance for the uploads folder
+thumbnail_service = ThumbnailService(ANNOUNCEMENTS_UPLOADS_DIR, THUMBS_DIR, uploads_assets.manifest)
+
+
+def thumbnail_info(entry: UploadEntry, base: str, width: int = DEFAULT_WIDTH) -> Optional[Dict[str, Any]]:
+    """
+    The thumbnail fields list-enriched returns for entry: url, width, height.
+    The url carries the content version (v) once the file is hashed.
+    width/height are None while the render is still queued. None when the file
+    type has no thumbnails (or Pillow is missing) or the file could not be rendered.
+    """
+    if not thumbnail_service.handles(entry.name) or thumbnail_service.failed(entry):
+        return None
+    url = f"{base}/announcements/thumb/{quote(entry.name)}?w={width}"
+    version = uploads_assets.version(entry)
+    if version:
+        url += f"&v={version}"
+    meta = thumbnail_service.ensure(entry)
+    if meta is None:
+        return {"url": url, "width": None, "height": None}
+    _path, tw, th = thumbnail_service.variant(meta, width, "webp")
+    return {"url": url, "width": tw, "height": th}
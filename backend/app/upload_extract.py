@@ -0,0 +1,471 @@
+# ~/marketnews-app/backend/app/upload_extract.py
+"""
+Searchable cards from announcement uploads.
+
+UploadExtractor turns every PDF (and, with OCR, every image) in the uploads
+folder into a Card whose raw_text is the file's text, so /cards/search finds
+announcement content and the summarizer picks it up.
+
+  - A background thread walks the UploadsIndex newest first and submits
+    files to a process pool (upload_text.extract_text: pypdfium2 text, OCR
+    for images and scanned PDFs), at most MAX_IN_FLIGHT at a time. Workers
+    run at EXTRACT_NICE, so a backfill yields the CPU to the API workers.
+  - Work is keyed by content hash: name -> sha256 comes from the uploads'
+    HashManifest (static_assets), and the upload_texts table
+    (models.UploadText) records each hash once it is processed (done,
+    no_text or failed). It is the resumable queue: after a restart only
+    files whose hash is not in it are extracted, and a copy of a processed
+    file under another name is not extracted again. A failed file (also one
+    that was in flight for MAX_POOL_BREAKS pool crashes) is tried again once
+    FAILED_RETRY_SECONDS have passed, in this process or the next.
+  - Finished files are written in one transaction per tick: cards are
+    upserted by their file URL (/announcements/file/<name>), so a rewritten
+    upload updates its card (and clears the stale summary) instead of adding
+    one. company and metadata.symbol come from the symbol master
+    (SymbolMaster.resolve_filename), event_type from upload_text.classify_event.
+
+stats() (GET /announcements/extract-stats, and /metrics) reports the backlog,
+files per minute and per-file timings by method.
+
+For a backfill of a large folder, set UPLOAD_EXTRACT=0 for the API and run
+`python -m app.upload_extract --workers N` next to it; it exits once the
+backlog is empty (--watch keeps it running). Several processes may run at
+once: the upserts are keyed, so at worst a file is extracted twice.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import upload_text
+from .db import SessionLocal
+from .metrics import stage_duration
+from .models import Card, UploadText, card_content_hash, utc_now
+from .paths import ANNOUNCEMENTS_UPLOADS_DIR
+from .static_assets import HashManifest, file_sha256, uploads_assets
+from .symbol_master import SymbolMaster, symbol_master_service
+from .uploads_index import UploadEntry, UploadsIndex, get_uploads_index
+
+ENABLED = os.getenv("UPLOAD_EXTRACT", "1") != "0"
+WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(2, os.cpu_count() or 1))))
+NICE = int(os.getenv("EXTRACT_NICE", "10"))
+SYNC_SECONDS = 1.0
+# the background thread keeps at most this many files queued in the pool
+MAX_IN_FLIGHT = 64
+# a file whose extraction failed (corrupt, pool error) is retried after this long
+FAILED_RETRY_SECONDS = 600.0
+# a file in flight this many times when the pool broke is taken for the culprit and failed
+MAX_POOL_BREAKS = 3
+# Card.source of the cards written here
+UPLOAD_SOURCE = "UPLOAD"
+# per-file timings kept for stats()
+RECENT_FILES = 20
+# window for the files-per-minute figure in stats()
+RATE_WINDOW_SECONDS = 60.0
+
+
+def upload_card_url(name: str) -> str:
+    """Unversioned file URL of an upload: the key its card is upserted by."""
+    return f"{uploads_assets.prefix}/{quote(name)}"
+
+
+class UploadExtractor:
+    """Extracts upload text in a process pool and upserts cards; see the module docstring."""
+
+    def __init__(
+        self,
+        uploads_dir: str,
+        hashes: Optional[HashManifest] = None,
+        workers: int = WORKERS,
+        niceness: int = NICE,
+        session_factory: Callable[[], Session] = SessionLocal,
+        master_factory: Callable[[], SymbolMaster] = symbol_master_service.current,
+    ):
+        self.uploads_dir = uploads_dir
+        self.hashes = hashes if hashes is not None else HashManifest(None)
+        self.workers = max(1, workers)
+        self.niceness = niceness
+        self._session_factory = session_factory
+        self._master_factory = master_factory
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._done: Optional[Set[str]] = None                        # processed hashes, loaded from upload_texts
+        self._failed: Dict[str, float] = {}                          # sha256 -> retry after (monotonic)
+        self._breaks: Dict[str, int] = {}                            # sha256 -> pool breaks while in flight
+        self._pending: Dict[str, Future] = {}                        # sha256 -> extraction
+        self._finished: List[Tuple[UploadEntry, str, Dict[str, Any]]] = []  # (entry, sha256, result or {"error"})
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_FILES)
+        self._rate: Deque[Tuple[float, int]] = deque()               # (monotonic, files written)
+        self._by_method: Dict[str, List[float]] = {}                 # method -> [files, seconds, max seconds]
+        self.backlog: Optional[int] = None  # handled files not processed yet, counted at each sync
+        self.extracted = 0     # files with text
+        self.no_text = 0
+        self.failed = 0
+        self.cards_inserted = 0
+        self.cards_updated = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return upload_text.HAVE_PDFIUM or upload_text.ocr_available()
+
+    # -----------------------
+    # queue state
+    # -----------------------
+    def _load_done(self) -> Set[str]:
+        """
+        Hashes in upload_texts, minus images stored without text while OCR was
+        missing (retried once it exists) and failed files, which go to _failed
+        with the rest of their FAILED_RETRY_SECONDS.
+        """
+        retry_no_ocr = upload_text.ocr_available()
+        with self._session_factory() as session:
+            rows = session.execute(
+                select(UploadText.content_hash, UploadText.status, UploadText.method, UploadText.updated_at)
+            ).all()
+        now, utc = time.monotonic(), utc_now()
+        done = set()
+        for h, status, method, updated_at in rows:
+            if status == "failed":
+                age = (utc - updated_at).total_seconds() if updated_at is not None else FAILED_RETRY_SECONDS
+                self._failed[h] = now + max(0.0, FAILED_RETRY_SECONDS - age)
+            elif not (retry_no_ocr and status == "no_text" and method == "none"):
+                done.add(h)
+        return done
+
+    def _waiting(self, digest: str, now: float) -> bool:
+        """digest failed and its retry is not due yet."""
+        return self._failed.get(digest, 0.0) > now
+
+    def _retry_due(self) -> bool:
+        now = time.monotonic()
+        return any(retry_at <= now for retry_at in self._failed.values())
+
+    def _digest(self, entry: UploadEntry) -> Optional[str]:
+        digest = self.hashes.get(entry.name, entry.size, entry.mtime_ns)
+        if digest is None:
+            try:
+                digest = file_sha256(os.path.join(self.uploads_dir, entry.name))
+            except OSError:
+                return None  # vanished or unreadable; the next sync retries
+            self.hashes.put(entry.name, entry.size, entry.mtime_ns, digest)
+        return digest
+
+    # -----------------------
+    # extraction
+    # -----------------------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the API process runs threads (watchers, other services)
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=upload_text.lower_priority,
+                initargs=(self.niceness,),
+            )
+        return self._pool
+
+    def _submit(self, entry: UploadEntry, digest: str) -> None:
+        with self._lock:
+            if digest in self._pending:
+                return
+            fut = self._executor().submit(upload_text.extract_text, os.path.join(self.uploads_dir, entry.name))
+            self._pending[digest] = fut
+        fut.add_done_callback(partial(self._completed, entry, digest))
+
+    def _completed(self, entry: UploadEntry, digest: str, fut: Future) -> None:
+        try:
+            result = fut.result()
+        except BrokenProcessPool as e:
+            # a worker died (OOM, killed): start a new pool; the file is retried on the next sync,
+            # unless it was in flight for MAX_POOL_BREAKS breaks, which makes it the likely cause
+            with self._lock:
+                self._pool = None
+                breaks = self._breaks[digest] = self._breaks.get(digest, 0) + 1
+                if breaks < MAX_POOL_BREAKS:
+                    self._pending.pop(digest, None)
+            self.last_error = f"{entry.name}: pool broke: {e}"
+            print(f"Extraction pool broke while reading {entry.name}: {e}")
+            if breaks < MAX_POOL_BREAKS:
+                return
+            result = {"error": f"worker died {breaks} times while reading it"}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        with self._lock:
+            self._finished.append((entry, digest, result))
+
+    def sync(self, index: UploadsIndex) -> int:
+        """Queue unprocessed files, newest first, up to MAX_IN_FLIGHT in the pool. Returns how many were queued."""
+        if self._done is None:
+            self._done = self._load_done()
+        queued = 0
+        backlog = 0
+        now = time.monotonic()
+        entries, _next = index.page()
+        for entry in entries:
+            if not upload_text.handles(entry.name):
+                continue
+            digest = self.hashes.get(entry.name, entry.size, entry.mtime_ns)
+            if digest is None and len(self._pending) < MAX_IN_FLIGHT:
+                digest = self._digest(entry)  # hash only files about to be queued
+                if digest is None:
+                    continue
+            if digest is not None and (digest in self._done or digest in self._pending or self._waiting(digest, now)):
+                continue
+            backlog += 1
+            if digest is not None and len(self._pending) < MAX_IN_FLIGHT:
+                self._submit(entry, digest)
+                queued += 1
+        self.backlog = backlog
+        return queued
+
+    # -----------------------
+    # writing (background thread)
+    # -----------------------
+    def _card_row(self, entry: UploadEntry, digest: str, result: Dict[str, Any], master: SymbolMaster) -> Dict[str, Any]:
+        ticker_guess, symbol = master.resolve_filename(entry.name)
+        url = upload_card_url(entry.name)
+        return {
+            "source": UPLOAD_SOURCE,
+            "company": master.companies[symbol] if symbol else ticker_guess,
+            "event_type": result["event_type"],
+            "raw_text": result["text"],
+            "summary": None,
+            "url": url,
+            "published_at": datetime.fromtimestamp(entry.mtime, timezone.utc).replace(tzinfo=None),
+            "content_hash": card_content_hash(url, result["text"]),
+            "metadata_json": {
+                "filename": entry.name, "symbol": symbol, "ticker_guess": ticker_guess, "file_sha256": digest,
+                "kind": result["kind"], "method": result["method"], "pages": result["pages"],
+            },
+        }
+
+    def _write(self, finished: List[Tuple[UploadEntry, str, Dict[str, Any]]]) -> Tuple[int, int]:
+        """Upsert the cards and record the hashes in one transaction. Returns (cards inserted, cards updated)."""
+        master = self._master_factory()
+        cards = {
+            upload_card_url(entry.name): self._card_row(entry, digest, result, master)
+            for entry, digest, result in finished if result.get("text")
+        }
+        updates: List[Dict[str, Any]] = []
+        with self._session_factory() as session:
+            card_ids: Dict[str, int] = {}
+            if cards:
+                card_ids = dict(session.execute(select(Card.url, Card.id).where(Card.url.in_(list(cards)))).all())
+                updates = [dict(row, id=card_ids[url]) for url, row in cards.items() if url in card_ids]
+                inserts = [row for url, row in cards.items() if url not in card_ids]
+                if updates:
+                    session.execute(update(Card), updates)
+                if inserts:
+                    session.execute(insert(Card), inserts)
+                    card_ids.update(session.execute(
+                        select(Card.url, Card.id).where(Card.url.in_([row["url"] for row in inserts]))
+                    ).all())
+            records = {}
+            for entry, digest, result in finished:
+                url = upload_card_url(entry.name)
+                if "error" in result:
+                    status = "failed"
+                else:
+                    status = "done" if result["text"] else "no_text"
+                records[digest] = {
+                    "content_hash": digest, "filename": entry.name, "status": status,
+                    "method": result.get("method"), "pages": result.get("pages"),
+                    "chars": len(result.get("text") or ""), "seconds": result.get("seconds"),
+                    "card_id": card_ids.get(url), "error": result.get("error"),
+                    "updated_at": utc_now(),
+                }
+            session.execute(delete(UploadText).where(UploadText.content_hash.in_(list(records))))
+            session.execute(insert(UploadText), list(records.values()))
+            session.commit()
+        return len(cards) - len(updates), len(updates)
+
+    def flush(self) -> int:
+        """Write what the pool has finished. Returns the number of files written."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        if not finished:
+            return 0
+        try:
+            inserted, updated = self._write(finished)
+        except Exception:
+            with self._lock:
+                self._finished = finished + self._finished  # retried next tick
+            raise
+        now = time.monotonic()
+        with self._lock:
+            for entry, digest, result in finished:
+                self._pending.pop(digest, None)
+                self._breaks.pop(digest, None)
+                if "error" in result:
+                    self._failed[digest] = now + FAILED_RETRY_SECONDS
+                    self.failed += 1
+                    self.last_error = f"{entry.name}: {result['error']}"
+                    print(f"Text extraction failed for {entry.name}: {result['error']}")
+                    continue
+                self._done.add(digest)
+                self._failed.pop(digest, None)
+                if result["text"]:
+                    self.extracted += 1
+                else:
+                    self.no_text += 1
+                stage_duration.observe(result["seconds"], "text_extract")
+                counts = self._by_method.setdefault(result["method"], [0, 0.0, 0.0])
+                counts[0] += 1
+                counts[1] += result["seconds"]
+                counts[2] = max(counts[2], result["seconds"])
+                self._recent.append({
+                    "filename": entry.name, "method": result["method"], "pages": result["pages"],
+                    "chars": len(result["text"]), "event_type": result["event_type"],
+                    "ms": round(result["seconds"] * 1000, 1),
+                })
+            self._rate.append((now, len(finished)))
+            self.cards_inserted += inserted
+            self.cards_updated += updated
+        return len(finished)
+
+    def run_until_idle(self, index: UploadsIndex, poll_seconds: float = 0.05) -> int:
+        """Process the whole backlog in the calling thread (CLI, benchmarks). Returns the number of files written."""
+        written = 0
+        while True:
+            index.refresh()
+            self.sync(index)
+            written += self.flush()
+            if not self._pending and not self._finished and self.backlog == 0:
+                self.hashes.save(force=True)
+                return written
+            time.sleep(poll_seconds)
+
+    # -----------------------
+    # background discovery
+    # -----------------------
+    def start(self, index_factory: Callable[[], UploadsIndex]) -> None:
+        """Extract existing and newly discovered uploads on a daemon thread."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(index_factory,), name="upload-extract", daemon=True)
+        self._thread.start()
+
+    def _loop(self, index_factory: Callable[[], UploadsIndex]) -> None:
+        version = -1
+        while not self._stop.is_set():
+            try:
+                index = index_factory()
+                index.refresh()
+                # re-sync while the backlog is still being fed in MAX_IN_FLIGHT slices, or a failed file is due
+                if index.version != version or self._pending or self.backlog or self._retry_due():
+                    version = index.version
+                    self.sync(index)
+                self.flush()
+                self.hashes.save()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Upload extraction failed: {e}")
+            self._stop.wait(SYNC_SECONDS)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(SYNC_SECONDS + 1)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Upload extraction: final write failed: {e}")
+        self.hashes.save(force=True)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            while self._rate and now - self._rate[0][0] > RATE_WINDOW_SECONDS:
+                self._rate.popleft()
+            by_method = {
+                method: {"files": int(n), "mean_ms": round(total / n * 1000, 1) if n else None, "max_ms": round(peak * 1000, 1)}
+                for method, (n, total, peak) in self._by_method.items()
+            }
+            recent = list(self._recent)
+            files_per_minute = round(sum(n for _t, n in self._rate) * 60.0 / RATE_WINDOW_SECONDS, 1)
+        return {
+            "enabled": ENABLED and self.enabled,
+            "running": self._thread is not None,
+            "pdf_text": upload_text.HAVE_PDFIUM,
+            "ocr": upload_text.ocr_available(),
+            "workers": self.workers,
+            "backlog": self.backlog,
+            "in_flight": len(self._pending),
+            "processed": len(self._done) if self._done is not None else None,
+            "extracted": self.extracted,
+            "no_text": self.no_text,
+            "failed": self.failed,
+            "cards_inserted": self.cards_inserted,
+            "cards_updated": self.cards_updated,
+            "files_per_minute": files_per_minute,
+            "by_method": by_method,
+            "recent": recent,
+            "last_error": self.last_error,
+        }
+
+
+# process-wide instance for the uploads folder; main's lifespan starts it unless UPLOAD_EXTRACT=0 (ENABLED)
+upload_extractor = UploadExtractor(ANNOUNCEMENTS_UPLOADS_DIR, uploads_assets.manifest)
+
+
+def _main() -> None:
+    import argparse
+
+    from . import db
+
+    ap = argparse.ArgumentParser(description="Extract upload text into cards (backfill).")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--watch", action="store_true", help="keep running and pick up new uploads")
+    args = ap.parse_args()
+
+    db.init_db()
+    symbol_master_service.load()
+    extractor = UploadExtractor(ANNOUNCEMENTS_UPLOADS_DIR, uploads_assets.manifest, workers=args.workers)
+    if not extractor.enabled:
+        raise SystemExit("Nothing to extract with: install pypdfium2 (PDF text) and/or pytesseract + tesseract (OCR)")
+    index = get_uploads_index(ANNOUNCEMENTS_UPLOADS_DIR)
+    print(f"Upload extraction: {len(index)} files in {ANNOUNCEMENTS_UPLOADS_DIR}, {extractor.workers} workers, "
+          f"pdf text {'on' if upload_text.HAVE_PDFIUM else 'off'}, ocr {'on' if upload_text.ocr_available() else 'off'}")
+    started = time.perf_counter()
+
+    def report() -> None:
+        while True:
+            time.sleep(30)
+            print(extractor.stats())
+
+    threading.Thread(target=report, name="upload-extract-progress", daemon=True).start()
+    try:
+        written = extractor.run_until_idle(index)
+        print(f"Backlog done: {written} files in {time.perf_counter() - started:.1f} s")
+        if args.watch:
+            extractor.start(lambda: index)
+            while True:
+                time.sleep(30)
+    finally:
+        extractor.stop()
+        print(extractor.stats())
+
+
+if __name__ == "__main__":
+    try:
+        _main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,189 @@
+# ~/marketnews-app/backend/app/upload_text.py
+"""
+Text of one announcement upload, and its event type.
+
+extract_text() runs in upload_extract's worker processes, so this module
+imports nothing from the app (a spawned worker loads it without building
+database engines or indexes).
+
+  PDF    the text layer through pypdfium2, first MAX_PAGES pages. A scanned
+         PDF (less than MIN_TEXT_CHARS of text) is OCRed instead, first
+         OCR_MAX_PAGES pages, when OCR is available.
+  image  OCR only.
+
+OCR needs pytesseract, Pillow and the tesseract binary (TESSERACT_CMD,
+default "tesseract" on PATH; OCR_LANG, default "eng"); without them images yield no text and scanned PDFs keep their thin
+text layer. pypdfium2 is optional as for thumbnails; without it PDFs are not
+handled at all.
+
+classify_event() maps text to a Card.event_type with the regex rules in
+EVENT_RULES: the rule whose first match sits earliest in the head of the text
+wins (the subject line comes first in exchange filings), so "Board meeting ...
+to consider dividend" is a BoardMeeting.
+"""
+import functools
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# probed, not imported: the libraries load only in the extraction workers, so
+# importing this module (the API process does, for handles()) stays cheap
+HAVE_PDFIUM = importlib.util.find_spec("pypdfium2") is not None
+HAVE_OCR = importlib.util.find_spec("pytesseract") is not None and importlib.util.find_spec("PIL") is not None
+
+MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "50"))
+OCR_MAX_PAGES = int(os.getenv("EXTRACT_OCR_MAX_PAGES", "3"))
+OCR_LANG = os.getenv("EXTRACT_OCR_LANG", "eng")
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
+# 200 dpi: small print in filings stays legible to tesseract
+OCR_SCALE = 200 / 72
+MIN_TEXT_CHARS = 40
+MAX_TEXT_CHARS = 200_000
+# characters of the head classify_event() looks at first
+CLASSIFY_HEAD_CHARS = 1500
+
+PDF_EXTENSIONS = (".pdf",)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp")
+
+EVENT_RULES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = tuple(
+    (event_type, re.compile(pattern, re.IGNORECASE)) for event_type, pattern in (
+        ("BoardMeeting", r"\bboard meeting\b|\bmeeting of the board\b"),
+        ("Results", r"\b(?:standalone|consolidated|audited|un-?audited|financial) (?:financial )?results\b|\bquarter(?:ly)? results\b"),
+        ("Dividend", r"\bdividends?\b"),
+        ("Bonus", r"\bbonus (?:issue|shares?)\b"),
+        ("Split", r"\b(?:stock|share) split\b|\bsub-?division of (?:equity )?shares\b"),
+        ("Buyback", r"\bbuy-?back\b"),
+        ("Rights", r"\brights issue\b"),
+        ("AGM", r"\bannual general meeting\b|\bAGM\b|\bpostal ballot\b"),
+        ("Merger", r"\bamalgamation\b|\bde-?merger\b|\bmerger\b|\bscheme of arrangement\b"),
+        ("Acquisition", r"\bacquisition\b|\bacquire[sd]?\b"),
+        ("CreditRating", r"\bcredit rating\b"),
+        ("Insider", r"\bSAST\b|\binsider trading\b|\bpledge\b"),
+        ("Order", r"\b(?:order|contract)s? (?:win|received|worth|bagged)\b|\bbagged\b"),
+    )
+)
+OTHER_EVENT = "Other"
+
+_WS_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+@functools.lru_cache(maxsize=None)
+def ocr_available() -> bool:
+    """Checked once per process: the PATH lookup is not free and handles() runs per file."""
+    return HAVE_OCR and shutil.which(TESSERACT_CMD) is not None
+
+
+def handles(name: str) -> bool:
+    """Whether extract_text can get text out of a file of this name with what is installed."""
+    lower = name.lower()
+    if lower.endswith(PDF_EXTENSIONS):
+        return HAVE_PDFIUM
+    return lower.endswith(IMAGE_EXTENSIONS) and ocr_available()
+
+
+def classify_event(text: Optional[str]) -> str:
+    """Event type of an announcement text (see EVENT_RULES), OTHER_EVENT when no rule matches."""
+    text = text or ""
+    for part in (text[:CLASSIFY_HEAD_CHARS], text):
+        best: Optional[Tuple[int, int, str]] = None
+        for order, (event_type, pattern) in enumerate(EVENT_RULES):
+            m = pattern.search(part)
+            if m and (best is None or (m.start(), order) < best[:2]):
+                best = (m.start(), order, event_type)
+        if best is not None:
+            return best[2]
+    return OTHER_EVENT
+
+
+def normalize_text(text: str) -> str:
+    """Runs of spaces collapsed and blank lines squeezed; line breaks kept for snippets."""
+    lines = (_WS_RE.sub(" ", line).strip() for line in text.replace("\x00", "").splitlines())
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()[:MAX_TEXT_CHARS]
+
+
+# -----------------------
+# extraction (runs in the pool's worker processes)
+# -----------------------
+def _ocr(image) -> str:
+    import pytesseract
+
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    return pytesseract.image_to_string(image.convert("L"), lang=OCR_LANG)
+
+
+def _pdf_text(data: bytes, ocr: bool) -> Tuple[str, int, str]:
+    """(text, page count, method) of a PDF."""
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        pages = len(pdf)
+        parts = []
+        for i in range(min(pages, MAX_PAGES)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            parts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        text = "\n".join(parts)
+        if len(text.strip()) >= MIN_TEXT_CHARS or not ocr:
+            return text, pages, "pdf_text"
+        # scanned: OCR the first pages instead
+        parts = []
+        for i in range(min(pages, OCR_MAX_PAGES)):
+            page = pdf[i]
+            parts.append(_ocr(page.render(scale=OCR_SCALE).to_pil()))
+            page.close()
+        return "\n".join(parts), pages, "ocr"
+    finally:
+        pdf.close()
+
+
+def extract_text(path: str) -> Dict[str, Any]:
+    """
+    Read, hash and extract one upload. Returns digest (sha256 of the bytes
+    read), kind (pdf/image), method (pdf_text/ocr/none), pages, text
+    (normalized), event_type and seconds. Raises on unreadable or corrupt files.
+    """
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    ocr = ocr_available()
+    if path.lower().endswith(PDF_EXTENSIONS):
+        kind = "pdf"
+        text, pages, method = _pdf_text(data, ocr)
+    else:
+        kind, pages = "image", 1
+        if ocr:
+            from PIL import Image
+
+            with Image.open(io.BytesIO(data)) as image:
+                text, method = _ocr(image), "ocr"
+        else:
+            text, method = "", "none"
+    text = normalize_text(text)
+    return {
+        "digest": digest,
+        "kind": kind,
+        "method": method,
+        "pages": pages,
+        "text": text,
+        "event_type": classify_event(text) if text else None,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def lower_priority(niceness: int) -> None:
+    """Pool initializer: extraction yields the CPU to the API workers on the same host."""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
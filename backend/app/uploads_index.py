@@ -0,0 +1,327 @@
+# ~/marketnews-app/backend/app/uploads_index.py
+"""
+Maintained index of the announcement uploads folder.
+
+Listing endpoints used to `os.listdir` + sort (and often `os.stat`) the whole
+folder on every request. UploadsIndex keeps one entry per file, sorted by
+mtime (newest first, then name). It is updated incrementally:
+
+  - from directory change notifications (watchfiles, installed with
+    uvicorn[standard]) on a daemon thread, when available;
+  - otherwise by re-scanning when the directory mtime changes;
+  - and in both cases by a periodic full re-stat (FULL_RESCAN_SECONDS) that
+    catches missed events and in-place rewrites, which leave the directory
+    mtime alone.
+
+Pages are served by keyset: the cursor encodes the (mtime_ns, name) of the last
+entry returned, so a page costs O(log n + page size), not O(folder size).
+walk() streams the whole listing the same way, one batch at a time.
+"""
+import atexit
+import base64
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metrics import stage
+
+FULL_RESCAN_SECONDS = float(os.getenv("UPLOADS_FULL_RESCAN_SECONDS", "30"))
+USE_WATCHER = os.getenv("UPLOADS_WATCH", "1") != "0"
+# entries copied out per lock hold by walk()
+WALK_BATCH = 512
+
+
+@dataclass(frozen=True)
+class UploadEntry:
+    name: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def sort_key(self) -> Tuple[int, str]:
+        return (-self.mtime_ns, self.name)
+
+
+class CursorError(ValueError):
+    """Malformed pagination cursor."""
+
+
+def encode_cursor(entry: UploadEntry) -> str:
+    raw = f"{entry.mtime_ns}:{entry.name}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        mtime_ns, name = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split(":", 1)
+        return (-int(mtime_ns), name)
+    except Exception:
+        raise CursorError(f"Invalid cursor '{cursor}'")
+
+
+def _visible(name: str) -> bool:
+    # hidden/temporary files (.gitkeep, .DS_Store, editor swap files) are not uploads
+    return not name.startswith(".")
+
+
+class UploadsIndex:
+    """Sorted, incrementally maintained view of one uploads directory. Safe to share across threads."""
+
+    def __init__(self, directory: str, watch: bool = USE_WATCHER):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._entries: Dict[str, UploadEntry] = {}
+        self._sorted: List[Tuple[int, str]] = []  # UploadEntry.sort_key, ascending = newest first
+        self._dir_mtime_ns: Optional[int] = None
+        self._full_scan_at = 0.0
+        self._watch = watch
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.version = 0        # bumped on every change
+        self.scans = 0
+        self.events = 0
+
+    # -----------------------
+    # maintenance
+    # -----------------------
+    def start(self) -> None:
+        """Start the change-notification thread (no-op if watchfiles is missing or watching is off)."""
+        if not self._watch or self._watcher is not None:
+            return
+        try:
+            import watchfiles  # noqa: F401
+        except ImportError:
+            self._watch = False
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, name="uploads-index-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout)
+
+    def _watch_loop(self) -> None:
+        import watchfiles
+
+        try:
+            for changes in watchfiles.watch(
+                self.directory, recursive=False, debounce=200, step=50,
+                stop_event=self._stop, raise_interrupt=False,
+            ):
+                self.events += len(changes)
+                self._apply_paths(path for _change, path in changes)
+        except Exception as e:
+            # fall back to mtime rescans for the rest of the process
+            print(f"Uploads watcher stopped for {self.directory}: {e}")
+            self._watch = False
+
+    def _apply_paths(self, paths: Iterable[str]) -> None:
+        with self._lock:
+            for path in paths:
+                name = os.path.basename(path)
+                if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.directory) or not _visible(name):
+                    continue
+                try:
+                    st = os.stat(path)
+                    if not os.path.isfile(path):
+                        raise FileNotFoundError(path)
+                    self._upsert(UploadEntry(name, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    self._remove(name)
+
+    def _upsert(self, entry: UploadEntry) -> None:
+        old = self._entries.get(entry.name)
+        if old == entry:
+            return
+        if old is not None:
+            self._discard_key(old.sort_key)
+        self._entries[entry.name] = entry
+        insort(self._sorted, entry.sort_key)
+        self.version += 1
+
+    def _remove(self, name: str) -> None:
+        old = self._entries.pop(name, None)
+        if old is not None:
+            self._discard_key(old.sort_key)
+            self.version += 1
+
+    def _discard_key(self, key: Tuple[int, str]) -> None:
+        i = bisect_right(self._sorted, key) - 1
+        if i >= 0 and self._sorted[i] == key:
+            del self._sorted[i]
+
+    def _rescan(self) -> None:
+        seen = set()
+        with os.scandir(self.directory) as it:
+            for de in it:
+                if not _visible(de.name):
+                    continue
+                try:
+                    if not de.is_file():
+                        continue
+                    st = de.stat()
+                except OSError:
+                    continue
+                seen.add(de.name)
+                self._upsert(UploadEntry(de.name, st.st_size, st.st_mtime_ns))
+        for name in [n for n in self._entries if n not in seen]:
+            self._remove(name)
+        self.scans += 1
+
+    def refresh(self) -> None:
+        """
+        Bring the index up to date. This is one stat of the directory unless it
+        changed (and no watcher is running) or FULL_RESCAN_SECONDS have passed.
+        """
+        try:
+            dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            with self._lock:
+                if self._entries:
+                    self._entries.clear()
+                    self._sorted.clear()
+                    self.version += 1
+                self._dir_mtime_ns = None
+            return
+        with self._lock:
+            if not self._needs_scan(dir_mtime_ns, time.monotonic()):
+                return
+            with stage("uploads_scan"):
+                self._rescan()
+            self._dir_mtime_ns = dir_mtime_ns
+            self._full_scan_at = time.monotonic()
+
+    def _needs_scan(self, dir_mtime_ns: int, now: float) -> bool:
+        if now - self._full_scan_at >= FULL_RESCAN_SECONDS:
+            return True
+        if self._watcher is not None and self._watch:
+            # the watcher already applied adds/deletes; the periodic scan is only a safety net
+            return False
+        return dir_mtime_ns != self._dir_mtime_ns
+
+    # -----------------------
+    # queries
+    # -----------------------
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def get(self, name: str) -> Optional[UploadEntry]:
+        return self._entries.get(name)
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        predicate: Optional[Callable[[UploadEntry], bool]] = None,
+    ) -> Tuple[List[UploadEntry], Optional[str]]:
+        """
+        Entries newest-first after `cursor` (exclusive), at most `limit` of them
+        (all when limit is None), optionally only those passing `predicate`.
+        Returns (entries, next_cursor); next_cursor is None on the last page.
+        """
+        self.refresh()
+        with self._lock:
+            start = bisect_right(self._sorted, decode_cursor(cursor)) if cursor else 0
+            total = len(self._sorted)
+            entries: List[UploadEntry] = []
+            pos = start
+            while pos < total and (limit is None or len(entries) < limit):
+                entry = self._entries[self._sorted[pos][1]]
+                pos += 1
+                if predicate is None or predicate(entry):
+                    entries.append(entry)
+            if predicate is not None:
+                # a next page only if some entry after this one passes too
+                while pos < total and not predicate(self._entries[self._sorted[pos][1]]):
+                    pos += 1
+            more = pos < total
+        next_cursor = encode_cursor(entries[-1]) if entries and more else None
+        return entries, next_cursor
+
+    def walk(
+        self,
+        cursor: Optional[str] = None,
+        predicate: Optional[Callable[[UploadEntry], bool]] = None,
+        batch: int = WALK_BATCH,
+    ) -> Iterator[UploadEntry]:
+        """
+        Every entry newest-first after `cursor` (exclusive), lazily. The lock is
+        held for one batch at a time and each batch resumes by key, so a long
+        walk neither blocks the watcher nor copies the folder. Files changed
+        during the walk may be missed or seen twice, as with page().
+        """
+        self.refresh()
+        key = decode_cursor(cursor) if cursor else None
+        while True:
+            with self._lock:
+                start = bisect_right(self._sorted, key) if key is not None else 0
+                keys = self._sorted[start:start + batch]
+                entries = [self._entries[name] for _key, name in keys]
+            for entry in entries:
+                if predicate is None or predicate(entry):
+                    yield entry
+            if len(keys) < batch:
+                return
+            key = keys[-1]
+
+    def head(self) -> Optional[UploadEntry]:
+        """Newest entry, or None for an empty folder."""
+        with self._lock:
+            return self._entries[self._sorted[0][1]] if self._sorted else None
+
+    def since(self, mtime_ns: int, limit: Optional[int] = None) -> Tuple[List[UploadEntry], bool]:
+        """
+        Entries modified at or after mtime_ns, newest first, without refreshing.
+        At most `limit` of them; the flag says whether more were left out.
+        """
+        with self._lock:
+            # keys are (-mtime_ns, name): everything before (-mtime_ns + 1,) has mtime >= mtime_ns
+            end = bisect_left(self._sorted, (-mtime_ns + 1,))
+            stop = end if limit is None else min(end, limit)
+            entries = [self._entries[name] for _key, name in self._sorted[:stop]]
+        return entries, stop < end
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "directory": self.directory,
+            "files": len(self._sorted),
+            "version": self.version,
+            "watching": self._watcher is not None and self._watch,
+            "scans": self.scans,
+            "events": self.events,
+        }
+
+
+_indexes: Dict[str, UploadsIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_uploads_index(directory: str) -> UploadsIndex:
+    """Process-wide index for directory (created and started on first use)."""
+    key = os.path.abspath(directory)
+    idx = _indexes.get(key)
+    if idx is None:
+        with _indexes_lock:
+            idx = _indexes.get(key)
+            if idx is None:
+                idx = UploadsIndex(directory)
+                idx.refresh()
+                idx.start()
+                _indexes[key] = idx
+    return idx
+
+
+@atexit.register
+def _stop_watchers() -> None:
+    # a watcher thread still inside watchfiles at interpreter teardown can crash the process
+    for idx in list(_indexes.values()):
+        idx.stop()
@@ -0,0 +1,7 @@
+# ~/marketnews-app/backend/benchmarks/__init__.py
+"""
+Benchmarks for the backend hot paths. Run modules with `python -m benchmarks.<name>` from backend/.
+
+benchmarks.suite runs the whole set on synthetic data and writes JSON results
+that benchmarks.compare checks against a stored baseline.
+"""
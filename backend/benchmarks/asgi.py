@@ -0,0 +1,110 @@
+# ~/marketnews-app/backend/benchmarks/asgi.py
+"""
+In-process ASGI load driver.
+
+Requests go straight into the app (no sockets, no HTTP client), so latencies
+are server cost only: middleware, routing, dependencies, the endpoint and
+response encoding, plus threadpool hops for sync endpoints. `concurrency`
+coroutines share one event loop, as requests do inside one uvicorn worker.
+
+    stats = asyncio.run(load(app, ["/cards?limit=100"] * 2000, concurrency=8))
+    # {"requests": 2000, "rps": ..., "p50_ms": ..., "p95_ms": ..., "p99_ms": ..., "statuses": {"200": 2000}, ...}
+"""
+import asyncio
+import math
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an already sorted sequence."""
+    if not sorted_values:
+        return float("nan")
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max in ms of latencies given in seconds."""
+    values = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "mean_ms": round(sum(values) / len(values) * 1000, 4) if values else float("nan"),
+        "max_ms": round(values[-1] * 1000, 4) if values else float("nan"),
+    }
+
+
+async def request(app, path: str, method: str = "GET", headers: Iterable[Tuple[str, str]] = (),
+                  body: bytes = b"") -> Tuple[int, int, float]:
+    """Send one request; returns (status, body bytes, seconds until the last body chunk)."""
+    url = urlsplit(path)
+    raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+    if body:
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": url.path, "raw_path": url.path.encode(), "query_string": url.query.encode(),
+        "root_path": "", "headers": raw_headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+    size = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # the body is consumed: behave like a client that stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    t0 = time.perf_counter()
+    await app(scope, receive, send)
+    return status, size, time.perf_counter() - t0
+
+
+async def load(app, paths: Sequence[str], concurrency: int = 1, headers: Iterable[Tuple[str, str]] = (),
+               warmup: int = 0) -> Dict[str, Any]:
+    """
+    Send every path once, `concurrency` in flight at a time, after `warmup`
+    untimed requests. Returns requests, rps, latency percentiles, statuses and
+    mean response bytes.
+    """
+    headers = list(headers)
+    for path in paths[:warmup]:
+        await request(app, path, headers=headers)
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    total_bytes = 0
+    queue = iter(paths)
+
+    async def client():
+        nonlocal total_bytes
+        for path in queue:
+            status, size, seconds = await request(app, path, headers=headers)
+            latencies.append(seconds)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            total_bytes += size
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - t0
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "rps": round(len(latencies) / wall, 1) if wall > 0 else None,
+        **latency_stats(latencies),
+        "statuses": statuses,
+        "mean_bytes": round(total_bytes / len(latencies)) if latencies else 0,
+    }
@@ -0,0 +1,100 @@
+# ~/marketnews-app/backend/benchmarks/cards_pagination.py
+"""
+GET /cards on a large SQLite database: the old unbounded ORM .all() vs keyset
+pages with the composite indexes.
+
+    python -m benchmarks.cards_pagination [--rows 1000000] [--db /tmp/cards_bench.db] [--skip-all]
+
+The database is generated once (and reused while the row count matches).
+Pages are timed through the real endpoint function with a real session, so
+the numbers include query, row mapping and JSON encoding, minus HTTP.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from benchmarks.synthetic import build_db
+
+
+def timed(fn, repeat: int = 5):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--db", default="/tmp/cards_bench.db")
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--skip-all", action="store_true", help="do not time the old unbounded query")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    build_db(args.db, args.rows)
+    print(f"database           {args.db} ({args.rows} rows, ready in {time.perf_counter() - t0:.1f} s)")
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import Response
+
+    from app import db, models
+    from app.routers import cards
+
+    def page(**kw):
+        session = db.SessionLocal()
+        try:
+            response = Response()
+            params = dict(limit=args.limit, cursor=None, approved=None, source=None, event_type=None, view="light")
+            params.update(kw)
+            body = json.dumps(jsonable_encoder(cards.list_cards(response, database=session, **params)))
+            return body, response.headers.get(cards.NEXT_CURSOR_HEADER)
+        finally:
+            session.close()
+
+    def deep_cursor(pages: int, **kw):
+        cur = None
+        for _ in range(pages):
+            _body, cur = page(cursor=cur, **kw)
+        return cur
+
+    cases = [
+        ("first page (light)", {}),
+        ("first page (full)", {"view": "full"}),
+        ("approved=true", {"approved": True}),
+        ("source=BSE", {"source": "BSE"}),
+        ("event_type=Dividend", {"event_type": "Dividend"}),
+    ]
+    for name, kw in cases:
+        s, (body, _cur) = timed(lambda: page(**kw))
+        print(f"{name:<28} {s * 1000:8.2f} ms  {len(body) / 1024:7.1f} KiB")
+
+    cur = deep_cursor(50)
+    s, _ = timed(lambda: page(cursor=cur))
+    print(f"{'page 51 via cursor':<28} {s * 1000:8.2f} ms")
+
+    with sqlite3.connect(args.db) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM cards WHERE event_type = 'Dividend'"
+            " ORDER BY published_at DESC, id DESC LIMIT 101").fetchall()
+        print("plan (event_type)  ", "; ".join(row[-1] for row in plan))
+
+    if not args.skip_all:
+        session = db.SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            body = json.dumps(jsonable_encoder(session.query(models.Card).all()))
+            s = time.perf_counter() - t0
+        finally:
+            session.close()
+        print(f"{'old .all() (every row)':<28} {s * 1000:8.0f} ms  {len(body) / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
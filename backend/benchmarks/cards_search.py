@@ -0,0 +1,63 @@
+# ~/marketnews-app/backend/benchmarks/cards_search.py
+"""
+GET /cards/search latency on a large SQLite database (FTS5 + bm25 + snippet),
+with the LIKE fallback for comparison.
+
+    python -m benchmarks.cards_search [--rows 1000000] [--db /tmp/cards_bench.db] [--skip-like]
+
+Shares the generated database with benchmarks.cards_pagination; the FTS index
+is built by db.init_db() on first run. The generated text draws every word
+from a ~100-word vocabulary, so each word is in most documents: a worst case
+for ranking compared with real announcements.
+"""
+import argparse
+import os
+import time
+
+from benchmarks.cards_pagination import build_db, timed
+
+QUERIES = (
+    ("two words", "litigation penalty"),
+    ("one word", "dividend"),
+    ("partial word", "acqui"),
+    ("company prefix", "Company123"),
+    ("three words", "board approved buyback"),
+    ("no match", "zebra"),
+)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--db", default="/tmp/cards_bench.db")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--skip-like", action="store_true", help="do not time the LIKE fallback")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    build_db(args.db, args.rows)
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    from app import card_search, db, models
+
+    db.init_db()
+    print(f"database           {args.db} ({args.rows} rows, ready in {time.perf_counter() - t0:.1f} s, fts5={models.FTS_ENABLED})")
+
+    session = db.SessionLocal()
+    try:
+        for engine in ("fts5",) + (() if args.skip_like else ("like",)):
+            models.FTS_ENABLED = engine == "fts5"
+            for name, q in QUERIES:
+                for prefix in (True, False):
+                    s, out = timed(lambda: card_search.search_cards(session, q, limit=args.limit, prefix=prefix), repeat=3)
+                    label = name + (" (prefix)" if prefix else "")
+                    print(f"{engine:<5} {label:<25} {q!r:<26} {s * 1000:9.2f} ms  {out['count']} results")
+            s, out = timed(
+                lambda: card_search.search_cards(session, "dividend", limit=args.limit, event_type="Results"), repeat=3
+            )
+            print(f"{engine:<5} {'filtered (prefix)':<25} {'dividend + Results':<26} {s * 1000:9.2f} ms  {out['count']} results")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ~/marketnews-app/backend/benchmarks/compare.py
+"""
+Compare a benchmarks.suite result file against a stored baseline.
+
+    python -m benchmarks.compare results.json baseline.json [--threshold 0.25]
+
+Each micro-benchmark is compared on p50 per-op time and each endpoint on p95
+latency (METRICS). A result slower than baseline * (1 + threshold) is a
+regression and makes the exit status 1, so this can gate CI. Entries present
+on one side only are listed but do not fail the run. Baselines are only
+meaningful on the same machine and --size.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+# section -> metric compared (lower is better)
+METRICS = {"micro": "p50_us", "load": "p95_ms"}
+DEFAULT_THRESHOLD = 0.25
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """One row per benchmark: section, name, metric, baseline, current, ratio and status (ok/faster/regression/new/missing)."""
+    rows: List[Dict[str, Any]] = []
+    for section, metric in METRICS.items():
+        cur, base = current.get(section, {}), baseline.get(section, {})
+        for name in sorted(set(cur) | set(base)):
+            row = {"section": section, "name": name, "metric": metric,
+                   "baseline": base.get(name, {}).get(metric), "current": cur.get(name, {}).get(metric)}
+            if row["baseline"] is None or row["current"] is None:
+                row["ratio"] = None
+                row["status"] = "new" if row["baseline"] is None else "missing"
+            else:
+                row["ratio"] = row["current"] / row["baseline"] if row["baseline"] else float("inf")
+                if row["ratio"] > 1 + threshold:
+                    row["status"] = "regression"
+                elif row["ratio"] < 1 / (1 + threshold):
+                    row["status"] = "faster"
+                else:
+                    row["status"] = "ok"
+            rows.append(row)
+    return rows
+
+
+def check_meta(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Warnings for run settings that make the two files incomparable."""
+    warnings = []
+    for key in ("size", "machine", "python"):
+        a, b = current.get("meta", {}).get(key), baseline.get("meta", {}).get(key)
+        if a != b:
+            warnings.append(f"{key} differs: baseline {b!r}, current {a!r}")
+    return warnings
+
+
+def report(rows: List[Dict[str, Any]], threshold: float) -> Tuple[str, int]:
+    """Printable table and the number of regressions."""
+    lines = [f"{'benchmark':<40} {'metric':<7} {'baseline':>11} {'current':>11} {'change':>8}  status"]
+    for row in rows:
+        def fmt(v):
+            return f"{v:11.2f}" if v is not None else f"{'-':>11}"
+        change = f"{(row['ratio'] - 1) * 100:+7.1f}%" if row["ratio"] not in (None, float("inf")) else f"{'-':>8}"
+        lines.append(f"{row['section'] + '/' + row['name']:<40} {row['metric']:<7} {fmt(row['baseline'])} "
+                     f"{fmt(row['current'])} {change}  {row['status']}")
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    lines.append(f"{regressions} regression(s) over {threshold:.0%}")
+    return "\n".join(lines), regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("current")
+    ap.add_argument("baseline")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    args = ap.parse_args()
+
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    for warning in check_meta(current, baseline):
+        print(f"warning: {warning}")
+    table, regressions = report(compare(current, baseline, args.threshold), args.threshold)
+    print(table)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
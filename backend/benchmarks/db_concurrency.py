@@ -0,0 +1,161 @@
+# ~/marketnews-app/backend/benchmarks/db_concurrency.py
+"""
+Read throughput on marketnews-style SQLite while a bulk writer is running,
+for each DB_PROFILE (see app/db.py).
+
+    python -m benchmarks.db_concurrency [--readers 8] [--seconds 10] [--seed-rows 50000]
+
+Each profile runs in a fresh child process with its own temporary database.
+One writer loops BulkIngest batches; readers (forked processes by default,
+like uvicorn workers, or threads with --mode threads) page GET /cards
+(light view) and run a card search through the read-only engine. Reported:
+reads/s, read latency p50/p99, rows written/s and errors such as
+"database is locked".
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHILD = r"""
+import json, multiprocessing, os, sys, threading, time
+from starlette.responses import Response
+from app import db
+from app.card_ingest import BulkIngest
+from app.routers import cards
+
+seconds, readers, seed_rows, batch = float(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+use_processes = sys.argv[5] == "processes"
+db.init_db()
+
+def rows(start, n):
+    for i in range(start, start + n):
+        yield {"url": f"https://example.com/{i}", "company": f"Company{i % 500}", "source": "NSE",
+               "event_type": "Results", "raw_text": "board approved quarterly results dividend " * 20}
+
+s = db.SessionLocal()
+ingest = BulkIngest(s, 2000)
+for r in rows(0, seed_rows):
+    ingest.add(r)
+    if ingest.full:
+        ingest.flush()
+ingest.finish()
+s.close()
+
+stop = time.monotonic() + seconds
+written = [0]
+errors = {"read": 0, "write": 0}
+latencies = []
+lat_lock = threading.Lock()
+
+def writer():
+    n = seed_rows
+    while time.monotonic() < stop:
+        s = db.SessionLocal()
+        try:
+            ing = BulkIngest(s, batch)
+            for r in rows(n, batch):
+                ing.add(r)
+            ing.finish()
+            written[0] += batch
+        except Exception as e:
+            errors["write"] += 1
+            s.rollback()
+        finally:
+            s.close()
+        n += batch
+
+def reader(k, queue=None):
+    if queue is not None:
+        db.read_engine.dispose(close=False)  # fresh connections after fork
+    local = []
+    while time.monotonic() < stop:
+        t0 = time.perf_counter()
+        s = db.ReadSessionLocal()
+        try:
+            if k % 2:
+                cards.search_cards(s, "dividend", limit=20)
+            else:
+                cards.list_cards(Response(), limit=50, cursor=None, approved=None, source=None,
+                                 event_type=None, view="light", database=s)
+            local.append(time.perf_counter() - t0)
+        except Exception as e:
+            errors["read"] += 1
+        finally:
+            s.close()
+    if queue is not None:
+        queue.put((local, errors["read"]))
+        return
+    with lat_lock:
+        latencies.extend(local)
+
+if use_processes:
+    # readers as separate processes, like uvicorn workers: no GIL shared with the writer
+    queue = multiprocessing.get_context("fork").Queue()
+    procs = [multiprocessing.get_context("fork").Process(target=reader, args=(k, queue)) for k in range(readers)]
+    for p in procs:
+        p.start()
+    writer()
+    for _ in procs:
+        local, errs = queue.get()
+        latencies.extend(local)
+        errors["read"] += errs
+    for p in procs:
+        p.join()
+else:
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(k,)) for k in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+latencies.sort()
+pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else None
+print(json.dumps({
+    "reads_per_s": len(latencies) / seconds,
+    "read_p50_ms": pct(0.50),
+    "read_p99_ms": pct(0.99),
+    "read_max_ms": latencies[-1] * 1000 if latencies else None,
+    "rows_written_per_s": written[0] / seconds,
+    "read_errors": errors["read"],
+    "write_errors": errors["write"],
+}))
+"""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--seed-rows", type=int, default=50000)
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--profiles", default="default,wal")
+    ap.add_argument("--mode", choices=("threads", "processes"), default="processes",
+                    help="readers as threads of one process, or as forked processes (like uvicorn workers)")
+    args = ap.parse_args()
+
+    for profile in args.profiles.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DB_PROFILE=profile, DATABASE_URL=f"sqlite:///{tmp}/bench.db")
+            env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+            out = subprocess.run(
+                [sys.executable, "-c", CHILD, str(args.seconds), str(args.readers), str(args.seed_rows), str(args.batch), args.mode],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{profile}: failed\n{out.stderr}")
+                continue
+            res = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{profile:<8} {args.mode:<9} reads/s {res['reads_per_s']:8.1f}  p50 {res['read_p50_ms'] or 0:7.2f} ms"
+                f"  p99 {res['read_p99_ms'] or 0:8.2f} ms  max {res['read_max_ms'] or 0:8.1f} ms"
+                f"  written/s {res['rows_written_per_s']:8.0f}"
+                f"  errors r/w {res['read_errors']}/{res['write_errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
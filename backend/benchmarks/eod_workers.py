@@ -0,0 +1,120 @@
+# ~/marketnews-app/backend/benchmarks/eod_workers.py
+"""
+Startup time and memory of N worker processes loading the EOD snapshot,
+CSV parsing vs the shared mmap'ed .eodb binary.
+
+    python -m benchmarks.eod_workers [--workers 1,4,8] [--scale 10] [--data-dir data]
+
+Each worker imports app.eod, loads the latest snapshot and resolves a few
+tickers, then reports RSS and PSS (/proc/self/smaps_rollup) while every
+worker is still alive. PSS splits shared pages between the processes that
+map them, so it shows the saving from sharing one mapping. Linux only.
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+from app import eod
+cache = eod.SnapshotCache(sys.argv[1])
+snap = cache.get()
+for t in ("RELIANCE", "INFY", "LT", "TCS"):
+    snap.resolve(t)
+ready = time.perf_counter() - t0
+print(json.dumps({"ready_s": ready, "source": snap.source, "rows": len(snap.records)}), flush=True)
+sys.stdin.readline()
+mem = {}
+with open("/proc/self/smaps_rollup") as fh:
+    for line in fh:
+        parts = line.split()
+        if parts[0] in ("Rss:", "Pss:"):
+            mem[parts[0][:-1].lower() + "_kb"] = int(parts[1])
+print(json.dumps(mem), flush=True)
+"""
+
+
+def make_scaled_dir(src_dir: str, scale: int) -> str:
+    """Copy of the newest CSV with its rows repeated `scale` times (symbols suffixed so they stay unique)."""
+    from app.eod import find_latest_csv
+
+    src = find_latest_csv(src_dir)
+    if not src:
+        raise SystemExit(f"no EOD CSV in {src_dir}")
+    out_dir = tempfile.mkdtemp(prefix="eod-bench-")
+    with open(src, newline="", encoding="utf-8", errors="ignore") as fh:
+        rows = list(csv.reader(fh))
+    header, body = rows[0], rows[1:]
+    sym_col = next((i for i, h in enumerate(header) if h.strip().lower() == "symbol"), 0)
+    with open(os.path.join(out_dir, os.path.basename(src)), "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(header)
+        for k in range(scale):
+            for r in body:
+                r = list(r)
+                if k and r:
+                    r[sym_col] = f"{r[sym_col]}{k}"
+                w.writerow(r)
+    return out_dir
+
+
+def run(data_dir: str, workers: int, binary: bool) -> dict:
+    env = dict(os.environ, EOD_BINARY="1" if binary else "0", PYTHONPATH=BACKEND_DIR)
+    started = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-c", CHILD, data_dir], cwd=BACKEND_DIR, env=env,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    ready = [json.loads(p.stdout.readline()) for p in procs]
+    all_ready = time.perf_counter() - started
+    for p in procs:
+        p.stdin.write("\n")
+        p.stdin.flush()
+    mem = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.wait()
+    return {
+        "mode": "mmap" if binary else "csv",
+        "workers": workers,
+        "source": ready[0]["source"],
+        "rows": ready[0]["rows"],
+        "ready_s_max": round(max(r["ready_s"] for r in ready), 4),
+        "all_ready_wall_s": round(all_ready, 4),
+        "rss_mb_total": round(sum(m["rss_kb"] for m in mem) / 1024, 1),
+        "pss_mb_total": round(sum(m["pss_kb"] for m in mem) / 1024, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--data-dir", default=os.path.join(BACKEND_DIR, "data"))
+    ap.add_argument("--workers", default="1,4,8")
+    ap.add_argument("--scale", type=int, default=10, help="repeat the newest CSV's rows this many times")
+    args = ap.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import eod_binary
+
+    data_dir = make_scaled_dir(args.data_dir, args.scale)
+    try:
+        eod_binary.convert_dir(data_dir)
+        for n in [int(x) for x in args.workers.split(",")]:
+            for binary in (False, True):
+                res = run(data_dir, n, binary)
+                print(json.dumps(res))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# ~/marketnews-app/backend/benchmarks/extract.py
+"""
+Upload text extraction throughput, exactly-once processing and resume.
+
+    python -m benchmarks.extract [--files 2000] [--duplicates 0.2] [--workers 2] [--rewrite 50]
+
+Writes --files one-page text PDFs into a temporary uploads folder, named like
+the real ones (benchmarks.synthetic.upload_filenames, so most resolve to a
+symbol of the synthetic EOD file), with announcement texts for the common
+event types. A --duplicates share are byte-identical copies of another file.
+Then:
+
+  1. backfill: UploadExtractor.run_until_idle() with --workers processes.
+     Reported: files/s, per-file mean/max by method, cards inserted. Every
+     distinct file must be extracted exactly once (copies are skipped).
+  2. resume: a fresh extractor on the same database (a restart) must find
+     nothing to do.
+  3. rewrite: --rewrite files get new content; only they are extracted
+     again, and their cards are updated rather than duplicated.
+
+Needs pypdfium2 (pip install pypdfium2).
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import List
+
+TEMPLATES = (
+    ("BoardMeeting", "Intimation of Board Meeting. The meeting of the Board of Directors of {company} will be held on {day} "
+                     "to consider the unaudited financial results for the quarter."),
+    ("Results", "Outcome: Standalone financial results of {company} for the quarter ended {day}, as approved by the board."),
+    ("Dividend", "{company} declares an interim dividend of Rs {n} per equity share; record date {day}."),
+    ("Buyback", "{company}: the board approved a buyback of up to {n} lakh equity shares through the tender offer route."),
+    ("CreditRating", "Credit rating: the agency has reaffirmed the rating of {company} bank facilities on {day}."),
+    ("Other", "{company} informs the exchange of a change in the registered office address with effect from {day}."),
+)
+
+
+def _pdf_for(name: str, mapping: dict, rng: random.Random, tag: str = "") -> bytes:
+    from benchmarks.synthetic import text_pdf
+
+    _event, template = rng.choice(TEMPLATES)
+    company = mapping.get(name.split("_")[0].split("Q")[0].upper()) or "The company"
+    text = template.format(company=company, day=f"{rng.randint(1, 28)}-Oct-2025", n=rng.randint(1, 50))
+    return text_pdf([f"Ref {name} {tag}".strip(), text, "Yours faithfully, Company Secretary"])
+
+
+def _make_pdfs(uploads_dir: str, files: int, duplicates: float, mapping: dict, rng: random.Random) -> List[str]:
+    """Returns the names of the distinct (not copied) files."""
+    from benchmarks.synthetic import upload_filenames
+
+    os.makedirs(uploads_dir, exist_ok=True)
+    names = []
+    for i, name in enumerate(upload_filenames(mapping, files)):
+        stem = os.path.splitext(name)[0]
+        name = f"{stem}.pdf" if f"{stem}.pdf" not in names else f"{stem}_{i}.pdf"
+        names.append(name)
+    distinct = max(1, round(len(names) * (1 - duplicates)))
+    start = time.time() - len(names)
+    for i, name in enumerate(names):
+        path = os.path.join(uploads_dir, name)
+        if i < distinct:
+            data = _pdf_for(name, mapping, rng)
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            shutil.copyfile(os.path.join(uploads_dir, names[rng.randrange(distinct)]), path)
+        os.utime(path, (start + i, start + i))
+    return names[:distinct]
+
+
+def _report(label: str, written: int, seconds: float, extractor) -> None:
+    s = extractor.stats()
+    methods = ", ".join(f"{m}: {v['files']} files, mean {v['mean_ms']} ms, max {v['max_ms']} ms" for m, v in s["by_method"].items())
+    print(f"{label}: {written} files in {seconds:.2f} s ({written / seconds if seconds else 0:.0f} files/s); "
+          f"{s['extracted']} with text, {s['no_text']} without, {s['failed']} failed; "
+          f"cards +{s['cards_inserted']} inserted, {s['cards_updated']} updated")
+    if methods:
+        print(f"  {methods}")
+
+
+def _run(args, tmp: str) -> None:
+    from benchmarks.synthetic import make_eod_dir, universe_mapping
+    from app import db, upload_text
+    from app.models import Card
+    from app.paths import ANNOUNCEMENTS_UPLOADS_DIR
+    from app.static_assets import HashManifest
+    from app.symbol_master import symbol_master_service
+    from app.upload_extract import UploadExtractor, upload_card_url
+    from app.uploads_index import UploadsIndex
+
+    if not upload_text.HAVE_PDFIUM:
+        raise SystemExit("pypdfium2 is not installed")
+    rng = random.Random(0)
+    make_eod_dir(os.path.join(tmp, "data"), args.symbols)
+    mapping = universe_mapping(args.symbols)
+    originals = _make_pdfs(ANNOUNCEMENTS_UPLOADS_DIR, args.files, args.duplicates, mapping, rng)
+    distinct = len(originals)
+    db.init_db()
+    symbol_master_service.load()
+    index = UploadsIndex(ANNOUNCEMENTS_UPLOADS_DIR, watch=False)
+    manifest_path = os.path.join(tmp, "hashes.json")
+
+    def count_cards() -> int:
+        with db.SessionLocal() as session:
+            return session.query(Card).count()
+
+    print(f"{args.files} PDFs ({distinct} distinct), {args.workers} workers, ocr {'on' if upload_text.ocr_available() else 'off'}")
+    extractor = UploadExtractor(ANNOUNCEMENTS_UPLOADS_DIR, HashManifest(manifest_path), workers=args.workers)
+    try:
+        t0 = time.perf_counter()
+        written = extractor.run_until_idle(index)
+        _report("backfill", written, time.perf_counter() - t0, extractor)
+        if written != distinct:
+            print(f"  !! {written} files processed for {distinct} distinct contents")
+        cards = count_cards()
+        print(f"  {cards} cards")
+    finally:
+        extractor.stop()
+
+    extractor = UploadExtractor(ANNOUNCEMENTS_UPLOADS_DIR, HashManifest(manifest_path), workers=args.workers)
+    try:
+        t0 = time.perf_counter()
+        written = extractor.run_until_idle(index)
+        print(f"resume: {written} files in {time.perf_counter() - t0:.2f} s (expected 0)")
+
+        rewritten = rng.sample(originals, min(args.rewrite, distinct))
+        # an original whose copy was extracted first has no card of its own yet
+        with db.SessionLocal() as session:
+            carded = {url for (url,) in session.query(Card.url)}
+        new_cards = sum(upload_card_url(name) not in carded for name in rewritten)
+        for name in rewritten:
+            path = os.path.join(ANNOUNCEMENTS_UPLOADS_DIR, name)
+            with open(path, "wb") as f:
+                f.write(_pdf_for(name, mapping, rng, tag="(revised)"))
+        # in-place rewrites leave the directory mtime alone: rescan with a new index
+        index = UploadsIndex(ANNOUNCEMENTS_UPLOADS_DIR, watch=False)
+        t0 = time.perf_counter()
+        written = extractor.run_until_idle(index)
+        _report("rewrite", written, time.perf_counter() - t0, extractor)
+        if written != len(rewritten) or count_cards() != cards + new_cards:
+            print(f"  !! {written} files for {len(rewritten)} rewritten; {count_cards()} cards, expected {cards + new_cards}")
+    finally:
+        extractor.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--files", type=int, default=2000)
+    ap.add_argument("--duplicates", type=float, default=0.2)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--rewrite", type=int, default=50)
+    ap.add_argument("--symbols", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # before the app is imported: paths.py and db.py read these
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["MARKETNEWS_DATA_DIR"] = os.path.join(tmp, "data")
+        os.environ["MARKETNEWS_UPLOADS_DIR"] = os.path.join(tmp, "uploads")
+        os.environ["MARKETNEWS_CACHE_DIR"] = os.path.join(tmp, "cache")
+        _run(args, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ~/marketnews-app/backend/benchmarks/market_summary.py
+"""
+GET /market/summary/{ticker}: the old per-request build (sync endpoint, dict
+rebuilt and JSON-encoded every call) vs the pre-rendered bytes with ETag/304.
+
+    python -m benchmarks.market_summary [--requests 20000]
+
+Requests go straight into the ASGI app (no sockets, no HTTP client), one at a
+time on one event loop, so the numbers are per-worker server cost: routing,
+dependency resolution, the endpoint and response encoding. Uses the real EOD
+files in data/ (or MARKETNEWS_DATA_DIR).
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI
+
+
+async def drive(app, paths, headers=()):
+    """Send each path to app once; returns (seconds, status counts)."""
+    statuses = {}
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in headers]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+
+    t0 = time.perf_counter()
+    for path in paths:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+            "root_path": "", "headers": raw_headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - t0, statuses
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--requests", type=int, default=20000)
+    args = ap.parse_args()
+
+    from app.routers import market_summary as ms
+    from app.symbol_master import symbol_master_service
+
+    master = symbol_master_service.load()
+    if master.snapshot is None:
+        raise SystemExit(f"no EOD snapshot: {master.error}")
+    snapshot = master.snapshot
+    symbols = [r.symbol for r in snapshot.records if r.symbol]
+    paths = [f"/market/summary/{symbols[i % len(symbols)]}" for i in range(args.requests)]
+
+    # the endpoint as it was: sync (threadpool hop), dict rebuilt and encoded per call
+    old = FastAPI()
+
+    @old.get("/market/summary/{ticker}")
+    def old_summary(ticker: str, snapshot=Depends(ms.get_snapshot)):
+        return ms.build_summary(snapshot, ms.resolve_row(snapshot, ticker), ticker)
+
+    new = FastAPI()
+    new.include_router(ms.router)
+
+    t0 = time.perf_counter()
+    rendered = ms.rendered_summaries(snapshot)
+    print(f"render all         {len(rendered.by_symbol)} bodies, {rendered.bytes / 1024:.0f} KiB"
+          f" in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    async def run():
+        await drive(old, paths[:200])  # warm up both
+        await drive(new, paths[:200])
+        cases = [
+            ("old (build per request)", old, ()),
+            ("pre-rendered 200", new, ()),
+            ("pre-rendered 304", new, (("If-None-Match", rendered.etag),)),
+        ]
+        for name, app, headers in cases:
+            s, statuses = await drive(app, paths, headers)
+            print(f"{name:<24} {len(paths) / s:9.0f} req/s  {s / len(paths) * 1e6:7.1f} µs/req  {statuses}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# ~/marketnews-app/backend/benchmarks/startup.py
+"""
+Time to ready and first-request latency after a restart.
+
+    python -m benchmarks.startup [--rows 20000] [--uploads 10000] [--runs 3] [--port 8765]
+
+Generates an EOD file and an uploads folder (benchmarks.synthetic) in a
+temporary directory, then starts the app under uvicorn --runs times for each
+mode:
+
+  sequential   STARTUP_PARALLEL=0: the warmup chains run one after another
+  parallel     STARTUP_PARALLEL=1 (the default)
+  lazy         STARTUP_WAIT=0: the server listens at once and warms up in
+               the background, as a stand-in for the old behaviour where the
+               first requests paid for the loading
+
+Reported per mode (median over the runs): seconds from spawning the process
+until /ready answers 200 (for lazy, until it first answers at all), the
+warmup's own report (import, warmup and per-step seconds), and the latency
+of the first request to each of FIRST_REQUESTS right after. Background
+services stay off (UPLOAD_EXTRACT=0, no feeds or summaries).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODES = {
+    "sequential": {"STARTUP_PARALLEL": "0"},
+    "parallel": {"STARTUP_PARALLEL": "1"},
+    "lazy": {"STARTUP_WAIT": "0"},
+}
+FIRST_REQUESTS = (
+    "/market/summary/{symbol}",
+    "/market/summary/{partial}",
+    "/announcements/list-enriched?limit=50",
+    "/cards?limit=20",
+)
+POLL_SECONDS = 0.005
+
+
+def _get(url: str, timeout: float = 30) -> Tuple[int, bytes]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _wait_ready(base: str, proc: subprocess.Popen, started: float, lazy: bool, limit: float = 120) -> float:
+    while time.perf_counter() - started < limit:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with {proc.returncode}:\n{proc.stderr.read()}")
+        try:
+            status, _ = _get(f"{base}/ready", timeout=5)
+        except OSError:
+            time.sleep(POLL_SECONDS)  # not listening yet
+            continue
+        if lazy or status == 200:
+            return time.perf_counter() - started
+        time.sleep(POLL_SECONDS)
+    raise SystemExit(f"not ready after {limit} s")
+
+
+def run_once(env: Dict[str, str], port: int, lazy: bool, symbol: str) -> Dict[str, Any]:
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        ready = _wait_ready(base, proc, started, lazy)
+        first = {}
+        for path in FIRST_REQUESTS:
+            path = path.format(symbol=symbol, partial=symbol[:-1].lower())
+            t0 = time.perf_counter()
+            status, _ = _get(base + path)
+            first[path] = {"status": status, "ms": (time.perf_counter() - t0) * 1000}
+        if lazy:
+            # the warmup still finishes in the background; its report is taken after
+            _wait_ready(base, proc, started, lazy=False)
+        report = json.loads(_get(f"{base}/ready")[1])
+    finally:
+        proc.terminate()
+        proc.wait(30)
+    return {"ready_s": ready, "first": first, "report": report}
+
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def summarize(mode: str, runs: List[Dict[str, Any]]) -> None:
+    report = runs[-1]["report"]
+    ready = _median([r["ready_s"] for r in runs])
+    print(f"{mode}: ready {ready:.3f} s after spawn; in process: import "
+          f"{_median([r['report']['import_seconds'] for r in runs]):.3f} s, warmup "
+          f"{_median([r['report']['warmup_seconds'] for r in runs]):.3f} s")
+    steps = ", ".join(
+        f"{name} {_median([r['report']['steps'][name]['seconds'] for r in runs]) or 0:.3f}"
+        for name in report["steps"]
+    )
+    print(f"  steps (s): {steps}")
+    if report["degraded"]:
+        print(f"  !! degraded: {report['degraded']}")
+    for path in runs[0]["first"]:
+        statuses = {r["first"][path]["status"] for r in runs}
+        print(f"  first {path}: {_median([r['first'][path]['ms'] for r in runs]):.1f} ms (status {sorted(statuses)})")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=20000, help="EOD rows")
+    ap.add_argument("--uploads", type=int, default=10000)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--modes", default=",".join(MODES))
+    args = ap.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.synthetic import make_eod_dir, make_uploads_dir, universe_mapping
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping = universe_mapping(args.rows)
+        make_eod_dir(os.path.join(tmp, "data"), args.rows)
+        files = make_uploads_dir(os.path.join(tmp, "uploads"), args.uploads, mapping)
+        symbol = sorted(mapping)[len(mapping) // 2]
+        env = dict(
+            os.environ,
+            PYTHONPATH=BACKEND_DIR,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            MARKETNEWS_DATA_DIR=os.path.join(tmp, "data"),
+            MARKETNEWS_UPLOADS_DIR=os.path.join(tmp, "uploads"),
+            MARKETNEWS_THUMBS_DIR=os.path.join(tmp, "thumbs"),
+            MARKETNEWS_CACHE_DIR=os.path.join(tmp, "cache"),
+            UPLOAD_EXTRACT="0",
+            ANNOUNCEMENT_FEEDS="",
+            SUMMARY_BACKEND="",
+        )
+        print(f"{args.rows} EOD rows, {files} uploads, {args.runs} runs per mode")
+        for mode in args.modes.split(","):
+            runs = [run_once(dict(env, **MODES[mode]), args.port, mode == "lazy", symbol) for _ in range(args.runs)]
+            summarize(mode, runs)
+
+
+if __name__ == "__main__":
+    main()
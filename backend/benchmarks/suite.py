@@ -0,0 +1,292 @@
+# ~/marketnews-app/backend/benchmarks/suite.py
+"""
+Reproducible benchmark suite for the API hot paths: micro-benchmarks of the
+parse, lookup and enrichment functions, then an in-process ASGI load run per
+endpoint, written to one JSON file that benchmarks.compare checks against a
+stored baseline.
+
+    python -m benchmarks.suite [--size small|medium|large] [--out bench-results.json]
+                               [--baseline bench-baseline.json] [--threshold 0.25]
+                               [--only micro|load] [--requests 500] [--concurrency 8]
+
+Data is synthetic (benchmarks.synthetic) and generated under --workdir, where
+it is kept and reused while the sizes match:
+
+    size     EOD rows  uploads  cards
+    small       2,700    1,000     10,000
+    medium     20,000   10,000    100,000
+    large     100,000  100,000  1,000,000
+
+The app is pointed at that data through MARKETNEWS_DATA_DIR,
+MARKETNEWS_UPLOADS_DIR, MARKETNEWS_THUMBS_DIR, MARKETNEWS_CACHE_DIR and
+DATABASE_URL before it is imported. The lifespan hook is not run: the schema
+and the symbol master are set up directly, and the background services
+(asset hashing, thumbnails, summaries) stay off so they do not add noise.
+With Pillow installed, enrichment still queues on-demand thumbnail renders
+for the synthetic uploads the first time it sees them, as the app would.
+
+Micro-benchmarks call a function over varying inputs in blocks of calls
+sized to ~0.2 ms, so the percentiles are of per-call time averaged within a
+block (p50_us, p95_us, p99_us, ops_per_s). Load results are per request
+(p50_ms, p95_ms, p99_ms, rps) after a warm-up pass.
+
+With --baseline the results are compared (see benchmarks.compare) and the
+exit status is 1 on a regression over --threshold. To record a baseline, run
+once and keep the --out file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence
+
+from benchmarks import synthetic
+from benchmarks.asgi import load, percentile
+from benchmarks.compare import DEFAULT_THRESHOLD, check_meta, compare, report
+
+SIZES = {
+    "small": {"eod_rows": 2_700, "eod_days": 5, "uploads": 1_000, "cards": 10_000},
+    "medium": {"eod_rows": 20_000, "eod_days": 5, "uploads": 10_000, "cards": 100_000},
+    "large": {"eod_rows": 100_000, "eod_days": 5, "uploads": 100_000, "cards": 1_000_000},
+}
+# target wall time of one timed block of calls, and of one micro-benchmark
+BLOCK_SECONDS = 0.0002
+MICRO_SECONDS = 1.0
+
+SEARCH_QUERIES = ("dividend", "board meeting", "acqui", "Company12", "litigation penalty", "zebra")
+
+
+# -----------------------
+# data
+# -----------------------
+def prepare(workdir: str, size: str) -> Dict[str, str]:
+    """Generate (or reuse) the data for `size` under workdir and point the app at it; returns the paths."""
+    spec = SIZES[size]
+    paths = {
+        "data": os.path.join(workdir, size, "data"),
+        "uploads": os.path.join(workdir, size, "uploads"),
+        "thumbs": os.path.join(workdir, size, "thumbs"),
+        "cache": os.path.join(workdir, size, "cache"),
+        "db": os.path.join(workdir, size, "marketnews.db"),
+    }
+    # before build_db imports app.db, which reads DATABASE_URL once
+    point_app_at(paths)
+    marker = os.path.join(workdir, size, "spec.json")
+    done: Dict[str, Any] = {}
+    if os.path.exists(marker):
+        with open(marker, "r", encoding="utf-8") as f:
+            done = json.load(f)
+
+    if (done.get("eod_rows"), done.get("eod_days")) != (spec["eod_rows"], spec["eod_days"]):
+        t0 = time.perf_counter()
+        if os.path.isdir(paths["data"]):
+            for name in os.listdir(paths["data"]):
+                os.remove(os.path.join(paths["data"], name))
+        synthetic.make_eod_dir(paths["data"], spec["eod_rows"], spec["eod_days"])
+        print(f"generated {spec['eod_days']} EOD files x {spec['eod_rows']} rows in {time.perf_counter() - t0:.1f} s")
+    if done.get("uploads") != spec["uploads"] or done.get("eod_rows") != spec["eod_rows"]:
+        t0 = time.perf_counter()
+        if os.path.isdir(paths["uploads"]):
+            for name in os.listdir(paths["uploads"]):
+                os.remove(os.path.join(paths["uploads"], name))
+        synthetic.make_uploads_dir(paths["uploads"], spec["uploads"], synthetic.universe_mapping(spec["eod_rows"]))
+        print(f"generated {spec['uploads']} uploads in {time.perf_counter() - t0:.1f} s")
+    t0 = time.perf_counter()
+    synthetic.build_db(paths["db"], spec["cards"])  # no-op while the row count matches
+    if done.get("cards") != spec["cards"]:
+        print(f"generated {spec['cards']} cards in {time.perf_counter() - t0:.1f} s")
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    return paths
+
+
+def point_app_at(paths: Dict[str, str]) -> None:
+    """Environment for app.paths and app.db; must run before anything from app is imported."""
+    os.environ["MARKETNEWS_DATA_DIR"] = paths["data"]
+    os.environ["MARKETNEWS_UPLOADS_DIR"] = paths["uploads"]
+    os.environ["MARKETNEWS_THUMBS_DIR"] = paths["thumbs"]
+    os.environ["MARKETNEWS_CACHE_DIR"] = paths["cache"]
+    os.environ["DATABASE_URL"] = f"sqlite:///{paths['db']}"
+    os.environ.pop("SUMMARY_BACKEND", None)
+    os.environ.setdefault("UPLOADS_WATCH", "0")
+
+
+# -----------------------
+# micro-benchmarks
+# -----------------------
+def micro(fn: Callable[[Any], Any], inputs: Sequence[Any], seconds: float = MICRO_SECONDS) -> Dict[str, Any]:
+    """Call fn over inputs (cycling) for about `seconds`; per-call percentiles from ~BLOCK_SECONDS blocks."""
+    n_inputs = len(inputs)
+    t0 = time.perf_counter()
+    fn(inputs[0])
+    first = time.perf_counter() - t0
+    block = max(1, int(BLOCK_SECONDS / first)) if first > 0 else 1000
+    per_call: List[float] = []
+    calls = 0
+    i = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or len(per_call) < 5:
+        t0 = time.perf_counter()
+        for _ in range(block):
+            fn(inputs[i % n_inputs])
+            i += 1
+        per_call.append((time.perf_counter() - t0) / block)
+        calls += block
+    per_call.sort()
+    return {
+        "calls": calls,
+        "p50_us": round(percentile(per_call, 50) * 1e6, 3),
+        "p95_us": round(percentile(per_call, 95) * 1e6, 3),
+        "p99_us": round(percentile(per_call, 99) * 1e6, 3),
+        "ops_per_s": round(calls / sum(p * block for p in per_call), 1),
+    }
+
+
+def run_micro(paths: Dict[str, str], seconds: float) -> Dict[str, Dict[str, Any]]:
+    from app import eod
+    from app.eod_schema import read_eod_csv
+    from app.routers import announcements, announcements_enriched
+    from app.routers import market_summary as ms
+    from app.symbol_master import build_master, symbol_master_service
+    from app.uploads_index import UploadsIndex, encode_cursor
+
+    rng = random.Random(1)
+    csv_path = eod.find_latest_csv(paths["data"])
+    st = os.stat(csv_path)
+    master = symbol_master_service.load()
+    snapshot = master.snapshot
+    if snapshot is None:
+        raise SystemExit(f"no EOD snapshot: {master.error}")
+    symbols = [r.symbol for r in snapshot.records if r.symbol]
+    companies = [r.company for r in snapshot.records if r.company]
+    index = UploadsIndex(paths["uploads"], watch=False)
+    entries, _next = index.page()
+    cursors = [encode_cursor(e) for e in rng.sample(entries, min(200, len(entries)))]
+    records = [snapshot.records[snapshot.resolve(s)] for s in rng.sample(symbols, min(500, len(symbols)))]
+
+    cases = [
+        # parse and load
+        ("eod.find_latest_csv", lambda d: eod.find_latest_csv(d), [paths["data"]]),
+        ("eod.read_eod_csv", lambda p: read_eod_csv(p), [csv_path]),
+        ("eod.load_snapshot", lambda p: eod.load_snapshot(p, st), [csv_path]),
+        ("symbols.build_master", lambda s: build_master(s), [snapshot]),
+        # lookups
+        ("symbols.resolve_exact", snapshot.resolve, rng.sample(symbols, min(1000, len(symbols)))),
+        ("symbols.resolve_lowercase", snapshot.resolve, [s.lower() for s in rng.sample(symbols, min(1000, len(symbols)))]),
+        ("symbols.resolve_company", snapshot.resolve, [c.split()[0] + " " + c.split()[1][:3] for c in rng.sample(companies, min(1000, len(companies))) if len(c.split()) > 1]),
+        ("symbols.resolve_miss", snapshot.resolve, [f"ZQX{i}NOPE" for i in range(1000)]),
+        ("market.build_summary", lambda r: ms.build_summary(snapshot, r, r.symbol or ""), records),
+        # uploads and enrichment
+        ("uploads.scan", lambda d: UploadsIndex(d, watch=False).refresh(), [paths["uploads"]]),
+        ("uploads.page_100", lambda c: index.page(100, c), cursors),
+        ("enrich.match_filename", master.match_filename, [e.name for e in entries[:5000]]),
+        ("enrich.list_enriched_entry", lambda e: announcements.enrich_upload(e, master, ""), entries[:5000]),
+        ("enrich.enriched_file", lambda e: announcements_enriched._enrich_file(e, master), entries[:5000]),
+    ]
+    results = {}
+    for name, fn, inputs in cases:
+        results[name] = micro(fn, inputs, seconds)
+        r = results[name]
+        print(f"micro {name:<28} p50 {r['p50_us']:12.2f} us  p99 {r['p99_us']:12.2f} us  {r['ops_per_s']:12.1f} ops/s")
+    return results
+
+
+# -----------------------
+# endpoint load
+# -----------------------
+def endpoint_paths(paths: Dict[str, str], requests: int) -> Dict[str, List[str]]:
+    from app.symbol_master import symbol_master_service
+
+    rng = random.Random(2)
+    snapshot = symbol_master_service.current().snapshot
+    symbols = [r.symbol for r in snapshot.records if r.symbol]
+
+    def pick(n: int) -> List[str]:
+        return [rng.choice(symbols) for _ in range(n)]
+
+    return {
+        "market.summary_ticker": [f"/market/summary/{s}" for s in pick(requests)],
+        "market.summary_batch_20": [f"/market/summary?tickers={','.join(pick(20))}" for _ in range(requests)],
+        "market.history_30d": [f"/market/history/{s}?days=30" for s in pick(requests)],
+        "market.screener": ["/market/screener?filter=change_1d_pct%3E2%20AND%20relative_vol%3E1.5&limit=50"] * requests,
+        "announcements.list_enriched_100": ["/announcements/list-enriched?limit=100"] * requests,
+        "announcements.list_enriched_ndjson_1000": ["/announcements/list-enriched?limit=1000&format=ndjson"] * max(1, requests // 5),
+        "cards.list_light_100": ["/cards?limit=100&view=light"] * requests,
+        "cards.list_full_100": ["/cards?limit=100"] * requests,
+        "cards.list_event_type": ["/cards?limit=100&view=light&event_type=Dividend"] * requests,
+        "cards.search": [f"/cards/search?q={SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}" for i in range(requests)],
+    }
+
+
+async def run_load(paths: Dict[str, str], requests: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    from app.main import app
+
+    results = {}
+    for name, urls in endpoint_paths(paths, requests).items():
+        stats = await load(app, urls, concurrency, warmup=min(50, len(urls)))
+        results[name] = stats
+        print(f"load  {name:<36} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms"
+              f"  p99 {stats['p99_ms']:9.3f} ms  {stats['rps']:9.1f} req/s  {stats['statuses']}")
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--size", choices=sorted(SIZES), default="small")
+    ap.add_argument("--workdir", default=os.path.join(os.environ.get("TMPDIR", "/tmp"), "marketnews-bench"))
+    ap.add_argument("--out", default="bench-results.json")
+    ap.add_argument("--baseline", help="result file to compare against; exit 1 on a regression")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    ap.add_argument("--only", choices=("micro", "load"))
+    ap.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--micro-seconds", type=float, default=MICRO_SECONDS)
+    args = ap.parse_args()
+
+    paths = prepare(os.path.abspath(args.workdir), args.size)
+    from app import db
+    from app.symbol_master import symbol_master_service
+
+    db.init_db()
+    symbol_master_service.load()
+
+    results: Dict[str, Any] = {
+        "version": 1,
+        "meta": {
+            "size": args.size,
+            **SIZES[args.size],
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} {os.cpu_count()} cpu",
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "micro": {},
+        "load": {},
+    }
+    if args.only != "load":
+        results["micro"] = run_micro(paths, args.micro_seconds)
+    if args.only != "micro":
+        results["load"] = asyncio.run(run_load(paths, args.requests, args.concurrency))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for warning in check_meta(results, baseline):
+            print(f"warning: {warning}")
+        table, regressions = report(compare(results, baseline, args.threshold), args.threshold)
+        print(table)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# ~/marketnews-app/backend/benchmarks/summarizer.py
+"""
+Summary worker throughput against a local stub model server.
+
+    python -m benchmarks.summarizer [--cards 2000] [--duplicates 0.3] [--latency-ms 200]
+                                    [--fail-rate 0.05] [--concurrency 8] [--batch 100]
+
+Starts an aiohttp stub that answers POST /summarize after --latency-ms and
+returns a 503 for --fail-rate of the calls, seeds a temporary SQLite database
+with --cards cards (a --duplicates share of them reusing another card's text),
+and runs SummaryWorker.run_once() until every card has a summary. Reported:
+cards/s, backend calls vs distinct texts (each text must be summarized
+exactly once), retries and failures. A second run over the same texts must
+be answered from summary_cache with no backend calls.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+
+async def stub_server(latency: float, fail_rate: float, calls: dict):
+    """
+    Start the stub model server (also used by tests/test_summarizer.py).
+    Returns (runner, summarize URL); counts calls into calls["total"]/["ok"].
+    """
+    from aiohttp import web
+
+    async def summarize(request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        calls["total"] += 1
+        if random.random() < fail_rate:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        calls["ok"] += 1
+        return web.json_response({"summary": "Summary: " + body["text"][:60]})
+
+    app = web.Application()
+    app.router.add_post("/summarize", summarize)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/summarize"
+
+
+async def drain(worker) -> float:
+    """Run worker.run_once() until a pass selects nothing. Returns the seconds taken."""
+    t0 = time.perf_counter()
+    while await worker.run_once():
+        pass
+    return time.perf_counter() - t0
+
+
+def _seed(cards: int, duplicates: float, offset: int = 0) -> int:
+    from app import db
+    from app.card_ingest import BulkIngest
+
+    distinct = max(1, round(cards * (1 - duplicates)))
+    session = db.SessionLocal()
+    ingest = BulkIngest(session)
+    for i in range(cards):
+        t = i if i < distinct else random.randrange(distinct)
+        ingest.add({
+            "url": f"https://example.com/{offset + i}", "company": f"Company{t % 500}", "source": "NSE",
+            "event_type": "Dividend", "raw_text": f"Board recommended a final dividend, announcement {t}. " * 10,
+        })
+        if ingest.full:
+            ingest.flush()
+    ingest.finish()
+    session.close()
+    return distinct
+
+
+async def _run(args) -> None:
+    from app import db, summarizer
+
+    db.init_db()
+    distinct = _seed(args.cards, args.duplicates)
+    calls = {"total": 0, "ok": 0}
+    runner, url = await stub_server(args.latency_ms / 1000, args.fail_rate, calls)
+    backend = summarizer.HTTPBackend(url, concurrency=args.concurrency)
+    try:
+        worker = summarizer.SummaryWorker(backend, args.batch, args.concurrency, max_retries=8)
+        seconds = await drain(worker)
+        s = worker.stats()
+        print(f"{args.cards} cards, {distinct} distinct texts, stub {args.latency_ms:.0f} ms, "
+              f"fail rate {args.fail_rate:.0%}, concurrency {args.concurrency}, batch {args.batch}")
+        print(f"first run: {seconds:.2f} s, {s['summarized'] / seconds:.0f} cards/s, "
+              f"{s['generated']} generated / {distinct} distinct, {calls['total']} HTTP calls, "
+              f"{s['retries']} retries, {s['failures']} failures, {s['deduplicated']} deduplicated in batch")
+        if s["generated"] + s["failures"] != distinct:
+            print("  !! some texts were summarized more than once")
+
+        # same texts again, new cards: everything must come from summary_cache
+        random.seed(1)
+        _seed(args.cards, args.duplicates, offset=args.cards)
+        before = calls["total"]
+        worker2 = summarizer.SummaryWorker(backend, args.batch, args.concurrency)
+        seconds = await drain(worker2)
+        s2 = worker2.stats()
+        print(f"second run: {seconds:.2f} s, {s2['summarized']} cards, {s2['cache_hits']} cache hits, "
+              f"{calls['total'] - before} HTTP calls")
+    finally:
+        await backend.close()
+        await runner.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cards", type=int, default=2000)
+    ap.add_argument("--duplicates", type=float, default=0.3)
+    ap.add_argument("--latency-ms", type=float, default=200)
+    ap.add_argument("--fail-rate", type=float, default=0.05)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--batch", type=int, default=100)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # before the app is imported: db.py builds its engines from DATABASE_URL
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        random.seed(0)
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
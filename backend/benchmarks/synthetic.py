@@ -0,0 +1,296 @@
+# ~/marketnews-app/backend/benchmarks/synthetic.py
+"""
+Synthetic data for the benchmarks: EOD CSVs, uploads folders and a cards
+database, at sizes the real data/ folder does not reach.
+
+    python -m benchmarks.synthetic eod --rows 100000 --days 5 --out /tmp/bench/data
+    python -m benchmarks.synthetic uploads --files 100000 --out /tmp/bench/uploads
+    python -m benchmarks.synthetic cards --rows 1000000 --out /tmp/bench/marketnews.db
+
+Everything is seeded, so the same arguments give the same data. EOD files use
+the header of the real exports (EOD_HEADER) and carry the same symbols every
+day, so /market/history has a series to return. Upload names mix the shapes
+seen in the uploads folder: exact tickers, tickers with suffixes, company
+names with underscores, dated names and noise that matches nothing.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+# header of the real EOD exports (data/eod_*.csv)
+EOD_HEADER = (
+    "Symbol", "Description", "Market capitalization", "Market capitalization - Currency",
+    "Price", "Price - Currency", "Low All Time", "Low All Time - Currency",
+    "High All Time", "High All Time - Currency", "Price Change % 1 day", "Price Change % 1 week",
+    "Price Change % 1 month", "Price * Volume (Turnover) 1 day", "Price * Volume (Turnover) 1 day - Currency",
+    "Relative Volume 1 day", "Volume Weighted Average Price 1 day", "Average True Range % (14) 1 day",
+    "Volatility 1 day", "Volatility 1 week", "Volume Change % 1 day", "Beta 1 year", "Price to earnings ratio",
+)
+
+NAME_WORDS = (
+    "Reliance Tata Infosys Larsen Ashok Godfrey Bharat Hindustan Indian National Shree Sun Asian Bajaj Mahindra "
+    "Adani Apollo Aditya Birla Kotak Axis Vedanta Ultra Grasim Titan Nestle Britannia Dabur Marico Havells "
+    "Siemens Bosch Cipla Lupin Zydus Biocon Torrent Alkem Ipca Glenmark Polycab Voltas Blue Dart Trent"
+).split()
+NAME_KINDS = (
+    "Industries", "Motors", "Textiles", "Pharma", "Finance", "Steel", "Cements", "Power", "Chemicals",
+    "Foods", "Infra", "Software", "Technologies", "Enterprises", "Holdings", "Agro", "Paper", "Logistics",
+)
+NAME_SUFFIXES = ("Limited", "Ltd.", "Limited", "Ltd")
+
+SOURCES = ("NSE", "BSE")
+EVENT_TYPES = ("Results", "Dividend", "BoardMeeting", "Bonus", "Split", "AGM", "Buyback", "Other")
+WORDS = (
+    "board meeting approved quarterly results revenue profit growth margin interim final dividend record date "
+    "shareholders allotment bonus issue split equity shares preferential warrant credit rating outlook stable "
+    "acquisition subsidiary merger scheme amalgamation order inflow contract capacity expansion plant commissioning "
+    "resignation appointment director auditor compliance regulation disclosure intimation newspaper publication "
+    "trading window closure investor presentation earnings call transcript audio recording buyback tender offer "
+    "pledge encumbrance promoter holding insider litigation penalty settlement tax demand refund guidance"
+).split()
+
+# smallest valid PNG (1x1, white) and a one-page PDF stub: upload contents only need to exist
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+    "0000000c49444154789c63f8ffff3f0005fe02fe0def46b80000000049454e44ae426082"
+)
+TINY_PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+
+
+def text_pdf(lines: List[str]) -> bytes:
+    """A one-page PDF (Helvetica, one text object) whose text layer is `lines`."""
+    def esc(line: str) -> str:
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 11 Tf 14 TL 50 760 Td " + " ".join(f"({esc(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<</Type/Catalog/Pages 2 0 R>>",
+        "<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        "<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Resources<</Font<</F1 4 0 R>>>>/Contents 5 0 R>>",
+        "<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+        f"<</Length {len(content.encode('latin-1'))}>>stream\n{content}\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer<</Size {len(objects) + 1}/Root 1 0 R>>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+# -----------------------
+# EOD CSVs
+# -----------------------
+def make_universe(rows: int, seed: int = 3) -> List[Dict[str, object]]:
+    """`rows` listed companies: unique symbol, name and day-0 fundamentals."""
+    rng = random.Random(seed)
+    seen = set()
+    universe = []
+    while len(universe) < rows:
+        first, kind = rng.choice(NAME_WORDS), rng.choice(NAME_KINDS)
+        base = (first[: rng.randint(3, 6)] + kind[: rng.randint(0, 4)]).upper()
+        symbol = base if base not in seen else f"{base}{len(universe)}"
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        price = round(10 ** rng.uniform(0.7, 4.3), 2)
+        universe.append({
+            "symbol": symbol,
+            "company": f"{first} {kind} {rng.choice(NAME_SUFFIXES)}",
+            "price": price,
+            "shares": 10 ** rng.uniform(6, 9.5),
+            "beta": round(rng.uniform(0.2, 2.2), 7),
+            "eps": rng.choice((None, rng.uniform(0.5, 150))),
+            "low": price * rng.uniform(0.05, 0.9),
+            "high": price * rng.uniform(1.05, 4),
+        })
+    return universe
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "" if value is None else repr(round(value, 6))
+
+
+def write_eod_csv(path: str, universe: List[Dict[str, object]], day: int = 0, seed: int = 5) -> str:
+    """One EOD file for `universe` on day `day` (prices random-walk from the previous day's)."""
+    rng = random.Random(seed * 1000 + day)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(EOD_HEADER)
+        for co in universe:
+            prev = co["price"]
+            change = rng.gauss(0, 2.2)
+            price = max(0.5, round(prev * (1 + change / 100), 2))
+            co["price"] = price
+            turnover = price * 10 ** rng.uniform(3, 7)
+            w.writerow((
+                co["symbol"], co["company"], int(price * co["shares"]), "INR",
+                price, "INR", _fmt(min(co["low"], price)), "INR", _fmt(max(co["high"], price)), "INR",
+                _fmt(change), _fmt(change * rng.uniform(0.5, 3)), _fmt(change * rng.uniform(1, 6)),
+                round(turnover, 2), "INR",
+                _fmt(10 ** rng.uniform(-1, 1.3)), _fmt(price * rng.uniform(0.98, 1.02)), _fmt(rng.uniform(1, 8)),
+                _fmt(rng.uniform(0.5, 20)), _fmt(rng.uniform(1, 10)), _fmt(rng.uniform(-90, 2000)),
+                co["beta"], _fmt(price / co["eps"] if co["eps"] else None),
+            ))
+    return path
+
+
+def make_eod_dir(out_dir: str, rows: int, days: int = 1, end: Optional[date] = None) -> List[str]:
+    """eod_YYYY-MM-DD.csv files for `days` consecutive weekdays ending at `end`; returns their paths, oldest first."""
+    os.makedirs(out_dir, exist_ok=True)
+    universe = make_universe(rows)
+    day = end or date(2025, 9, 16)
+    dates: List[date] = []
+    while len(dates) < days:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+    return [
+        write_eod_csv(os.path.join(out_dir, f"eod_{d.isoformat()}.csv"), universe, k)
+        for k, d in enumerate(reversed(dates))
+    ]
+
+
+# -----------------------
+# uploads folders
+# -----------------------
+def upload_filenames(mapping: Dict[str, str], n: int, seed: int = 7) -> List[str]:
+    """n filenames over mapping (symbol -> company): a quarter each of ticker, ticker+suffix, company name, noise."""
+    rng = random.Random(seed)
+    items = list(mapping.items())
+    names = []
+    for i in range(n):
+        sym, comp = rng.choice(items)
+        kind = i % 4
+        if kind == 0:
+            names.append(f"{sym}_{rng.randint(1, 9999)}.pdf")
+        elif kind == 1:
+            names.append(f"{sym}Q{rng.randint(1, 4)}-results.png")
+        elif kind == 2:
+            names.append(f"{comp.replace(' ', '_')}_board_meeting_2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}.pdf")
+        else:
+            names.append(f"scan {rng.randint(100000, 999999)} misc.jpg")
+    return names
+
+
+def make_uploads_dir(out_dir: str, files: int, mapping: Dict[str, str], seed: int = 7) -> int:
+    """
+    Fill out_dir with `files` tiny uploads named by upload_filenames (a
+    repeated name gets a _<n> suffix), one second of mtime apart, newest
+    last. Returns the number of files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = datetime(2025, 1, 1).timestamp()
+    names: Dict[str, None] = {}
+    for i, name in enumerate(upload_filenames(mapping, files, seed)):
+        if name in names:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{i}{ext}"
+        names[name] = None
+    for i, name in enumerate(names):
+        path = os.path.join(out_dir, name)
+        with open(path, "wb") as f:
+            f.write(TINY_PDF if name.endswith(".pdf") else TINY_PNG)
+        os.utime(path, (start + i, start + i))
+    return len(names)
+
+
+def universe_mapping(rows: int) -> Dict[str, str]:
+    """SYMBOL -> company for the same universe make_eod_dir writes."""
+    return {str(co["symbol"]): str(co["company"]) for co in make_universe(rows)}
+
+
+# -----------------------
+# cards database
+# -----------------------
+def build_db(path: str, rows: int) -> None:
+    """
+    A marketnews.db with `rows` cards (schema and indexes from the models, as
+    in the app). Kept and reused while its row count matches.
+    """
+    if os.path.exists(path):
+        with sqlite3.connect(path) as conn:
+            try:
+                if conn.execute("SELECT count(*) FROM cards").fetchone()[0] == rows:
+                    return
+            except sqlite3.Error:
+                pass
+        os.remove(path)
+
+    # schema (tables + indexes) comes from the models, like the app
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app import db
+
+    db.init_db()
+
+    rng = random.Random(11)
+    start = datetime(2020, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = []
+    for i in range(rows):
+        batch.append((
+            rng.choice(SOURCES),
+            f"Company{rng.randint(1, 3000)} Limited",
+            rng.choice(EVENT_TYPES),
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 120))),
+            "Short summary of the announcement.",
+            f"https://example.com/a/{i}",
+            (start + timedelta(seconds=i * 150 + rng.randint(0, 60))).isoformat(sep=" "),
+            rng.random() < 0.7,
+            json.dumps({"pages": rng.randint(1, 12)}),
+        ))
+        if len(batch) == 20000:
+            conn.executemany(
+                "INSERT INTO cards (source, company, event_type, raw_text, summary, url, published_at, approved, metadata)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    if batch:
+        conn.executemany(
+            "INSERT INTO cards (source, company, event_type, raw_text, summary, url, published_at, approved, metadata)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="kind", required=True)
+    p = sub.add_parser("eod", help="EOD CSVs")
+    p.add_argument("--rows", type=int, default=2700)
+    p.add_argument("--days", type=int, default=1)
+    p.add_argument("--out", required=True)
+    p = sub.add_parser("uploads", help="announcement uploads folder")
+    p.add_argument("--files", type=int, default=1000)
+    p.add_argument("--eod-rows", type=int, default=2700, help="universe the names are drawn from")
+    p.add_argument("--out", required=True)
+    p = sub.add_parser("cards", help="SQLite cards database")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--out", required=True)
+    args = ap.parse_args()
+
+    if args.kind == "eod":
+        for path in make_eod_dir(args.out, args.rows, args.days):
+            print(path)
+    elif args.kind == "uploads":
+        n = make_uploads_dir(args.out, args.files, universe_mapping(args.eod_rows))
+        print(f"{n} files in {args.out}")
+    else:
+        build_db(os.path.abspath(args.out), args.rows)
+        print(f"{args.rows} cards in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# ~/marketnews-app/backend/benchmarks/thumbnails.py
+"""
+Bytes per card and render cost of announcement thumbnails vs the originals.
+
+    python -m benchmarks.thumbnails [--uploads announcements/uploads] [--width 320]
+
+Renders every image/PDF in the uploads folder into a temporary thumbs dir
+(one process, so the time is per-core render cost), then compares the
+original size with the WebP and JPEG variant a card would load.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main() -> None:
+    from app import thumbnails
+    from app.paths import ANNOUNCEMENTS_UPLOADS_DIR
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--uploads", default=ANNOUNCEMENTS_UPLOADS_DIR)
+    ap.add_argument("--width", type=int, default=thumbnails.DEFAULT_WIDTH)
+    args = ap.parse_args()
+
+    if not thumbnails.HAVE_PIL:
+        raise SystemExit("Pillow is not installed (pip install pillow)")
+    service = thumbnails.ThumbnailService(args.uploads, "")
+    names = sorted(n for n in os.listdir(args.uploads) if not n.startswith(".") and service.handles(n))
+    if not names:
+        raise SystemExit(f"no images or PDFs in {args.uploads}")
+
+    totals = {"original": 0, "webp": 0, "jpeg": 0}
+    render = 0.0
+    rendered = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            src = os.path.join(args.uploads, name)
+            t0 = time.perf_counter()
+            try:
+                meta = thumbnails.render_thumbnails(src, tmp)
+            except Exception as e:
+                print(f"{name:<28} skipped: {e}")
+                continue
+            render += time.perf_counter() - t0
+            rendered += 1
+            service.thumbs_dir = tmp
+            sizes = {fmt: os.path.getsize(service.variant(meta, args.width, fmt)[0]) for fmt in ("webp", "jpeg")}
+            original = os.path.getsize(src)
+            totals["original"] += original
+            for fmt, size in sizes.items():
+                totals[fmt] += size
+            print(f"{name:<28} {original / 1024:8.1f} KiB -> webp {sizes['webp'] / 1024:6.1f} KiB"
+                  f"  jpeg {sizes['jpeg'] / 1024:6.1f} KiB  ({meta['width']}x{meta['height']} {meta['kind']})")
+
+    n = rendered
+    if not n:
+        raise SystemExit("nothing could be rendered")
+    print(f"\n{n} files, render {render / n * 1000:.0f} ms/file (all {len(thumbnails.WIDTHS)} widths x 2 formats)")
+    print(f"per card at w={args.width}: original {totals['original'] / n / 1024:.1f} KiB,"
+          f" webp {totals['webp'] / n / 1024:.1f} KiB ({totals['original'] / max(1, totals['webp']):.0f}x smaller),"
+          f" jpeg {totals['jpeg'] / n / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# ~/marketnews-app/backend/tests/conftest.py
+"""
+Shared test setup. Run from backend/ with `python -m pytest tests`.
+
+paths.py and db.py read their environment at import, so every location the
+app writes to is pointed at one temporary directory here, before any test
+module imports the app.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUNDLED_DATA_DIR = os.path.join(BACKEND_DIR, "data")
+TMP_DIR = tempfile.mkdtemp(prefix="marketnews-tests-")
+
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ["MARKETNEWS_DATA_DIR"] = os.path.join(TMP_DIR, "data")
+os.environ["MARKETNEWS_UPLOADS_DIR"] = os.path.join(TMP_DIR, "uploads")
+os.environ["MARKETNEWS_THUMBS_DIR"] = os.path.join(TMP_DIR, "thumbs")
+os.environ["MARKETNEWS_CACHE_DIR"] = os.path.join(TMP_DIR, "cache")
+# background services the tests drive themselves
+os.environ["UPLOAD_EXTRACT"] = "0"
+os.environ["ANNOUNCEMENT_FEEDS"] = ""
+os.environ["SUMMARY_BACKEND"] = ""
+os.environ["UPLOADS_WATCH"] = "0"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def database():
+    """The schema, with the cards table emptied for the test."""
+    from sqlalchemy import text
+
+    from app import db
+
+    db.init_db()
+    with db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM cards"))
+    return db
+
+
+@pytest.fixture(scope="session")
+def eod_data():
+    """The bundled EOD CSVs, copied into the app's data directory."""
+    data_dir = os.environ["MARKETNEWS_DATA_DIR"]
+    os.makedirs(data_dir, exist_ok=True)
+    for name in sorted(os.listdir(BUNDLED_DATA_DIR)):
+        if name.endswith(".csv"):
+            shutil.copy2(os.path.join(BUNDLED_DATA_DIR, name), data_dir)
+    return data_dir
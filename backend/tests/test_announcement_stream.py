@@ -0,0 +1,156 @@
+# ~/marketnews-app/backend/tests/test_announcement_stream.py
+"""
+AnnouncementBroadcaster over an UploadsIndex on a temp dir: replay from a
+resume token, the MAX_REPLAY cut, dropping a subscriber that falls behind,
+the high-water mark restarting with the first subscriber; and the stream
+endpoint enriching its events off the event loop.
+"""
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import announcement_stream
+from app.announcement_stream import EMPTY_TOKEN, AnnouncementBroadcaster, entry_token, stream_batches
+from app.main import app
+from app.paths import ANNOUNCEMENTS_UPLOADS_DIR
+from app.symbol_master import symbol_master_service
+from app.uploads_index import UploadsIndex
+
+MTIME = 1792217700
+
+
+def _upload(directory, name: str, offset: int = 0) -> None:
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(name)
+    os.utime(path, (MTIME + offset, MTIME + offset))
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    for i, name in enumerate(("a.txt", "b.txt", "c.txt")):
+        _upload(directory, name, i)
+    return str(directory)
+
+
+def _broadcaster(directory) -> AnnouncementBroadcaster:
+    index = UploadsIndex(directory, watch=False)
+    return AnnouncementBroadcaster(lambda: index, poll_seconds=0.01)
+
+
+async def _next_batch(events, timeout: float = 5.0):
+    return await asyncio.wait_for(events.__anext__(), timeout)
+
+
+def _kinds(batch):
+    return [(kind, entry.name if entry else None) for kind, _token, entry in batch]
+
+
+def test_replay_from_resume_token(uploads):
+    async def main():
+        broadcaster = _broadcaster(uploads)
+        index = broadcaster.index
+        await asyncio.to_thread(index.refresh)
+        sub = await broadcaster.subscribe(entry_token(index.get("a.txt")))
+        try:
+            assert not sub.truncated
+            assert sub.token == entry_token(index.get("c.txt"))
+            first = await _next_batch(stream_batches(sub))
+            assert _kinds(first) == [("announcement", "b.txt"), ("announcement", "c.txt"), ("ready", None)]
+            assert first[-1][1] == sub.token
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    asyncio.run(main())
+
+
+def test_replay_cut_at_max_replay_sends_reset(uploads, monkeypatch):
+    monkeypatch.setattr(announcement_stream, "MAX_REPLAY", 2)
+
+    async def main():
+        broadcaster = _broadcaster(uploads)
+        sub = await broadcaster.subscribe(EMPTY_TOKEN)
+        try:
+            assert sub.truncated and sub.replay == []
+            first = await _next_batch(stream_batches(sub))
+            assert _kinds(first) == [("reset", None), ("ready", None)]
+            assert first[0][1] == entry_token(broadcaster.index.head())
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    asyncio.run(main())
+
+
+def test_full_queue_drops_the_subscriber(uploads, monkeypatch):
+    monkeypatch.setattr(announcement_stream, "QUEUE_SIZE", 1)
+
+    async def main():
+        broadcaster = _broadcaster(uploads)
+        slow = await broadcaster.subscribe()
+        entry = broadcaster.index.head()
+        broadcaster.publish([entry])
+        broadcaster.publish([entry])
+        assert slow.dropped and broadcaster.dropped == 1
+        assert broadcaster.stats()["subscribers"] == 0
+
+        events = stream_batches(slow)
+        assert _kinds(await _next_batch(events)) == [("ready", None)]
+        assert _kinds(await _next_batch(events)) == [("announcement", "c.txt")]
+        with pytest.raises(StopAsyncIteration):
+            await _next_batch(events)   # the None after the queued batch ends the stream
+
+    asyncio.run(main())
+
+
+def test_high_water_mark_restarts_with_the_first_subscriber(uploads):
+    async def main():
+        broadcaster = _broadcaster(uploads)
+        first = await broadcaster.subscribe()
+        broadcaster.unsubscribe(first)
+        # lands while nobody listens: not news for the next subscriber
+        _upload(uploads, "d.txt", 10)
+        await asyncio.to_thread(broadcaster.index.refresh)
+
+        sub = await broadcaster.subscribe()
+        try:
+            events = stream_batches(sub)
+            assert _kinds(await _next_batch(events)) == [("ready", None)]
+            _upload(uploads, "e.txt", 20)
+            assert _kinds(await _next_batch(events)) == [("announcement", "e.txt")]
+            assert broadcaster.entries_sent == 1
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    asyncio.run(main())
+
+
+def test_events_are_enriched_off_the_event_loop(eod_data, monkeypatch):
+    os.makedirs(ANNOUNCEMENTS_UPLOADS_DIR, exist_ok=True)
+    _upload(ANNOUNCEMENTS_UPLOADS_DIR, "TCS.txt")
+    calls = []
+    current = symbol_master_service.current
+
+    def checked_current():
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("worker thread")
+        return current()
+
+    monkeypatch.setattr(symbol_master_service, "current", checked_current)
+    try:
+        with TestClient(app).websocket_connect(f"/announcements/stream?since={EMPTY_TOKEN}") as ws:
+            messages = [ws.receive_json()]
+            while messages[-1]["event"] != "ready":
+                messages.append(ws.receive_json())
+    finally:
+        os.remove(os.path.join(ANNOUNCEMENTS_UPLOADS_DIR, "TCS.txt"))
+    announced = [m for m in messages if m["event"] == "announcement"]
+    assert [m["filename"] for m in announced] == ["TCS.txt"]
+    assert announced[0]["company"] != "TCS"
+    assert calls and set(calls) == {"worker thread"}
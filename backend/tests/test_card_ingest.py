@@ -0,0 +1,38 @@
+# ~/marketnews-app/backend/tests/test_card_ingest.py
+"""BulkIngest: deduplication, and one clock and text format for published_at whoever writes it."""
+import re
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.card_ingest import BulkIngest
+from app.main import app
+
+STORED_FORMAT = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{6}$")
+
+
+def _stored(database) -> dict:
+    with database.engine.connect() as conn:
+        return dict(conn.execute(text("SELECT raw_text, published_at FROM cards")).all())
+
+
+def test_published_at_is_utc_in_one_format(database):
+    before = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    with database.SessionLocal() as session:
+        ingest = BulkIngest(session)
+        ingest.add({"source": "NSE", "raw_text": "no date"})
+        ingest.add({"source": "NSE", "raw_text": "ist", "published_at": "2025-10-17T10:15:00+05:30"})
+        ingest.add({"source": "NSE", "raw_text": "naive", "published_at": "2025-10-17T04:45:00"})
+        ingest.add({"source": "NSE", "raw_text": "naive"})  # duplicate in the request
+        report = ingest.finish()
+    assert [r["status"] for r in report["results"]] == ["inserted", "inserted", "inserted", "skipped"]
+
+    assert TestClient(app).post("/cards", json={"source": "NSE", "raw_text": "posted"}).status_code == 200
+
+    stored = _stored(database)
+    assert all(STORED_FORMAT.match(value) for value in stored.values()), stored
+    assert stored["ist"] == stored["naive"] == "2025-10-17 04:45:00.000000"
+    for key in ("no date", "posted"):
+        written = datetime.fromisoformat(stored[key])
+        assert before <= written <= before + timedelta(minutes=1)
@@ -0,0 +1,55 @@
+# ~/marketnews-app/backend/tests/test_card_search.py
+"""
+FTS search with bm25 applied to the newest RANK_WINDOW matches: the response
+says when the window cut in, and a page past the window ranks every match.
+"""
+import pytest
+
+from app import card_search, models
+from app.card_ingest import BulkIngest
+
+@pytest.fixture
+def cards(database, monkeypatch):
+    if not models.FTS_ENABLED:  # known once init_db has run
+        pytest.skip("SQLite without FTS5")
+    monkeypatch.setattr(card_search, "RANK_WINDOW", 3)
+    with database.SessionLocal() as session:
+        ingest = BulkIngest(session)
+        # oldest first: the best match is the oldest card
+        ingest.add({"url": "https://example.com/best", "company": "Dividend Yield Ltd",
+                    "event_type": "Dividend", "raw_text": "Dividend declared: final dividend of Rs 5."})
+        for i in range(4):
+            ingest.add({"url": f"https://example.com/{i}", "company": f"Company {i}",
+                        "event_type": "Outcome", "raw_text": f"Board meeting {i}; an interim dividend was discussed."})
+        ids = [r["id"] for r in ingest.finish()["results"]]
+        yield database, ids
+
+
+def _search(database, **kwargs):
+    with database.SessionLocal() as session:
+        return card_search.search_cards(session, "dividend", **kwargs)
+
+
+def test_window_is_reported(cards):
+    database, ids = cards
+    page = _search(database, limit=2)
+    assert page["engine"] == "fts5" and page["ranked_window"] == 3
+    assert ids[0] not in [r["id"] for r in page["results"]]
+
+
+def test_page_past_the_window_ranks_every_match(cards):
+    database, ids = cards
+    past = _search(database, limit=2, offset=2)
+    assert past["count"] == 2 and past["ranked_window"] is None
+
+    everything = _search(database, limit=10)
+    assert everything["ranked_window"] is None
+    assert [r["id"] for r in everything["results"]][0] == ids[0]
+    assert sorted(r["id"] for r in everything["results"]) == sorted(ids)
+
+
+def test_rare_query_is_not_windowed(cards):
+    database, ids = cards
+    with database.SessionLocal() as session:
+        page = card_search.search_cards(session, "yield", limit=2)
+    assert [r["id"] for r in page["results"]] == [ids[0]] and page["ranked_window"] is None
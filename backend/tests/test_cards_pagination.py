@@ -0,0 +1,44 @@
+# ~/marketnews-app/backend/tests/test_cards_pagination.py
+"""GET /cards keyset paging: every card exactly once, newest first, undated cards last."""
+from sqlalchemy import text
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.cards import NEXT_CURSOR_HEADER
+
+
+def _pages(client: TestClient, limit: int, max_pages: int = 100):
+    ids, cursor = [], None
+    for _ in range(max_pages):
+        resp = client.get("/cards", params={"limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        ids += [card["id"] for card in resp.json()]
+        cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+    raise AssertionError(f"still paging after {max_pages} pages: {ids}")
+
+
+def test_pages_cards_posted_in_the_same_second(database):
+    client = TestClient(app)
+    for i in range(5):
+        assert client.post("/cards", json={"source": "NSE", "raw_text": f"card {i}"}).status_code == 200
+    ids = _pages(client, 2)
+    assert len(ids) == len(set(ids)) == 5
+    assert ids == _pages(client, 100) == sorted(ids, reverse=True)
+
+
+def test_pages_second_precision_rows_after_migration(database):
+    # as stored by the old func.now() default (and in the shipped marketnews.db)
+    stamps = ["2025-09-15 20:08:33"] * 3 + ["2025-09-15 20:09:41", "2025-09-15T20:07:00", None, None]
+    with database.engine.begin() as conn:
+        for i, stamp in enumerate(stamps):
+            conn.execute(text("INSERT INTO cards (source, raw_text, published_at) VALUES ('NSE', :t, :p)"),
+                         {"t": f"legacy {i}", "p": stamp})
+    database.init_db()
+
+    client = TestClient(app)
+    expected = [4, 3, 2, 1, 5, 7, 6]  # newest first, id descending within a second, undated last
+    for limit in (1, 2, 3, 100):
+        assert _pages(client, limit) == expected
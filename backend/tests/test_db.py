@@ -0,0 +1,29 @@
+# ~/marketnews-app/backend/tests/test_db.py
+"""The read-only SQLite engine opens the same file as the writer, whatever characters its path has."""
+import os
+from urllib.parse import quote
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db import make_engine
+
+
+@pytest.mark.parametrize("directory", ["plain", "a#b", "c?d", "e%41f", "g h"])
+def test_read_engine_opens_the_writers_file(tmp_path, directory):
+    path = os.path.join(tmp_path, directory, "marketnews.db")
+    os.makedirs(os.path.dirname(path))
+    url = f"sqlite:///{quote(path)}"
+    writer, reader = make_engine(url), make_engine(url, read_only=True)
+    try:
+        with writer.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT x FROM t")).scalar_one() == 1
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO t VALUES (2)"))
+    finally:
+        writer.dispose()
+        reader.dispose()
@@ -0,0 +1,94 @@
+# ~/marketnews-app/backend/tests/test_feed_ingest.py
+"""
+FeedIngester.run_once against the stub exchange from benchmarks/feeds.py: a
+first round downloads and inserts, an unchanged page answers 304 (or, without
+validators, comes back byte-identical and is skipped), and a page changed
+within the same second is downloaded again. A page that failed to parse is
+downloaded and parsed again next round, not answered from its validators.
+"""
+import asyncio
+
+from sqlalchemy import func, select
+
+from benchmarks.feeds import StubExchange
+
+from app import feed_ingest
+from app.feed_ingest import Feed, FeedIngester
+from app.models import Card
+
+
+def _cards(db) -> int:
+    with db.SessionLocal() as session:
+        return session.execute(select(func.count()).select_from(Card)).scalar_one()
+
+
+def _run(tmp_path, validators: bool, body) -> None:
+    async def main():
+        stub = StubExchange(feeds=2, items=5, latency=0.0, validators=validators)
+        port = await stub.start()
+        feeds = [Feed("NSE" if f % 2 == 0 else "BSE", f"http://127.0.0.1:{port}/feed/{f}") for f in range(2)]
+        ingester = FeedIngester(feeds, parse_workers=0, validators_path=str(tmp_path / "validators.json"))
+        try:
+            await body(stub, ingester)
+        finally:
+            await ingester.stop()
+            await stub.stop()
+
+    asyncio.run(main())
+
+
+def test_fetched_then_not_modified(database, tmp_path):
+    async def body(stub, ingester):
+        first = await ingester.run_once()
+        assert first["items"] == 10 and first["inserted"] == 10
+        assert ingester.fetched == 2 and stub.counts == {"200": 2, "304": 0}
+
+        again = await ingester.run_once()
+        assert again["items"] == 0 and again["inserted"] == 0
+        assert ingester.not_modified == 2 and stub.counts["304"] == 2
+
+        # same second, so the same Last-Modified: the new ETag must still win
+        assert stub.publish(0.5, 3) == 3
+        changed = await ingester.run_once()
+        assert changed["inserted"] == 3 and changed["duplicates"] == 5
+        assert ingester.fetched == 3 and ingester.not_modified == 3
+        assert ingester.errors == 0 and _cards(database) == 13
+
+    _run(tmp_path, True, body)
+
+
+def test_unchanged_without_validators(database, tmp_path):
+    async def body(stub, ingester):
+        await ingester.run_once()
+        again = await ingester.run_once()
+        assert again["items"] == 0
+        assert ingester.unchanged == 2 and ingester.not_modified == 0 and stub.counts["200"] == 4
+        assert _cards(database) == 10
+
+    _run(tmp_path, False, body)
+
+
+def test_unparseable_page_is_fetched_again(database, tmp_path, monkeypatch):
+    parse_feed = feed_ingest.parse_feed
+    failures = []
+
+    def parse_once_broken(body, content_type, source, feed_url):
+        if not failures:
+            failures.append(feed_url)
+            raise ValueError("parser bug")
+        return parse_feed(body, content_type, source, feed_url)
+
+    monkeypatch.setattr(feed_ingest, "parse_feed", parse_once_broken)
+
+    async def body(stub, ingester):
+        first = await ingester.run_once()
+        assert first["inserted"] == 5 and ingester.errors == 1
+
+        # the "fixed" parser gets the same page: a 200 with a known body, parsed this time
+        again = await ingester.run_once()
+        assert again["inserted"] == 5
+        assert stub.counts == {"200": 3, "304": 1}
+        assert ingester.not_modified == 1 and ingester.fetched == 3
+        assert _cards(database) == 10
+
+    _run(tmp_path, True, body)
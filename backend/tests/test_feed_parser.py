@@ -0,0 +1,68 @@
+# ~/marketnews-app/backend/tests/test_feed_parser.py
+"""
+feed_parser: HTML header matching on the NSE and BSE announcement tables, and
+published_at normalized to naive UTC whatever the page's time format.
+"""
+from datetime import datetime
+
+import pytest
+
+from app.feed_parser import _header_columns, parse_datetime, parse_feed
+
+NSE_HEADERS = ["Symbol", "Company Name", "Subject", "Details", "Attachment",
+               "Broadcast Date/Time", "Receipt", "Dissemination", "Difference"]
+BSE_HEADERS = ["Scrip Code", "Company", "Category", "Announcement Date", "Details", "Attachment"]
+
+
+def test_nse_headers():
+    assert _header_columns(NSE_HEADERS) == {
+        "symbol": 0, "company": 1, "event_type": 2, "raw_text": 3, "url": 4, "published_at": 5,
+    }
+
+
+def test_bse_headers():
+    assert _header_columns(BSE_HEADERS) == {
+        "symbol": 0, "company": 1, "event_type": 2, "published_at": 3, "raw_text": 4, "url": 5,
+    }
+
+
+def test_exact_and_whole_word_matches():
+    # "Announcement" alone is the text; words inside other words do not count
+    assert _header_columns(["Security Code", "Announcement", "Date", "Filename"]) == {
+        "symbol": 0, "raw_text": 1, "published_at": 2,
+    }
+    # a header equal to an alias keeps it even when an earlier one contains the word
+    assert _header_columns(["Security Name", "Name"]) == {"company": 1}
+
+
+def test_bse_table():
+    body = (
+        "<table><tr>" + "".join(f"<th>{h}</th>" for h in BSE_HEADERS) + "</tr>"
+        "<tr><td>500325</td><td>Reliance Industries Ltd</td><td>Board Meeting</td>"
+        "<td>17-Oct-2026 10:15:00</td><td>Outcome of the board meeting held today.</td>"
+        "<td><a href=\"/files/1.pdf\">PDF</a></td></tr></table>"
+    ).encode()
+    [row] = parse_feed(body, "text/html", "BSE", "https://www.bseindia.com/corporates/ann.html")
+    assert row["raw_text"] == "Outcome of the board meeting held today."
+    assert row["event_type"] == "Board Meeting"
+    assert row["url"] == "https://www.bseindia.com/files/1.pdf"
+    assert row["published_at"] == datetime(2026, 10, 17, 4, 45)
+    assert row["metadata"]["symbol"] == "500325"
+
+
+@pytest.mark.parametrize("value", [
+    "17-Oct-2026 10:15:00",             # exchange time, no offset: IST
+    "17/10/2026 10:15:00",
+    "2026-10-17T10:15:00",
+    "2026-10-17T04:45:00Z",
+    "2026-10-17T10:15:00+05:30",
+    "Sat, 17 Oct 2026 04:45:00 GMT",
+    "Sat, 17 Oct 2026 06:45:00 +0200",
+])
+def test_parse_datetime_is_naive_utc(value):
+    assert parse_datetime(value) == datetime(2026, 10, 17, 4, 45)
+
+
+def test_parse_datetime_rejects_garbage():
+    assert parse_datetime("yesterday") is None
+    assert parse_datetime("") is None
@@ -0,0 +1,37 @@
+# ~/marketnews-app/backend/tests/test_market_summary.py
+"""GET /market/summary/{ticker}: ETag handling, and no snapshot work on the event loop."""
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.symbol_master import symbol_master_service
+
+
+def test_etag_and_unknown_ticker(eod_data):
+    client = TestClient(app)
+    resp = client.get("/market/summary/INFY")
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert client.get("/market/summary/INFY", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/market/summary/INFY", headers={"If-None-Match": "*"}).status_code == 304
+    # a ticker that does not exist has no representation to be "not modified"
+    assert client.get("/market/summary/ZZZQQQXX", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get("/market/summary/ZZZQQQXX", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_symbol_master_is_not_touched_on_the_event_loop(eod_data, monkeypatch):
+    calls = []
+    current = symbol_master_service.current
+
+    def checked_current():
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("worker thread")
+        return current()
+
+    monkeypatch.setattr(symbol_master_service, "current", checked_current)
+    assert TestClient(app).get("/market/summary/TCS").status_code == 200
+    assert calls and set(calls) == {"worker thread"}
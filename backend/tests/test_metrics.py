@@ -0,0 +1,41 @@
+# ~/marketnews-app/backend/tests/test_metrics.py
+"""MetricsMiddleware labels requests by route template, for every kind of route the app has."""
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import _template_from_params, registry
+
+
+def _requests_by_route() -> dict:
+    counts = {}
+    for line in registry.render().splitlines():
+        if line.startswith("marketnews_http_requests_total{"):
+            labels, value = line.rsplit(" ", 1)
+            route = labels.split('route="', 1)[1].split('"', 1)[0]
+            counts[route] = counts.get(route, 0) + float(value)
+    return counts
+
+
+def test_route_templates(database):
+    client = TestClient(app, raise_server_exceptions=False)
+    before = _requests_by_route()
+    for path in ("/health", "/cards?limit=1", "/market/summary/INFY", "/market/summary/TCS",
+                 "/market/history/INFY", "/static/images/missing.png", "/no/such/route"):
+        client.get(path)  # statuses vary (no EOD file here); only the labels matter
+    after = _requests_by_route()
+    grew = {route: after[route] - before.get(route, 0) for route in after if after[route] != before.get(route, 0)}
+    assert grew == {
+        "/health": 1,
+        "/cards": 1,
+        "/market/summary/{ticker}": 2,  # the plain Starlette route added with add_route
+        "/market/history/{ticker}": 1,
+        "/static/images/{path}": 1,
+        "unmatched": 1,
+    }
+
+
+def test_template_from_params():
+    assert _template_from_params("/market/summary/INFY", {"ticker": "INFY"}) == "/market/summary/{ticker}"
+    assert _template_from_params("/files/a/b.pdf", {"path": "a/b.pdf"}) == "/files/{path}"
+    assert _template_from_params("/market/summary/INFYX", {"ticker": "INFY"}) is None
+    assert _template_from_params("/x", {}) == "/x"
@@ -0,0 +1,27 @@
+# ~/marketnews-app/backend/tests/test_ready.py
+"""/ready answers 503 until the lifespan's warmup is done, 200 after it, and 503 again once shutdown begins."""
+from fastapi.testclient import TestClient
+
+from app import main, startup
+
+
+def test_ready_follows_warmup(database, eod_data, monkeypatch):
+    # a fresh warmup: the module's own may have run for another test already
+    monkeypatch.setattr(main, "warmup", startup.Warmup(startup.warmup.chains))
+
+    before = TestClient(main.app).get("/ready")  # no `with`: the lifespan does not run
+    assert before.status_code == 503
+    assert before.json()["ready"] is False
+    assert {s["status"] for s in before.json()["steps"].values()} == {"pending"}
+
+    with TestClient(main.app) as client:
+        after = client.get("/ready")
+        assert after.status_code == 200
+        report = after.json()
+        assert report["ready"] is True and report["degraded"] == []
+        assert {s["status"] for s in report["steps"].values()} == {"ok"}
+        assert report["steps"]["eod_snapshot"]["rows"] > 0
+
+    stopping = TestClient(main.app).get("/ready")
+    assert stopping.status_code == 503
+    assert stopping.json()["stopping"] is True
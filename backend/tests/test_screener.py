@@ -0,0 +1,35 @@
+# ~/marketnews-app/backend/tests/test_screener.py
+"""screener.screen: the match count, rows without a sort value, and ties at the top-k boundary."""
+import numpy as np
+import pytest
+
+from app.screener import ScreenerError, screen
+
+
+def _columns(**cols):
+    arrays = {name: np.asarray(values, dtype=np.float64) for name, values in cols.items()}
+    return arrays.__getitem__, len(next(iter(arrays.values())))
+
+
+def test_total_counts_rows_without_a_sort_value():
+    column, n = _columns(price=[10, 20, 30, 40], relvol=[1.0, np.nan, 3.0, np.nan])
+    rows, total = screen(column, n, "price>15", "relative_vol", limit=10)
+    assert rows.tolist() == [2]
+    assert total == 3
+
+
+def test_ties_at_the_boundary_go_by_file_order():
+    values = [5.0, 1.0, 5.0, 7.0, 5.0, 5.0, 2.0, 5.0]
+    column, n = _columns(price=values, relvol=values)
+    for limit in range(1, n + 1):
+        rows, total = screen(column, n, None, "price", limit=limit)
+        expected = sorted(range(n), key=lambda i: (-values[i], i))[:limit]
+        assert rows.tolist() == expected and total == n
+        rows, _ = screen(column, n, None, "price", descending=False, limit=limit)
+        assert rows.tolist() == sorted(range(n), key=lambda i: (values[i], i))[:limit]
+
+
+def test_unknown_field():
+    column, n = _columns(price=[1.0])
+    with pytest.raises(ScreenerError):
+        screen(column, n, "nope>1", "price")
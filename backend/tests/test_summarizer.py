@@ -0,0 +1,78 @@
+# ~/marketnews-app/backend/tests/test_summarizer.py
+"""
+SummaryWorker.run_once against the stub model server from
+benchmarks/summarizer.py: every distinct text is sent once, repeats come from
+summary_cache, and a text that failed for good is not retried right away.
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import select
+
+from benchmarks.summarizer import drain, stub_server
+
+from app import summarizer
+from app.card_ingest import BulkIngest
+from app.models import Card
+
+
+def _seed(db, texts):
+    with db.SessionLocal() as session:
+        ingest = BulkIngest(session)
+        for i, text in enumerate(texts):
+            ingest.add({"url": f"https://example.com/{uuid.uuid4().hex}/{i}", "company": "Acme", "source": "NSE", "raw_text": text})
+        ingest.finish()
+
+
+def _summaries(db):
+    with db.SessionLocal() as session:
+        return [s for (s,) in session.execute(select(Card.summary).order_by(Card.id))]
+
+
+async def _with_stub(fail_rate, body):
+    calls = {"total": 0, "ok": 0}
+    runner, url = await stub_server(0.0, fail_rate, calls)
+    backend = summarizer.HTTPBackend(url, concurrency=4)
+    try:
+        await body(backend, calls)
+    finally:
+        await backend.close()
+        await runner.cleanup()
+
+
+def test_each_text_is_summarized_once(database):
+    tag = uuid.uuid4().hex  # summary_cache outlives the cards table between tests
+    texts = [f"Board meeting {tag} outcome {i % 4}." for i in range(6)]
+    _seed(database, texts)
+
+    async def body(backend, calls):
+        worker = summarizer.SummaryWorker(backend, batch_size=4, concurrency=4)
+        await drain(worker)
+        assert calls["total"] == 4
+        assert worker.generated == 4 and worker.summarized == 6 and worker.failures == 0
+        assert _summaries(database) == [f"Summary: {text}" for text in texts]
+
+        _seed(database, texts[:2])
+        again = summarizer.SummaryWorker(backend, batch_size=4)
+        await drain(again)
+        assert calls["total"] == 4
+        assert again.summarized == 2 and again.cache_hits == 2
+
+    asyncio.run(_with_stub(0.0, body))
+
+
+def test_failed_text_waits_for_retry(database):
+    _seed(database, [f"Trading window closure {uuid.uuid4().hex}."])
+
+    async def body(backend, calls):
+        worker = summarizer.SummaryWorker(backend, max_retries=1)
+        assert await worker.run_once() == 1
+        assert calls["total"] == 2
+        assert worker.retries == 1 and worker.failures == 1
+        assert _summaries(database) == [None]
+
+        assert await worker.run_once() == 0   # past the last card: the cursor wraps
+        assert await worker.run_once() == 1
+        assert calls["total"] == 2            # skipped until FAILED_RETRY_SECONDS
+
+    asyncio.run(_with_stub(1.0, body))
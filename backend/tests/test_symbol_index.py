@@ -0,0 +1,114 @@
+# ~/marketnews-app/backend/tests/test_symbol_index.py
+"""
+SymbolIndex.resolve against the five linear passes it replaced, over every
+bundled EOD CSV: each symbol and company name as given, lowercased, by
+prefix and by word, plus tickers that match nothing.
+"""
+import csv
+import glob
+import os
+import re
+from typing import Dict, List, Optional
+
+import pytest
+
+from conftest import BUNDLED_DATA_DIR
+
+from app.eod_schema import read_eod_csv
+from app.symbol_index import SymbolIndex, normalize_text
+
+CSV_PATHS = sorted(glob.glob(os.path.join(BUNDLED_DATA_DIR, "eod_*.csv")))
+
+SYMBOL_HEADERS = ("symbol", "ticker", "securitycode", "security code", "scrip")
+DESC_HEADERS = ("description", "company", "companyname", "nameofthecompany", "name", "description of announcement")
+MISSES = ("", "   ", "ZZZZQQQ", "no such company xyz", "@@@", "Q9X8W7")
+
+
+def _header_get(row: Dict[str, str], header_candidates) -> Optional[str]:
+    for k in row.keys():
+        if k is None:
+            continue
+        if k.strip().lower() in [h.lower() for h in header_candidates]:
+            return row.get(k)
+    return None
+
+
+class LinearResolver:
+    """
+    The pre-index lookup from routers/market_summary.py, returning the row
+    position. The per-row header lookups are done once up front, and each
+    pass scans with the same first-row-wins conditions as before.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]]):
+        self.syms = [_header_get(r, SYMBOL_HEADERS) for r in rows]
+        self.comps = [_header_get(r, DESC_HEADERS) for r in rows]
+        self.syms_upper = [s.strip().upper() if s and isinstance(s, str) else None for s in self.syms]
+        self.syms_norm = [normalize_text(s) if s else None for s in self.syms]
+        self.syms_raw_upper = [str(s).upper() if s else None for s in self.syms]
+        self.comps_low = [c.lower() if c and isinstance(c, str) else None for c in self.comps]
+
+    def resolve(self, ticker: str) -> Optional[int]:
+        t_raw = (ticker or "").strip()
+        if not t_raw:
+            return None
+        t = t_raw.upper()
+        t_norm = normalize_text(t_raw)
+
+        # 1) exact symbol (case-insensitive), 2) normalized symbol exact
+        for column, value in ((self.syms_upper, t), (self.syms_norm, t_norm)):
+            if value in column:
+                return column.index(value)
+        # 3) symbol contains the ticker
+        for i, (raw, norm) in enumerate(zip(self.syms_raw_upper, self.syms_norm)):
+            if raw is not None and (t in raw or t_norm in norm):
+                return i
+        # 4) description contains the ticker text
+        lowered_t = t_raw.lower()
+        for i, comp in enumerate(self.comps_low):
+            if comp is not None and lowered_t in comp:
+                return i
+        # 5) description contains any token of the ticker
+        t_tokens = [tok.lower() for tok in re.split(r"\s+|[^A-Za-z0-9]+", t_raw) if tok]
+        for i, comp in enumerate(self.comps_low):
+            if comp is not None and any(tok in comp for tok in t_tokens):
+                return i
+        return None
+
+
+def _queries(rows: List[Dict[str, str]]) -> List[str]:
+    queries = set(MISSES)
+    for r in rows:
+        for value in (_header_get(r, SYMBOL_HEADERS), _header_get(r, DESC_HEADERS)):
+            if not value:
+                continue
+            queries.update((value, value.lower(), value[:3], value[: max(1, len(value) // 2)]))
+            queries.update(w for w in re.split(r"\s+", value) if w)
+    return sorted(queries)
+
+
+@pytest.mark.skipif(not CSV_PATHS, reason="no bundled EOD CSV")
+@pytest.mark.parametrize("path", CSV_PATHS, ids=os.path.basename)
+def test_index_matches_linear_passes(path):
+    with open(path, newline="", encoding="utf-8", errors="ignore") as f:
+        rows = list(csv.DictReader(f))
+    _schema, records = read_eod_csv(path)
+    assert len(records) == len(rows)
+    index = SymbolIndex.from_records(records)
+
+    linear = LinearResolver(rows)
+    mismatches = []
+    for query in _queries(rows):
+        expected, got = linear.resolve(query), index.resolve(query)
+        if expected != got:
+            mismatches.append((query, expected, got))
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[:5]}"
+
+
+def test_first_row_wins_within_a_pass():
+    index = SymbolIndex(["ABC", "XABCX", "ABCD", None], ["Alpha Ltd", "Beta Alpha", None, "Gamma"])
+    assert index.resolve("abc") == 0
+    assert index.resolve("BCD") == 2
+    assert index.resolve("alpha") == 0
+    assert index.resolve("gamma corp") == 3
+    assert index.resolve("nothing") is None
@@ -0,0 +1,77 @@
+# ~/marketnews-app/backend/tests/test_thumbnails.py
+"""
+ThumbnailService.ensure, as list-enriched calls it for every listed upload:
+it never queues more than MAX_IN_FLIGHT renders, and stops resubmitting an
+upload that keeps breaking the pool.
+"""
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app import thumbnails
+from app.static_assets import HashManifest
+from app.thumbnails import MAX_IN_FLIGHT, MAX_POOL_BREAKS, ThumbnailService
+from app.uploads_index import UploadEntry
+
+
+class StalledPool:
+    """Accepts renders and never finishes them."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return Future()
+
+
+class CrashingPool(StalledPool):
+    """Every render dies with its worker."""
+
+    def submit(self, fn, *args):
+        fut = super().submit(fn, *args)
+        fut.set_exception(BrokenProcessPool("worker died"))
+        return fut
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "HAVE_PIL", True)
+    service = ThumbnailService(str(tmp_path / "uploads"), str(tmp_path / "thumbs"), HashManifest(None))
+    service._pool = StalledPool()
+    return service
+
+
+def test_ensure_stops_queueing_at_max_in_flight(service):
+    entries = [UploadEntry(f"page-{i}.png", 100, i) for i in range(MAX_IN_FLIGHT * 3)]
+    for entry in entries:
+        assert service.ensure(entry) is None
+    assert len(service._pending) == MAX_IN_FLIGHT
+    assert service._pool.submitted == MAX_IN_FLIGHT
+
+    # a page listed again joins the renders already queued
+    for entry in entries[:MAX_IN_FLIGHT]:
+        service.ensure(entry)
+    assert service._pool.submitted == MAX_IN_FLIGHT
+
+
+def test_ensure_queues_again_once_renders_finish(service):
+    entries = [UploadEntry(f"page-{i}.png", 100, i) for i in range(MAX_IN_FLIGHT + 1)]
+    for entry in entries:
+        service.ensure(entry)
+    first = next(iter(service._pending.values()))
+    first.set_exception(ValueError("not an image"))
+    service.ensure(entries[-1])
+    assert (entries[-1].name, entries[-1].mtime_ns) in service._pending
+    assert service._pool.submitted == MAX_IN_FLIGHT + 1
+
+
+def test_upload_that_keeps_breaking_the_pool_is_failed(service):
+    pool = CrashingPool()
+    service._executor = lambda: pool  # a break drops service._pool; keep crashing instead
+    entry = UploadEntry("bomb.pdf", 100, 1)
+    for _ in range(MAX_POOL_BREAKS * 2):
+        service.ensure(entry)
+    assert pool.submitted == MAX_POOL_BREAKS
+    assert service.failed(entry) and not service._pending
@@ -0,0 +1,111 @@
+# ~/marketnews-app/backend/tests/test_upload_extract.py
+"""
+UploadExtractor.run_until_idle across restarts: processed files are not
+extracted again, new ones are, and a file that failed is retried only once
+FAILED_RETRY_SECONDS have passed since it failed. A file that keeps breaking
+the pool counts as failed too.
+"""
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text, update
+
+from benchmarks.synthetic import text_pdf
+
+from app import upload_text
+from app.models import Card, UploadText, utc_now
+from app.static_assets import HashManifest
+from app.symbol_master import SymbolMaster
+from app.upload_extract import FAILED_RETRY_SECONDS, MAX_POOL_BREAKS, UploadExtractor
+from app.uploads_index import UploadsIndex
+
+pytestmark = pytest.mark.skipif(not upload_text.HAVE_PDFIUM, reason="pypdfium2 is not installed")
+
+MTIME = 1792217700  # 2026-10-17 06:15:00 UTC
+
+
+def _write(directory, name: str, data: bytes) -> None:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (MTIME, MTIME))
+
+
+def _drain(directory) -> UploadExtractor:
+    """A fresh extractor, as after a restart, run over the whole folder."""
+    extractor = UploadExtractor(directory, HashManifest(None), workers=1, master_factory=lambda: SymbolMaster(None))
+    try:
+        extractor.written = extractor.run_until_idle(UploadsIndex(directory, watch=False), poll_seconds=0.01)
+    finally:
+        extractor.stop()
+    return extractor
+
+
+@pytest.fixture
+def uploads(database, tmp_path):
+    with database.engine.begin() as conn:
+        conn.execute(text("DELETE FROM upload_texts"))
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    return str(directory)
+
+
+def test_resume_after_restart(database, uploads):
+    _write(uploads, "results.pdf", text_pdf(["Financial results for the quarter ended September 2026."]))
+    _write(uploads, "broken.pdf", b"%PDF-1.4 not really a pdf")
+
+    first = _drain(uploads)
+    assert first.written == 2
+    assert (first.extracted, first.failed) == (1, 1)
+
+    _write(uploads, "dividend.pdf", text_pdf(["The board recommended a final dividend of Rs 5 per share."]))
+    second = _drain(uploads)
+    assert second.written == 1                 # only the new file; broken.pdf is cooling down
+    assert (second.extracted, second.failed) == (1, 0)
+
+    with database.SessionLocal() as session:
+        cards = dict(session.execute(select(Card.url, Card.published_at).where(Card.source == "UPLOAD")).all())
+        assert sorted(cards) == ["/announcements/file/dividend.pdf", "/announcements/file/results.pdf"]
+        assert set(cards.values()) == {datetime(2026, 10, 17, 6, 15)}
+        # as if the failure were older than the cooldown
+        session.execute(
+            update(UploadText).where(UploadText.status == "failed")
+            .values(updated_at=utc_now() - timedelta(seconds=FAILED_RETRY_SECONDS + 1))
+        )
+        session.commit()
+
+    third = _drain(uploads)
+    assert third.written == 1
+    assert (third.extracted, third.failed) == (0, 1)
+    assert third.stats()["backlog"] == 0
+
+
+class CrashingPool:
+    """Every extraction dies with its worker."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        fut = Future()
+        fut.set_exception(BrokenProcessPool("worker died"))
+        return fut
+
+
+def test_file_that_keeps_breaking_the_pool_is_failed(database, uploads):
+    _write(uploads, "bomb.pdf", text_pdf(["Kills its worker."]))
+    extractor = UploadExtractor(uploads, HashManifest(None), workers=1, master_factory=lambda: SymbolMaster(None))
+    pool = CrashingPool()
+    extractor._executor = lambda: pool  # a break drops extractor._pool; keep crashing instead
+    index = UploadsIndex(uploads, watch=False)
+    for _ in range(MAX_POOL_BREAKS * 2):
+        extractor.sync(index)
+        extractor.flush()
+    assert pool.submitted == MAX_POOL_BREAKS
+    assert extractor.failed == 1 and extractor.backlog == 0 and not extractor._pending
+    with database.SessionLocal() as session:
+        assert session.execute(select(UploadText.status)).scalars().all() == ["failed"]
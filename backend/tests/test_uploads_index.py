@@ -0,0 +1,42 @@
+# ~/marketnews-app/backend/tests/test_uploads_index.py
+"""UploadsIndex.page with a predicate: next_cursor only when another matching entry follows."""
+import os
+
+from app.uploads_index import UploadsIndex
+
+MTIME = 1792217700
+
+
+def _index(tmp_path, names):
+    for i, name in enumerate(names):
+        path = tmp_path / name
+        path.write_text(name)
+        os.utime(path, (MTIME - i, MTIME - i))  # newest first, in list order
+    return UploadsIndex(str(tmp_path), watch=False)
+
+
+def _is_pdf(entry) -> bool:
+    return entry.name.endswith(".pdf")
+
+
+def test_no_cursor_when_only_non_matching_entries_remain(tmp_path):
+    index = _index(tmp_path, ["a.pdf", "b.pdf", "c.png", "d.png"])
+    page, next_cursor = index.page(2, predicate=_is_pdf)
+    assert [e.name for e in page] == ["a.pdf", "b.pdf"]
+    assert next_cursor is None
+
+
+def test_pages_follow_matching_entries(tmp_path):
+    index = _index(tmp_path, ["a.pdf", "b.png", "c.png", "d.pdf", "e.png"])
+    first, cursor = index.page(1, predicate=_is_pdf)
+    assert [e.name for e in first] == ["a.pdf"] and cursor is not None
+    second, cursor = index.page(1, cursor, predicate=_is_pdf)
+    assert [e.name for e in second] == ["d.pdf"] and cursor is None
+
+
+def test_without_predicate(tmp_path):
+    index = _index(tmp_path, ["a.pdf", "b.png"])
+    page, cursor = index.page(1)
+    assert [e.name for e in page] == ["a.pdf"] and cursor is not None
+    page, cursor = index.page(1, cursor)
+    assert [e.name for e in page] == ["b.png"] and cursor is None
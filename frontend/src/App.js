@@ -6,7 +6,7 @@ function App() {
   const [cards, setCards] = useState([]);
 
   useEffect(() => {
-    fetch("http://127.0.0.1:8000/cards")
+    fetch("http://127.0.0.1:8000/cards?view=light")
       .then((res) => res.json())
       .then((data) => setCards(data))
       .catch((err) => console.error("Error fetching cards:", err));
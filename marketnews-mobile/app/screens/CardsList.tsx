@@ -1,5 +1,5 @@
 // marketnews-mobile/app/screens/CardsList.tsx
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import {
   View,
   Text,
@@ -9,11 +9,14 @@ import {
   ActivityIndicator,
   SafeAreaView,
   Alert,
+  Image,
 } from "react-native";
 import CardModal from "../components/CardModal";
 
 // default backend base (change if needed)
 const DEFAULT_API_BASE = "http://10.249.74.1:8000";
+// announcements per page (backend serves newest first with a keyset cursor)
+const PAGE_SIZE = 50;
 
 type AnnFile = {
   filename: string;
@@ -21,40 +24,92 @@ type AnnFile = {
   company?: string;
   download_url?: string;
   filename_date?: string;
+  // small server-rendered preview (null for files without one); width/height null while rendering
+  thumbnail?: { url: string; width: number | null; height: number | null } | null;
 };
 
+const THUMB_WIDTH = 64;
+
 export default function CardsListScreen() {
   const [loading, setLoading] = useState<boolean>(true);
   const [files, setFiles] = useState<AnnFile[]>([]);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [selected, setSelected] = useState<AnnFile | null>(null);
   const [modalVisible, setModalVisible] = useState<boolean>(false);
   // If you already set API_BASE elsewhere in your app, replace this with that constant import
   const API_BASE = (global as any).API_BASE ?? DEFAULT_API_BASE;
 
+  // resume token of the last stream message, so a reconnect only gets what was missed
+  const streamToken = useRef<string | null>(null);
+
   useEffect(() => {
     fetchList();
   }, []);
 
+  // new uploads are pushed over /announcements/stream instead of re-polling the list
+  useEffect(() => {
+    let ws: WebSocket | null = null;
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+
+    function connect() {
+      const since = streamToken.current ? `?since=${encodeURIComponent(streamToken.current)}` : "";
+      ws = new WebSocket(`${API_BASE.replace(/^http/, "ws")}/announcements/stream${since}`);
+      ws.onmessage = (ev) => {
+        const msg = JSON.parse(ev.data);
+        if (msg.token) streamToken.current = msg.token;
+        if (msg.event === "announcement") {
+          const [item] = toAnnFiles({ files: [msg] });
+          // at-least-once delivery: a rewritten file replaces its old row
+          setFiles((prev) => [item, ...prev.filter((f) => f.filename !== item.filename)]);
+        } else if (msg.event === "reset") {
+          fetchList();
+        }
+      };
+      ws.onclose = () => {
+        if (!closed) retry = setTimeout(connect, 1000);
+      };
+    }
+
+    connect();
+    return () => {
+      closed = true;
+      if (retry) clearTimeout(retry);
+      ws?.close();
+    };
+  }, []);
+
+  function toAnnFiles(json: any): AnnFile[] {
+    // ensure we have files array
+    return (json?.files || []).map((f: any) => ({
+      filename: f.filename,
+      symbol: (f.symbol || f.filename || "").toString().replace(/\.[^.]+$/, ""),
+      company: f.company || null,
+      download_url: f.download_url || null,
+      filename_date: f.filename_date || null,
+      thumbnail: f.thumbnail || null,
+    }));
+  }
+
+  async function fetchPage(cursor: string | null) {
+    const qs = `limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+    const res = await fetch(`${API_BASE}/announcements/list-enriched?${qs}`);
+    if (!res.ok) {
+      const txt = await res.text().catch(() => "");
+      throw new Error(`HTTP ${res.status} ${res.statusText} ${txt}`);
+    }
+    return res.json();
+  }
+
   async function fetchList() {
     setLoading(true);
     setError(null);
     try {
-      const res = await fetch(`${API_BASE}/announcements/list-enriched`);
-      if (!res.ok) {
-        const txt = await res.text().catch(() => "");
-        throw new Error(`HTTP ${res.status} ${res.statusText} ${txt}`);
-      }
-      const json = await res.json();
-      // ensure we have files array
-      const filesArr: AnnFile[] = (json?.files || []).map((f: any) => ({
-        filename: f.filename,
-        symbol: (f.symbol || f.filename || "").toString().replace(/\.[^.]+$/, ""),
-        company: f.company || null,
-        download_url: f.download_url || null,
-        filename_date: f.filename_date || null,
-      }));
-      setFiles(filesArr);
+      const json = await fetchPage(null);
+      setFiles(toAnnFiles(json));
+      setNextCursor(json?.next_cursor ?? null);
     } catch (err: any) {
       console.warn("Failed to load announcements:", err?.message ?? err);
       setError(String(err?.message ?? err));
@@ -63,6 +118,20 @@ export default function CardsListScreen() {
     }
   }
 
+  async function fetchMore() {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const json = await fetchPage(nextCursor);
+      setFiles((prev) => prev.concat(toAnnFiles(json)));
+      setNextCursor(json?.next_cursor ?? null);
+    } catch (err: any) {
+      console.warn("Failed to load more announcements:", err?.message ?? err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   function openItem(item: AnnFile) {
     setSelected(item);
     setModalVisible(true);
@@ -77,6 +146,19 @@ export default function CardsListScreen() {
 
     return (
       <TouchableOpacity style={styles.row} onPress={() => openItem(item)}>
+        {item.thumbnail ? (
+          <Image
+            source={{ uri: item.thumbnail.url }}
+            // known dimensions reserve the space up front, so rows do not jump as images load
+            style={[
+              styles.thumb,
+              item.thumbnail.width && item.thumbnail.height
+                ? { height: Math.round((THUMB_WIDTH * item.thumbnail.height) / item.thumbnail.width) }
+                : null,
+            ]}
+            resizeMode="cover"
+          />
+        ) : null}
         <View style={{ flex: 1 }}>
           <Text style={styles.company}>{displayCompany}</Text>
           <Text style={styles.headline} numberOfLines={2}>
@@ -128,6 +210,9 @@ export default function CardsListScreen() {
               <Text>No recent announcements</Text>
             </View>
           )}
+          onEndReached={fetchMore}
+          onEndReachedThreshold={0.5}
+          ListFooterComponent={loadingMore ? <ActivityIndicator style={{ padding: 16 }} /> : null}
           contentContainerStyle={{ paddingBottom: 40 }}
         />
       )}
@@ -163,6 +248,7 @@ const styles = StyleSheet.create({
   headerTitle: { fontSize: 18, fontWeight: "700" },
   refresh: { color: "#007aff", fontWeight: "600" },
   row: { flexDirection: "row", padding: 14, alignItems: "center" },
+  thumb: { width: THUMB_WIDTH, height: THUMB_WIDTH, maxHeight: 96, borderRadius: 4, marginRight: 12, backgroundColor: "#f2f2f2" },
   company: { fontSize: 16, fontWeight: "700", marginBottom: 4 },
   headline: { color: "#333", marginBottom: 6 },
   date: { color: "#888", fontSize: 12 },